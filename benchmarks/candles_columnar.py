@@ -0,0 +1,83 @@
+"""
+Parse time and retained memory of a `CandlesResponse` with a year of
+`min1` candles (~100k) parsed into models with validation (`parse_obj`),
+in trusted mode (`get_constructor`) and into `tinvest.CandleColumns`.
+
+    PYTHONPATH=. python benchmarks/candles_columnar.py
+"""
+
+import gc
+import json
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from tinvest.columnar import CandleColumns
+from tinvest.construct import get_constructor
+from tinvest.schemas import CandlesResponse
+
+CANDLES = 100_000
+
+
+def response() -> dict:
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    candles = [
+        {
+            'o': 64.0128 + i % 100 / 1000,
+            'c': 64.0128,
+            'h': 64.1128,
+            'l': 63.9128,
+            'v': 156 + i % 10,
+            'time': (start + timedelta(minutes=i)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'interval': '1min',
+            'figi': 'BBG0013HGFT4',
+        }
+        for i in range(CANDLES)
+    ]
+    body = {
+        'trackingId': 'QBASTAN',
+        'status': 'Ok',
+        'payload': {'figi': 'BBG0013HGFT4', 'interval': '1min', 'candles': candles},
+    }
+    # fresh objects as after `json.loads` of a response
+    return json.loads(json.dumps(body))
+
+
+def measure_time(parse) -> float:
+    data = response()
+    start = time.perf_counter()
+    parse(data)
+    return time.perf_counter() - start
+
+
+def measure_memory(parse) -> int:
+    """
+    Bytes retained by the result once the decoded json is freed.
+    """
+    data = response()
+    gc.collect()
+    tracemalloc.start()
+    result = parse(data)
+    del data
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return retained
+
+
+def main() -> None:
+    parsers = {
+        'parse_obj': CandlesResponse.parse_obj,
+        'trusted': get_constructor(CandlesResponse),
+        'columns': CandleColumns.parse_obj,
+    }
+    print(f'{CANDLES} candles')
+    print(f'{"parser":12} {"time":>10} {"memory":>12}')
+    for name, parse in parsers.items():
+        elapsed, retained = measure_time(parse), measure_memory(parse)
+        print(f'{name:12} {elapsed * 1000:8.0f}ms {retained / 2 ** 20:10.1f}MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+JSON decoders on recorded orderbook messages of the streaming API.
+
+    PYTHONPATH=. python benchmarks/json_decoders.py
+"""
+import json
+import random
+import time
+
+MESSAGES = 20_000
+
+
+def make_message(depth: int = 20) -> bytes:
+    price = random.uniform(50, 100)  # noqa: S311
+    payload = {
+        'figi': 'BBG0013HGFT4',
+        'depth': depth,
+        'bids': [
+            [round(price - i * 0.0025, 4), random.randint(1, 1000)]  # noqa: S311
+            for i in range(depth)
+        ],
+        'asks': [
+            [round(price + i * 0.0025, 4), random.randint(1, 1000)]  # noqa: S311
+            for i in range(depth)
+        ],
+    }
+    return json.dumps(
+        {
+            'event': 'orderbook',
+            'time': '2019-08-07T15:35:00.029721253Z',
+            'payload': payload,
+        }
+    ).encode()
+
+
+def get_decoders():
+    decoders = {'json': json.loads}
+    for name in ('orjson', 'ujson'):
+        try:
+            decoders[name] = __import__(name).loads
+        except ImportError:
+            print(f'{name} is not installed, skipped')
+    return decoders
+
+
+def main() -> None:
+    messages = [make_message() for _ in range(MESSAGES)]
+    for name, loads in get_decoders().items():
+        start = time.perf_counter()
+        for message in messages:
+            loads(message)
+        elapsed = time.perf_counter() - start
+        print(f'{name:8} {MESSAGES / elapsed:12.0f} msg/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Events per second for the streaming schemas parsed with validation
+(`parse_obj`), in trusted mode (`get_constructor`) and lazily
+(`tinvest.lazy`, reading only `figi` as a typical handler does).
+
+    PYTHONPATH=. python benchmarks/schemas_parse.py
+"""
+import time
+
+from tinvest.construct import get_constructor
+from tinvest.lazy import (
+    LazyCandleStreaming,
+    LazyInstrumentInfoStreaming,
+    LazyOrderbookStreaming,
+)
+from tinvest.schemas import (
+    CandleStreaming,
+    ErrorStreaming,
+    InstrumentInfoStreaming,
+    OrderbookStreaming,
+)
+
+EVENTS = 20_000
+
+PAYLOADS = {
+    CandleStreaming: {
+        'o': 64.0128,
+        'c': 64.0128,
+        'h': 64.0128,
+        'l': 64.0128,
+        'v': 156,
+        'time': '2019-08-07T15:35:00Z',
+        'interval': '1min',
+        'figi': 'BBG0013HGFT4',
+    },
+    OrderbookStreaming: {
+        'figi': 'BBG0013HGFT4',
+        'depth': 20,
+        'bids': [[64.3525 - i * 0.0025, 204 + i] for i in range(20)],
+        'asks': [[64.38 + i * 0.0025, 168 + i] for i in range(20)],
+    },
+    InstrumentInfoStreaming: {
+        'figi': 'BBG0013HGFT4',
+        'trade_status': 'normal_trading',
+        'min_price_increment': 0.0025,
+        'lot': 1000,
+    },
+    ErrorStreaming: {'error': 'Subscription not found', 'request_id': '123'},
+}
+
+
+LAZY = {
+    CandleStreaming: LazyCandleStreaming,
+    OrderbookStreaming: LazyOrderbookStreaming,
+    InstrumentInfoStreaming: LazyInstrumentInfoStreaming,
+}
+
+
+def lazy_figi(lazy_model):
+    def parse(payload):
+        return lazy_model(payload).figi
+
+    return parse
+
+
+def measure(parse, payload) -> float:
+    start = time.perf_counter()
+    for _ in range(EVENTS):
+        parse(payload)
+    return EVENTS / (time.perf_counter() - start)
+
+
+def main() -> None:
+    print(f'{"model":24} {"parse_obj":>12} {"trusted":>12} {"lazy":>12}')
+    for model, payload in PAYLOADS.items():
+        validated = measure(model.parse_obj, payload)
+        trusted = measure(get_constructor(model), payload)
+        lazy = ''
+        if model in LAZY:
+            lazy = f'{measure(lazy_figi(LAZY[model]), payload):10.0f}/s'
+        print(f'{model.__name__:24} {validated:10.0f}/s {trusted:10.0f}/s {lazy}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Per-message dispatch overhead of `Streaming`.
+
+Compares the dispatch table compiled by `Streaming.add_handlers` with the
+previous path (linear scan of all handlers plus a `Func` object per call).
+
+    PYTHONPATH=. python benchmarks/streaming_dispatch.py
+"""
+import asyncio
+import time
+
+from tinvest import Streaming, StreamingEvents
+from tinvest.utils import Func
+
+MESSAGES = 100_000
+HANDLERS_PER_EVENT = 10
+
+
+def make_events() -> StreamingEvents:
+    events = StreamingEvents()
+    for event in (events.candle, events.orderbook, events.instrument_info):
+        for _ in range(HANDLERS_PER_EVENT):
+
+            async def handler(api, payload, server_time):
+                pass
+
+            event()(handler)
+    return events
+
+
+async def legacy_dispatch(handlers, event_name, api, data, server_time):
+    funcs = []
+    for name, func in handlers:
+        if name != event_name:
+            continue
+        kwargs = {}
+        if 'server_time' in func.__code__.co_varnames:
+            kwargs['server_time'] = server_time
+        funcs.append(Func(func, api, data, **kwargs)())
+    await asyncio.gather(*funcs)
+
+
+async def main() -> None:
+    events = make_events()
+    streaming = Streaming('TOKEN').add_handlers(events)
+
+    start = time.perf_counter()
+    for _ in range(MESSAGES):
+        await legacy_dispatch(events.handlers, 'orderbook', None, None, None)
+    legacy = (time.perf_counter() - start) / MESSAGES
+
+    start = time.perf_counter()
+    for _ in range(MESSAGES):
+        await streaming._dispatch_event(  # pylint:disable=protected-access
+            'orderbook', None, None, None
+        )
+    compiled = (time.perf_counter() - start) / MESSAGES
+
+    print(f'legacy:   {legacy * 1e6:8.2f} us/message')
+    print(f'compiled: {compiled * 1e6:8.2f} us/message')
+    await streaming._session.close()  # pylint:disable=protected-access
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+"""
+End-to-end load of `Streaming` against the local `FakeStreamingServer`.
+
+The server runs in a separate process, so the reported CPU time per message
+is spent by the client: websocket framing, decoding, parsing and dispatch.
+Latency is measured from the server `time` of a message to the handler call.
+
+    PYTHONPATH=. python benchmarks/streaming_load.py --rate 20000 --seconds 10
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import time
+from datetime import datetime, timezone
+
+from tinvest import CandleResolution, Streaming, StreamingConfig, StreamingEvents
+from tinvest.fake_server import FakeStreamingServer
+
+
+def serve(port: int, rate: float, disconnect_after: int) -> None:
+    async def main() -> None:
+        server = FakeStreamingServer(
+            rate=rate or None, disconnect_after=disconnect_after or None
+        )
+        await server.start(port=port)
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+def percentile(values, q: float) -> float:
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+async def load(url: str, figis: int, seconds: float, trusted: bool) -> None:
+    events = StreamingEvents()
+    latencies = []
+
+    @events.startup()
+    async def startup(api):
+        for i in range(figis):
+            await api.orderbook.subscribe(f'FIGI{i}', 20)
+            await api.candle.subscribe(f'FIGI{i}', CandleResolution.min1)
+
+    @events.orderbook()
+    async def handle_orderbook(api, payload, server_time):
+        latencies.append(datetime.now(timezone.utc) - server_time)
+
+    @events.candle()
+    async def handle_candle(api, payload, server_time):
+        latencies.append(datetime.now(timezone.utc) - server_time)
+
+    config = StreamingConfig(url=url, trusted=trusted)
+    streaming = Streaming('token', reconnect_timeout=0.1, config=config)
+    task = asyncio.ensure_future(streaming.add_handlers(events).run())
+    await asyncio.sleep(1)  # warm up
+
+    latencies.clear()
+    started_at, cpu_started_at = time.perf_counter(), time.process_time()
+    await asyncio.sleep(seconds)
+    elapsed = time.perf_counter() - started_at
+    cpu = time.process_time() - cpu_started_at
+    count = len(latencies)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    values = sorted(latency.total_seconds() * 1e3 for latency in latencies)
+    stats = streaming.reconnect_stats
+    print(f'messages:   {count}')
+    print(f'msgs/sec:   {count / elapsed:.0f}')
+    print(f'p50:        {percentile(values, 0.5):.3f} ms')
+    print(f'p99:        {percentile(values, 0.99):.3f} ms')
+    print(f'cpu/msg:    {cpu / count * 1e6:.1f} us')
+    print(f'reconnects: {stats.attempts}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rate', type=float, default=10_000, help='0 is unlimited')
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--figis', type=int, default=50)
+    parser.add_argument('--disconnect-after', type=int, default=0)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--trusted', action='store_true')
+    args = parser.parse_args()
+
+    server = multiprocessing.Process(
+        target=serve, args=(args.port, args.rate, args.disconnect_after)
+    )
+    server.start()
+    time.sleep(1)
+    try:
+        asyncio.run(
+            load(f'ws://127.0.0.1:{args.port}/', args.figis, args.seconds, args.trusted)
+        )
+    finally:
+        server.terminate()
+
+
+if __name__ == '__main__':
+    main()
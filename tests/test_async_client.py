@@ -1,8 +1,12 @@
 # pylint:disable=redefined-outer-name
+import json
+
 import asynctest
 import pytest
+from aiohttp import ContentTypeError, web
+from aiohttp.test_utils import TestServer
 
-from tinvest.async_client import AsyncClient, ClientSession
+from tinvest.async_client import AsyncClient, ClientSession, ResponseWrapper
 from tinvest.constants import PRODUCTION
 from tinvest.schemas import Empty
 
@@ -46,3 +50,41 @@ async def test_client_response(client):
 @pytest.mark.asyncio
 async def test_client_session_close(client):
     await client.close()
+
+
+@pytest.mark.asyncio
+async def test_response_wrapper_loads(mocker, empty):
+    response = asynctest.MagicMock()
+    response.json = asynctest.CoroutineMock(return_value=empty.dict(by_alias=True))
+    loads = mocker.Mock(wraps=json.loads)
+    response_wrapper = ResponseWrapper(response, Empty, loads)
+
+    assert await response_wrapper.parse_json() == empty
+    response.json.assert_called_once_with(loads=loads)
+
+
+@pytest.mark.asyncio
+async def test_response_wrapper_loads_body(mocker, empty):
+    async def handler(request):
+        if request.path == '/empty':
+            return web.Response(content_type='application/json')
+        if request.path == '/html':
+            return web.Response(status=502, text='<html>', content_type='text/html')
+        return web.json_response(empty.dict(by_alias=True))
+
+    app = web.Application()
+    app.router.add_get('/{name}', handler)
+    loads = mocker.Mock(wraps=json.loads)
+
+    async with TestServer(app) as server, ClientSession() as session:
+
+        async def get_json(path):
+            async with session.get(server.make_url(path)) as response:
+                return await ResponseWrapper(response, Empty, loads).json()
+
+        assert await get_json('/json') == empty.dict(by_alias=True)
+        assert await get_json('/empty') is None
+        with pytest.raises(ContentTypeError):
+            await get_json('/html')
+
+    loads.assert_called_once()
@@ -0,0 +1,216 @@
+# pylint:disable=redefined-outer-name
+# pylint:disable=unused-argument
+# pylint:disable=unused-variable
+# pylint:disable=protected-access
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+import aiohttp
+import pytest
+
+from tinvest import (
+    CandleBackfill,
+    CandleResolution,
+    Streaming,
+    StreamingConfig,
+    StreamingEvents,
+    SubscriptionRegistry,
+)
+
+# a recent hour, backfill requests the candles up to now
+START = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+START -= timedelta(hours=2)
+
+
+def _time(minute):
+    return START + timedelta(minutes=minute)
+
+
+def _candle(figi, minute, interval='1min', c=100.0):
+    return {
+        'figi': figi,
+        'interval': interval,
+        'time': f'{_time(minute):%Y-%m-%dT%H:%M:%SZ}',
+        'o': 100.0,
+        'c': c,
+        'h': 101.0,
+        'l': 99.0,
+        'v': 1,
+    }
+
+
+class FakeResponse:
+    def __init__(self, status, data):
+        self.status = status
+        self._data = data
+
+    async def json(self):
+        return self._data
+
+
+class FakeClient:
+    def __init__(self, candles, status=200):
+        self.candles = candles
+        self.status = status
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+
+    @asynccontextmanager
+    async def request(self, method, path, response_model, **kwargs):
+        params = kwargs['params']
+        self.requests.append(params)
+        from_ = datetime.fromisoformat(params['from'])
+        to = datetime.fromisoformat(params['to'])
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0)
+        self.active -= 1
+        candles = [
+            c
+            for c in reversed(self.candles)
+            if c['figi'] == params['figi']
+            and c['interval'] == params['interval']
+            and from_ <= datetime.fromisoformat(c['time'][:-1] + '+00:00') <= to
+        ]
+        yield FakeResponse(self.status, {'payload': {'candles': candles}})
+
+
+@pytest.fixture()
+def client():
+    return FakeClient(
+        [_candle('A', minute, c=100 + minute) for minute in range(5)]
+        + [_candle('B', minute) for minute in range(5)]
+    )
+
+
+@pytest.mark.asyncio
+async def test_fetch(client):
+    backfill = CandleBackfill(client, concurrency=1)
+    backfill.track(_candle('A', 2))
+    backfill.track(_candle('B', 3))
+
+    candles = await backfill.fetch()
+
+    assert [(c['figi'], c['time']) for c in candles] == [
+        ('A', _candle('A', 2)['time']),
+        ('A', _candle('A', 3)['time']),
+        ('A', _candle('A', 4)['time']),
+        ('B', _candle('B', 3)['time']),
+        ('B', _candle('B', 4)['time']),
+    ]
+    assert client.max_active == 1
+    assert backfill.last_time('A', CandleResolution.min1) == _time(4)
+
+
+@pytest.mark.asyncio
+async def test_fetch_subscribed_only(client):
+    subscriptions = SubscriptionRegistry()
+    subscriptions.add('candle', {'figi': 'B', 'interval': CandleResolution.min1})
+    backfill = CandleBackfill(client)
+    backfill.track(_candle('A', 2))
+    backfill.track(_candle('B', 4))
+
+    candles = await backfill.fetch(subscriptions)
+
+    assert [c['figi'] for c in candles] == ['B']
+
+
+@pytest.mark.asyncio
+async def test_fetch_long_gap():
+    day = 24 * 60
+    client = FakeClient(
+        [_candle('A', minute) for minute in (-3 * day, -2 * day - 1, -day, 5)]
+    )
+    backfill = CandleBackfill(client, concurrency=2)
+    backfill.track(_candle('A', -3 * day))
+
+    candles = await backfill.fetch()
+
+    assert [c['time'] for c in candles] == [
+        _candle('A', minute)['time'] for minute in (-3 * day, -2 * day - 1, -day, 5)
+    ]
+    windows = [(r['from'], r['to']) for r in client.requests]
+    assert len(windows) == 4
+    assert [to for _, to in windows[:-1]] == [from_ for from_, _ in windows[1:]]
+    assert client.max_active == 2
+    assert backfill.last_time('A', CandleResolution.min1) == _time(5)
+
+
+@pytest.mark.asyncio
+async def test_fetch_error(client):
+    client.status = 500
+    backfill = CandleBackfill(client)
+    backfill.track(_candle('A', 2))
+
+    assert await backfill.fetch() == []
+
+
+@pytest.mark.asyncio
+async def test_fetch_keeps_successful_requests(client, mocker):
+    request = client.request
+
+    def failing_request(method, path, response_model, **kwargs):
+        if kwargs['params']['figi'] == 'A':
+            raise aiohttp.ClientConnectionError()
+        return request(method, path, response_model, **kwargs)
+
+    mocker.patch.object(client, 'request', failing_request)
+    backfill = CandleBackfill(client)
+    backfill.track(_candle('A', 2))
+    backfill.track(_candle('B', 3))
+
+    candles = await backfill.fetch()
+
+    assert [c['figi'] for c in candles] == ['B', 'B']
+    assert list(backfill.errors) == [('A', '1min')]
+    assert isinstance(backfill.errors['A', '1min'], aiohttp.ClientConnectionError)
+
+
+def test_concurrency():
+    with pytest.raises(ValueError):
+        CandleBackfill(FakeClient([]), concurrency=0)
+
+
+class FakeWs:
+    def __init__(self, *messages):
+        self.messages = messages
+
+    async def send_json(self, data):
+        pass
+
+    async def __aiter__(self):
+        for message in self.messages:
+            yield aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, message, None)
+
+
+@pytest.mark.asyncio
+async def test_streaming_backfill_before_live(client):
+    events = StreamingEvents()
+    received = []
+
+    @events.candle()
+    async def handle_candle(api, payload):
+        received.append((payload.figi, payload.time.minute, payload.c))
+
+    live = json.dumps(
+        {
+            'event': 'candle',
+            'time': _candle('A', 10)['time'],
+            'payload': _candle('A', 10),
+        }
+    )
+    streaming = Streaming(
+        'token', config=StreamingConfig(backfill=CandleBackfill(client))
+    )
+    streaming.add_handlers(events)
+    streaming.subscriptions.add('candle', {'figi': 'A', 'interval': '1min'})
+    streaming._config.backfill.track(_candle('A', 3))
+
+    await streaming._run(FakeWs(live))
+    await streaming.close()
+
+    assert received == [('A', 3, 103), ('A', 4, 104), ('A', 10, 100)]
+    assert streaming._config.backfill.last_time('A', '1min').minute == 10
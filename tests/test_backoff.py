@@ -0,0 +1,48 @@
+import pytest
+
+from tinvest.backoff import Backoff, Reconnector
+
+
+def test_backoff_without_jitter():
+    backoff = Backoff(base=1, factor=2, cap=5, jitter=0)
+
+    assert [backoff.next_delay() for _ in range(5)] == [1, 2, 4, 5, 5]
+    assert backoff.attempts == 5
+
+    backoff.reset()
+
+    assert backoff.next_delay() == 1
+    assert backoff.attempts == 1
+
+
+def test_backoff_jitter(mocker):
+    mocker.patch('random.random', return_value=1)
+    backoff = Backoff(base=4, jitter=0.25)
+
+    assert backoff.next_delay() == 3
+    assert backoff.next_delay() == 6
+
+
+def test_backoff_invalid_jitter():
+    with pytest.raises(ValueError):
+        Backoff(jitter=2)
+
+
+def test_reconnector(mocker):
+    monotonic = mocker.patch('time.monotonic', return_value=0)
+    reconnector = Reconnector(Backoff(jitter=0), stable_after=60)
+
+    reconnector.connected()
+    monotonic.return_value = 10
+    assert reconnector.disconnected() == 1
+    monotonic.return_value = 11
+    assert reconnector.disconnected() == 2
+    monotonic.return_value = 13
+    reconnector.connected()
+
+    assert reconnector.stats.attempts == 2
+    assert reconnector.stats.downtime.count == 1
+    assert reconnector.stats.downtime.total == 3
+
+    monotonic.return_value = 100
+    assert reconnector.disconnected() == 1
@@ -28,3 +28,12 @@ def test_create_client_without_session(token):
     client = BaseClient(token)
     with pytest.raises(AttributeError):
         assert not client.session
+
+
+def test_create_client_with_loads(token):
+    def loads(data):
+        return data
+
+    client = BaseClient(token, loads=loads)
+
+    assert client._loads is loads  # pylint:disable=protected-access
@@ -0,0 +1,193 @@
+# pylint:disable=redefined-outer-name
+# pylint:disable=unused-argument
+# pylint:disable=unused-variable
+from datetime import date, datetime, timezone
+
+import pytest
+
+from tinvest import (
+    AggregatedCandle,
+    CandleAggregator,
+    CandleResolution,
+    CandlesResponse,
+    StreamingEvents,
+)
+
+MIN1 = [
+    ('07:00', 100, 101, 102, 99, 10),
+    ('07:01', 101, 100, 101.5, 99.5, 5),
+    ('07:02', 100, 103, 103, 100, 7),
+    ('07:03', 103, 102, 104, 101, 3),
+    ('07:04', 102, 102.5, 103, 101.5, 1),
+    ('07:05', 102.5, 104, 105, 102, 8),
+    ('07:06', 104, 103, 104.5, 102.5, 2),
+    ('07:07', 103, 101, 103, 100.5, 6),
+    ('07:08', 101, 100, 101.5, 98, 9),
+    ('07:09', 100, 100.5, 101, 99.5, 4),
+    ('07:10', 100.5, 100.5, 100.5, 100.5, 1),
+]
+
+
+def _response(interval, candles):
+    return CandlesResponse.parse_obj(
+        {
+            'trackingId': 'QBASTAN',
+            'status': 'Ok',
+            'payload': {
+                'figi': 'BBG0013HGFT4',
+                'interval': interval,
+                'candles': [
+                    {
+                        'figi': 'BBG0013HGFT4',
+                        'interval': interval,
+                        'time': f'2020-09-25T{time}:00Z',
+                        'o': o,
+                        'c': c,
+                        'h': h,
+                        'l': l,
+                        'v': v,
+                    }
+                    for time, o, c, h, l, v in candles
+                ],
+            },
+        }
+    )
+
+
+# market_candles_get of the same FIGI and period
+REST_MIN1 = _response('1min', MIN1)
+REST_MIN5 = _response(
+    '5min',
+    [('07:00', 100, 102.5, 104, 99, 26), ('07:05', 102.5, 100.5, 105, 98, 29)],
+)
+
+
+def _fields(candle):
+    return {
+        name: getattr(candle, name)
+        for name in ('figi', 'interval', 'time', 'o', 'c', 'h', 'l', 'v')
+    }
+
+
+def test_rest_parity():
+    aggregator = CandleAggregator([CandleResolution.min5])
+    candles = [
+        candle
+        for minute in REST_MIN1.payload.candles
+        for candle in aggregator.update(minute)
+    ]
+
+    complete = [candle for candle in candles if candle.complete]
+    assert [_fields(c) for c in complete] == [
+        _fields(c) for c in REST_MIN5.payload.candles
+    ]
+    assert len(candles) == len(MIN1) + 2
+
+
+def test_in_progress_and_revisions():
+    aggregator = CandleAggregator([CandleResolution.min5, CandleResolution.day])
+    first, second = REST_MIN1.payload.candles[:2]
+
+    aggregator.update(first)
+    aggregator.update(first.copy(update={'c': 50, 'l': 50, 'v': 20}))
+    (min5, day) = aggregator.update(second)
+
+    assert not min5.complete
+    assert (min5.o, min5.h, min5.l, min5.c, min5.v) == (100, 102, 50, 100, 25)
+    assert min5.time == datetime(2020, 9, 25, 7, tzinfo=timezone.utc)
+    assert day.time == first.time
+    assert day.v == 25
+    assert aggregator.get('BBG0013HGFT4', CandleResolution.min5) == min5
+    assert aggregator.get('BBG0013HGFT4', CandleResolution.hour) is None
+
+
+def test_late_candle_skipped():
+    aggregator = CandleAggregator([CandleResolution.min5])
+    candles = REST_MIN1.payload.candles
+    aggregator.update(candles[5])
+
+    assert aggregator.update(candles[4]) == []
+    assert aggregator.update(candles[6])[0].o == 102.5
+
+
+def test_ignores_other_intervals():
+    aggregator = CandleAggregator()
+    assert aggregator.update(REST_MIN5.payload.candles[0]) == []
+
+
+def test_dict_payload():
+    aggregator = CandleAggregator([CandleResolution.hour])
+    payload = REST_MIN1.payload.candles[0].dict()
+    payload['time'] = '2020-09-25T07:00:00Z'
+
+    (candle,) = aggregator.update(payload)
+
+    assert candle.interval == CandleResolution.hour
+    assert candle.v == 10
+
+
+@pytest.mark.parametrize(
+    ('interval', 'start'),
+    [
+        (CandleResolution.day, date(2020, 9, 26)),
+        (CandleResolution.week, date(2020, 9, 21)),
+        (CandleResolution.month, date(2020, 9, 1)),
+    ],
+)
+def test_calendar_start(interval, start):
+    aggregator = CandleAggregator([interval])
+    time = datetime(2020, 9, 25, 22, tzinfo=timezone.utc)  # Saturday in Moscow
+
+    assert aggregator._get_start(interval, time) == start  # pylint:disable=W0212
+
+
+@pytest.mark.parametrize('interval', [CandleResolution.min1, 'hour1'])
+def test_bad_interval(interval):
+    with pytest.raises(ValueError):
+        CandleAggregator([interval])
+
+
+@pytest.mark.asyncio
+async def test_handlers():
+    events = StreamingEvents()
+    received = []
+
+    @events.candle()
+    async def handle_candle(api, payload: AggregatedCandle):
+        received.append(payload)
+
+    aggregator = CandleAggregator([CandleResolution.min2, CandleResolution.min3])
+    events.candle()(aggregator.handle)
+    aggregator.add_handlers(events)
+
+    for candle in REST_MIN1.payload.candles[:3]:
+        await aggregator.handle(None, candle, None)
+
+    assert [(c.interval, c.complete) for c in received] == [
+        (CandleResolution.min2, False),
+        (CandleResolution.min3, False),
+        (CandleResolution.min2, False),
+        (CandleResolution.min3, False),
+        (CandleResolution.min2, True),
+        (CandleResolution.min2, False),
+        (CandleResolution.min3, False),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_interval_handlers():
+    received = []
+
+    async def handle_hour(api, payload):
+        received.append(payload)
+
+    aggregator = CandleAggregator([CandleResolution.min5, CandleResolution.hour])
+    aggregator.add_handlers(
+        [('candle', handle_hour), ('candle', aggregator.handle)], CandleResolution.hour
+    )
+    for candle in REST_MIN1.payload.candles[:2]:
+        await aggregator.handle(None, candle, None)
+
+    assert [c.interval for c in received] == [CandleResolution.hour] * 2
+    with pytest.raises(ValueError):
+        aggregator.add_handlers([('candle', handle_hour)], CandleResolution.day)
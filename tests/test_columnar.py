@@ -0,0 +1,94 @@
+# pylint:disable=redefined-outer-name
+from array import array
+
+import pytest
+
+from tinvest import CandleColumns, CandleResolution, CandlesResponse
+from tinvest.utils import parse_time_ns
+
+
+def _candle(minute, c=100.0):
+    return {
+        'figi': 'A',
+        'interval': '1min',
+        'time': f'2020-09-25T07:{minute:02d}:00Z',
+        'o': 100.0,
+        'c': c,
+        'h': 101.0,
+        'l': 99.0,
+        'v': minute,
+    }
+
+
+@pytest.fixture()
+def response():
+    return {
+        'trackingId': 'QBASTAN',
+        'status': 'Ok',
+        'payload': {
+            'figi': 'A',
+            'interval': '1min',
+            'candles': [_candle(minute, c=100 + minute) for minute in range(3)],
+        },
+    }
+
+
+@pytest.fixture()
+def columns(response):
+    return CandleColumns.parse_obj(response)
+
+
+def test_parse_obj(columns, response):
+    assert columns.figi == 'A'
+    assert columns.interval is CandleResolution.min1
+    assert len(columns) == 3
+    assert columns.c == array('d', [100, 101, 102])
+    assert columns.v == array('q', [0, 1, 2])
+    assert columns.time[1] == parse_time_ns('2020-09-25T07:01:00Z')
+    assert columns.nbytes == 3 * 6 * 8
+    assert CandleColumns.parse_obj(response['payload']).c == columns.c
+    assert 'len=3' in repr(columns)
+
+
+def test_same_as_models(columns, response):
+    models = CandlesResponse.parse_obj(response).payload.candles
+
+    for candle, model in zip(columns, models):
+        assert candle['time'] == parse_time_ns(model.time)
+        assert {**candle, 'time': model.time} == model.dict()
+
+
+def test_extend(columns):
+    columns.extend([_candle(5)])
+
+    assert len(columns) == 4
+    assert columns[-1]['v'] == 5
+
+
+def test_to_numpy(columns):
+    numpy = pytest.importorskip('numpy')
+
+    arrays = columns.to_numpy()
+
+    assert arrays['c'].dtype == numpy.float64
+    assert arrays['v'].tolist() == [0, 1, 2]
+    assert str(arrays['time'][0]) == '2020-09-25T07:00:00.000000000'
+
+
+def test_to_pandas(columns):
+    pytest.importorskip('pandas')
+
+    frame = columns.to_pandas()
+
+    assert list(frame.columns) == ['o', 'h', 'l', 'c', 'v']
+    assert str(frame.index[0]) == '2020-09-25 07:00:00+00:00'
+
+
+def test_without_optional_dependencies(mocker, columns):
+    mocker.patch('tinvest.columnar.numpy', None)
+    mocker.patch('tinvest.columnar.pandas', None)
+
+    with pytest.raises(ImportError):
+        columns.to_numpy()
+    with pytest.raises(ImportError):
+        columns.to_pandas()
@@ -0,0 +1,85 @@
+import pytest
+
+from tinvest.construct import get_constructor
+from tinvest.schemas import (
+    CandleResolution,
+    CandlesResponse,
+    CandleStreaming,
+    ErrorStreaming,
+    InstrumentInfoStreaming,
+    OrderbookStreaming,
+)
+
+CANDLE = {
+    'o': 64.0128,
+    'c': 64.0128,
+    'h': 64.0128,
+    'l': 64.0128,
+    'v': 156,
+    'time': '2019-08-07T15:35:00Z',
+    'interval': '5min',
+    'figi': 'BBG0013HGFT4',
+}
+
+
+@pytest.mark.parametrize(
+    ('model', 'data'),
+    [
+        (CandleStreaming, CANDLE),
+        (
+            InstrumentInfoStreaming,
+            {
+                'figi': 'BBG0013HGFT4',
+                'trade_status': 'normal_trading',
+                'min_price_increment': 0.0025,
+                'lot': 1000,
+            },
+        ),
+        (ErrorStreaming, {'error': 'Subscription not found'}),
+        (
+            CandlesResponse,
+            {
+                'trackingId': 'tracking_id',
+                'payload': {
+                    'figi': 'BBG0013HGFT4',
+                    'interval': '5min',
+                    'candles': [CANDLE, CANDLE],
+                },
+            },
+        ),
+    ],
+)
+def test_constructor_equals_parse_obj(model, data):
+    parsed = model.parse_obj(data)
+    constructed = get_constructor(model)(data)
+
+    assert isinstance(constructed, model)
+    assert constructed.dict() == parsed.dict()
+
+
+def test_constructor_keeps_decoded_containers():
+    data = {
+        'figi': 'BBG0013HGFT4',
+        'depth': 2,
+        'bids': [[64.3525, 204], [64.1975, 136]],
+        'asks': [[64.38, 168], [64.3825, 162]],
+    }
+    parsed = OrderbookStreaming.parse_obj(data)
+    constructed = get_constructor(OrderbookStreaming)(data)
+
+    assert constructed.figi == parsed.figi
+    assert constructed.depth == parsed.depth
+    assert constructed.bids is data['bids']
+    assert [tuple(level) for level in constructed.bids] == parsed.bids
+    assert [tuple(level) for level in constructed.asks] == parsed.asks
+
+
+def test_constructor_applies_enums_and_datetimes():
+    candle = get_constructor(CandleStreaming)(CANDLE)
+
+    assert candle.interval is CandleResolution.min5
+    assert candle.time == CandleStreaming.parse_obj(CANDLE).time
+
+
+def test_constructor_is_cached():
+    assert get_constructor(CandleStreaming) is get_constructor(CandleStreaming)
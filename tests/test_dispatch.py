@@ -0,0 +1,176 @@
+# pylint:disable=redefined-outer-name
+# pylint:disable=unused-argument
+import asyncio
+
+import pytest
+
+from tinvest.dispatch import LatestOnly, Overflow, QueueDispatcher
+
+
+class Handler:
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.delay = delay
+        self.func = self
+
+    async def call_event(self, api, data, server_time):
+        await asyncio.sleep(self.delay)
+        self.calls.append(data)
+
+
+class Snapshot:
+    def __init__(self, figi, number):
+        self.figi = figi
+        self.depth = 20
+        self.number = number
+
+
+def event(figi, number):
+    return {'figi': figi, 'number': number}
+
+
+async def wait_for_queues(dispatcher):
+    while any(stats.depth for stats in dispatcher.stats.values()):
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.01)
+
+
+@pytest.fixture()
+async def dispatcher():
+    _dispatcher = QueueDispatcher(maxsize=2)
+    yield _dispatcher
+    await _dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_keeps_order_per_figi(dispatcher):
+    handler = Handler()
+    for number in range(5):
+        for figi in ('A', 'B'):
+            await dispatcher.put(
+                'orderbook', [handler], None, event(figi, number), None
+            )
+    await wait_for_queues(dispatcher)
+
+    assert [e['number'] for e in handler.calls if e['figi'] == 'A'] == list(range(5))
+    assert [e['number'] for e in handler.calls if e['figi'] == 'B'] == list(range(5))
+    assert set(dispatcher.stats) == {'A', 'B'}
+    assert dispatcher.stats['A'].wait.count == 5
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_figis_in_parallel(dispatcher):
+    handler = Handler(delay=0.1)
+    loop = asyncio.get_event_loop()
+    start = loop.time()
+    for figi in 'ABCD':
+        await dispatcher.put('orderbook', [handler], None, event(figi, 0), None)
+    await wait_for_queues(dispatcher)
+    while len(handler.calls) < 4:
+        await asyncio.sleep(0.01)
+
+    assert loop.time() - start < 0.3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ('overflow', 'expected', 'dropped', 'coalesced'),
+    [
+        (Overflow.drop_oldest, [0, 3, 4], 2, 0),
+        (Overflow.coalesce, [0, 1, 4], 0, 2),
+    ],
+)
+async def test_dispatcher_overflow(overflow, expected, dropped, coalesced):
+    dispatcher = QueueDispatcher(maxsize=2, overflow=overflow)
+    handler = Handler(delay=0.05)
+    for number in range(5):
+        await dispatcher.put('orderbook', [handler], None, event('A', number), None)
+        await asyncio.sleep(0)
+    await wait_for_queues(dispatcher)
+    await asyncio.sleep(0.1)
+
+    assert [e['number'] for e in handler.calls] == expected
+    assert dispatcher.stats['A'].dropped == dropped
+    assert dispatcher.stats['A'].coalesced == coalesced
+    assert dispatcher.stats['A'].max_depth == 2
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_block(dispatcher):
+    handler = Handler(delay=0.01)
+    for number in range(5):
+        await dispatcher.put('orderbook', [handler], None, event('A', number), None)
+    await wait_for_queues(dispatcher)
+
+    assert [e['number'] for e in handler.calls] == list(range(5))
+    assert dispatcher.stats['A'].dropped == 0
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_per_handler():
+    dispatcher = QueueDispatcher(per_handler=True)
+    slow, fast = Handler(delay=0.2), Handler()
+    await dispatcher.put('orderbook', [slow, fast], None, event('A', 0), None)
+    await asyncio.sleep(0.05)
+
+    assert fast.calls
+    assert not slow.calls
+    assert set(dispatcher.stats) == {(slow, 'A'), (fast, 'A')}
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_handler_error(dispatcher):
+    class FailingHandler(Handler):
+        async def call_event(self, api, data, server_time):
+            await super().call_event(api, data, server_time)
+            raise ValueError
+
+    handler = FailingHandler()
+    await dispatcher.put('orderbook', [handler], None, event('A', 0), None)
+    await dispatcher.put('orderbook', [handler], None, event('A', 1), None)
+    await wait_for_queues(dispatcher)
+
+    assert len(handler.calls) == 2
+
+
+def test_dispatcher_maxsize():
+    with pytest.raises(ValueError):
+        QueueDispatcher(maxsize=0)
+
+
+@pytest.mark.asyncio
+async def test_latest_only_skips_stale_snapshots():
+    calls = []
+    release = asyncio.Event()
+
+    async def call(api, data, server_time):
+        calls.append(data.number)
+        await release.wait()
+
+    latest_only = LatestOnly(call)
+    for number in range(4):
+        await latest_only(None, Snapshot('A', number), None)
+    await latest_only(None, Snapshot('B', 0), None)
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.sleep(0.01)
+
+    assert calls == [0, 0, 3]
+    assert latest_only.skipped == {('A', 20): 2}
+    await latest_only.close()
+
+
+@pytest.mark.asyncio
+async def test_latest_only_close():
+    async def call(api, data, server_time):
+        await asyncio.sleep(10)
+
+    latest_only = LatestOnly(call)
+    await latest_only(None, Snapshot('A', 0), None)
+    await latest_only.close()
+    await asyncio.sleep(0)
+
+    await latest_only(None, Snapshot('A', 1), None)
+    await latest_only.close()
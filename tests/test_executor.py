@@ -0,0 +1,85 @@
+# pylint:disable=redefined-outer-name
+# pylint:disable=unused-argument
+import contextvars
+import threading
+
+import pytest
+
+from tinvest import HandlerExecutor, Streaming, StreamingConfig, StreamingEvents
+from tinvest.dispatch import CompiledHandler
+
+var = contextvars.ContextVar('var', default=None)
+
+
+def square(api, value):
+    return api, value * value
+
+
+@pytest.fixture(params=['thread', 'inline'])
+def executor(request):
+    executor = HandlerExecutor(request.param, max_workers=1)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run(executor):
+    assert await executor.run(square, 'api', 3) == ('api', 9)
+
+    stats = executor.stats[square]
+    assert stats.execution.count == stats.wait.count == 1
+    assert stats.as_dict()['execution']['count'] == 1
+    assert 'HandlerStats' in repr(stats)
+
+
+@pytest.mark.asyncio
+async def test_inline_runs_in_loop_thread():
+    executor = HandlerExecutor('inline')
+    assert await executor.run(threading.get_ident) == threading.get_ident()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(('copy_context', 'expected'), [(False, None), (True, 'value')])
+async def test_copy_context(copy_context, expected):
+    executor = HandlerExecutor(max_workers=1, copy_context=copy_context)
+    var.set('value')
+
+    assert await executor.run(var.get) == expected
+    assert threading.get_ident() != await executor.run(threading.get_ident)
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process():
+    executor = HandlerExecutor('process', max_workers=1)
+    handler = CompiledHandler(square, executor)
+
+    assert await handler.call_event('api', 4, None) == (None, 16)
+    assert executor.stats[square].execution.count == 1
+    executor.shutdown()
+
+
+def test_kind():
+    with pytest.raises(ValueError):
+        HandlerExecutor('fiber')
+
+
+@pytest.mark.asyncio
+async def test_streaming_handlers(executor):
+    events = StreamingEvents()
+    received = []
+
+    @events.instrument_info()
+    def handle(api, payload, server_time):
+        received.append((payload, server_time))
+
+    streaming = Streaming(
+        'token', config=StreamingConfig(executor=executor)
+    ).add_handlers(events)
+    await streaming._dispatch_event(  # pylint:disable=protected-access
+        'instrument_info', None, 'payload', 'time'
+    )
+    await streaming.close()
+
+    assert received == [('payload', 'time')]
+    assert executor.stats[handle].execution.count == 1
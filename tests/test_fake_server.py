@@ -0,0 +1,129 @@
+# pylint:disable=redefined-outer-name
+# pylint:disable=unused-argument
+# pylint:disable=unused-variable
+import asyncio
+import json
+
+import aiohttp
+import pytest
+
+from tinvest import (
+    CandleResolution,
+    Recorder,
+    Streaming,
+    StreamingConfig,
+    StreamingEvents,
+)
+from tinvest.fake_server import FakeStreamingServer, format_time
+
+
+def test_format_time():
+    assert format_time(1601217644418351179) == '2020-09-27T14:40:44.418351179Z'
+
+
+def test_rate():
+    with pytest.raises(ValueError):
+        FakeStreamingServer(rate=0)
+
+
+@pytest.fixture()
+async def server():
+    async with FakeStreamingServer(rate=None, seed=1) as server:
+        yield server
+
+
+async def _receive(ws, count):
+    return [json.loads((await ws.receive()).data) for _ in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_subscribe(server):
+    async with aiohttp.ClientSession() as session:
+        async with session.ws_connect(server.url) as ws:
+            await ws.send_json(
+                {'event': 'orderbook:subscribe', 'figi': 'FIGI', 'depth': 3}
+            )
+            messages = await _receive(ws, 2)
+
+    assert [m['event'] for m in messages] == ['orderbook', 'orderbook']
+    payload = messages[0]['payload']
+    assert len(payload['bids']) == len(payload['asks']) == 3
+    assert payload['bids'][0][0] < payload['asks'][0][0]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    'message',
+    [
+        {'event': 'orderbook:subscribe', 'figi': 'FIGI', 'depth': 21},
+        {'event': 'candle:subscribe', 'figi': 'FIGI', 'interval': '4min'},
+        {'event': 'trades:subscribe', 'figi': 'FIGI'},
+        {'event': 'instrument_info:get', 'figi': 'FIGI'},
+    ],
+)
+async def test_error(server, message):
+    async with aiohttp.ClientSession() as session:
+        async with session.ws_connect(server.url) as ws:
+            await ws.send_json({**message, 'request_id': '1'})
+            (error,) = await _receive(ws, 1)
+
+    assert error['event'] == 'error'
+    assert error['payload']['request_id'] == '1'
+
+
+@pytest.mark.asyncio
+async def test_token():
+    async with FakeStreamingServer(token='token') as server:
+        async with aiohttp.ClientSession() as session:
+            with pytest.raises(aiohttp.WSServerHandshakeError):
+                await session.ws_connect(server.url)
+
+
+@pytest.mark.asyncio
+async def test_streaming_end_to_end():
+    events = StreamingEvents()
+    received = []
+    done = asyncio.Event()
+
+    @events.startup()
+    async def startup(api):
+        await api.candle.subscribe('FIGI', CandleResolution.min1)
+
+    @events.candle()
+    async def handle_candle(api, payload, server_time):
+        received.append((payload, server_time))
+        if len(received) == 30:
+            done.set()
+
+    async with FakeStreamingServer(rate=None, disconnect_after=10) as server:
+        streaming = Streaming(
+            'token', reconnect_timeout=0.01, config=StreamingConfig(url=server.url)
+        )
+        task = asyncio.ensure_future(streaming.add_handlers(events).run())
+        await asyncio.wait_for(done.wait(), 5)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    assert server.connections >= 3
+    assert received[0][0].interval == CandleResolution.min1
+    assert received[0][1].tzinfo is not None
+
+
+@pytest.mark.asyncio
+async def test_record(tmp_path):
+    path = str(tmp_path / 'ws.rec')
+    message = {
+        'event': 'error',
+        'time': '2020-09-27T14:40:44.418351179Z',
+        'payload': {'error': 'recorded', 'request_id': None},
+    }
+    with Recorder(path) as recorder:
+        recorder.write(json.dumps(message), 0, 0)
+
+    async with FakeStreamingServer(record=path, rate=1000) as server:
+        async with aiohttp.ClientSession() as session:
+            async with session.ws_connect(server.url) as ws:
+                messages = await _receive(ws, 3)
+
+    assert [m['payload']['error'] for m in messages] == ['recorded'] * 3
+    assert messages[0]['time'] != message['time']
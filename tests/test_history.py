@@ -0,0 +1,139 @@
+# pylint:disable=redefined-outer-name
+# pylint:disable=unused-argument
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+import aiohttp
+import pytest
+
+from tinvest import CandleHistory, CandleResolution
+from tinvest.history import split_period
+from tinvest.utils import parse_time
+
+START = datetime(2020, 9, 25, tzinfo=timezone.utc)
+
+
+def _candle(figi, time, c=100.0):
+    return {
+        'figi': figi,
+        'interval': 'hour',
+        'time': time.isoformat().replace('+00:00', 'Z'),
+        'o': 100.0,
+        'c': c,
+        'h': 101.0,
+        'l': 99.0,
+        'v': 1,
+    }
+
+
+class FakeResponse:
+    def __init__(self, status, data):
+        self.status = status
+        self._data = data
+
+    def raise_for_status(self):
+        if self.status != 200:
+            raise aiohttp.ClientResponseError(None, (), status=self.status)
+
+    async def json(self):
+        return self._data
+
+
+class FakeClient:
+    """
+    Hourly candles of every FIGI, the window end is inclusive.
+    """
+
+    def __init__(self, hours, status=200, repeat=1):
+        self.hours = hours
+        self.repeat = repeat
+        self.status = status
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+
+    @asynccontextmanager
+    async def request(self, method, path, response_model, **kwargs):
+        params = kwargs['params']
+        self.requests.append(params)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0)
+        self.active -= 1
+        from_, to = parse_time(params['from']), parse_time(params['to'])
+        candles = [
+            _candle(params['figi'], START + timedelta(hours=hour))
+            for hour in range(self.hours)
+            if from_ <= START + timedelta(hours=hour) <= to
+        ] * self.repeat
+        yield FakeResponse(self.status, {'payload': {'candles': candles}})
+
+
+def test_split_period():
+    end = datetime(2020, 9, 27, 12)
+
+    assert split_period(START, end, CandleResolution.min1) == [
+        (START, START + timedelta(days=1)),
+        (START + timedelta(days=1), START + timedelta(days=2)),
+        (START + timedelta(days=2), end.replace(tzinfo=timezone.utc)),
+    ]
+    assert split_period('2020-09-25T00:00:00Z', START, 'day') == []
+
+
+@pytest.mark.asyncio
+async def test_candles_in_time_order():
+    client = FakeClient(hours=24 * 15)
+    history = CandleHistory(client, concurrency=3)
+    end = START + timedelta(days=15)
+
+    candles = [c async for c in history.candles(['A', 'B', 'A'], START, end, 'hour')]
+
+    assert len(client.requests) == 3 * 2
+    assert client.max_active == 3
+    assert len(candles) == 24 * 15 * 2
+    keys = [(parse_time(c['time']), c['figi']) for c in candles]
+    assert keys == sorted(keys)
+    assert len(set(keys)) == len(keys)
+    assert history.requests == 6
+
+
+@pytest.mark.asyncio
+async def test_candles_deduplicated():
+    history = CandleHistory(FakeClient(hours=48, repeat=2))
+    end = START + timedelta(days=2)
+
+    candles = [c async for c in history.candles(['A'], START, end, '1min')]
+
+    assert [parse_time(c['time']) for c in candles] == [
+        START + timedelta(hours=hour) for hour in range(48)
+    ]
+    assert history.duplicates == 48
+
+
+@pytest.mark.asyncio
+async def test_candles_error():
+    history = CandleHistory(FakeClient(hours=10, status=500))
+
+    candles = history.candles(['A'], START, START + timedelta(days=1), 'hour')
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        await candles.__anext__()
+
+
+@pytest.mark.asyncio
+async def test_candles_stop_early():
+    client = FakeClient(hours=24 * 30)
+    history = CandleHistory(client, concurrency=2)
+    candles = history.candles(['A'], START, START + timedelta(days=30), 'hour')
+
+    async for _ in candles:
+        break
+    await candles.aclose()
+
+    assert len(client.requests) <= 3
+
+
+def test_concurrency():
+    with pytest.raises(ValueError):
+        CandleHistory(FakeClient(0), concurrency=0)
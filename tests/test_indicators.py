@@ -0,0 +1,213 @@
+# pylint:disable=redefined-outer-name
+# pylint:disable=unused-argument
+# pylint:disable=unused-variable
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from tinvest import (
+    ATR,
+    EMA,
+    RSI,
+    SMA,
+    VWAP,
+    CandleResolution,
+    CandlesResponse,
+    Indicators,
+    IndicatorUpdate,
+    StreamingEvents,
+)
+from tinvest.indicators import Indicator
+
+START = datetime(2020, 9, 25, 7, tzinfo=timezone.utc)
+MINUTE = timedelta(minutes=1)
+
+
+def _candles(count, seed=1, step=MINUTE):
+    rnd = random.Random(seed)
+    close = 100.0
+    candles = []
+    for i in range(count):
+        open_ = close
+        close = round(open_ + rnd.uniform(-1, 1), 2)
+        candles.append(
+            {
+                'figi': 'FIGI',
+                'interval': '1min',
+                'time': START + step * i,
+                'o': open_,
+                'c': close,
+                'h': max(open_, close) + rnd.uniform(0, 0.5),
+                'l': min(open_, close) - rnd.uniform(0, 0.5),
+                'v': rnd.randint(1, 100),
+            }
+        )
+    return candles
+
+
+def _sma(candles, period):
+    if len(candles) < period:
+        return None
+    return sum(c['c'] for c in candles[-period:]) / period
+
+
+def _ema(candles, period):
+    if len(candles) < period:
+        return None
+    alpha = 2 / (period + 1)
+    ema = candles[0]['c']
+    for candle in candles[1:]:
+        ema += alpha * (candle['c'] - ema)
+    return ema
+
+
+def _wilder(values, period):
+    if len(values) < period:
+        return None
+    average = sum(values[:period]) / period
+    for value in values[period:]:
+        average = (average * (period - 1) + value) / period
+    return average
+
+
+def _rsi(candles, period):
+    changes = [b['c'] - a['c'] for a, b in zip(candles, candles[1:])]
+    gain = _wilder([max(c, 0) for c in changes], period)
+    loss = _wilder([max(-c, 0) for c in changes], period)
+    if gain is None:
+        return None
+    return 100.0 if not loss else 100 - 100 / (1 + gain / loss)
+
+
+def _atr(candles, period):
+    ranges = [candles[0]['h'] - candles[0]['l']] + [
+        max(b['h'] - b['l'], abs(b['h'] - a['c']), abs(b['l'] - a['c']))
+        for a, b in zip(candles, candles[1:])
+    ]
+    return _wilder(ranges, period)
+
+
+def _vwap(candles):
+    day = candles[-1]['time'].astimezone(timezone(timedelta(hours=3))).date()
+    today = [
+        c
+        for c in candles
+        if c['time'].astimezone(timezone(timedelta(hours=3))).date() == day
+    ]
+    volume = sum(c['v'] for c in today)
+    return sum((c['h'] + c['l'] + c['c']) / 3 * c['v'] for c in today) / volume
+
+
+REFERENCES = {
+    'sma': (lambda: SMA(5), lambda candles: _sma(candles, 5)),
+    'ema': (lambda: EMA(5), lambda candles: _ema(candles, 5)),
+    'rsi': (lambda: RSI(5), lambda candles: _rsi(candles, 5)),
+    'atr': (lambda: ATR(5), lambda candles: _atr(candles, 5)),
+    'vwap': (VWAP, _vwap),
+}
+
+
+@pytest.fixture()
+def indicators():
+    return Indicators(**{name: make() for name, (make, _) in REFERENCES.items()})
+
+
+def _assert_values(values, candles):
+    for name, (_, reference) in REFERENCES.items():
+        expected = reference(candles)
+        if expected is None:
+            assert values[name] is None, name
+        else:
+            assert values[name] == pytest.approx(expected), name
+
+
+def test_update_with_revisions(indicators):
+    candles = _candles(30, step=timedelta(hours=1))
+    history = []
+    for candle in candles:
+        # the in-progress candle is re-sent with the same time
+        first = {**candle, 'c': candle['o'], 'h': candle['o'], 'l': candle['o']}
+        indicators.update(first)
+        update = indicators.update(candle)
+        history.append(candle)
+        _assert_values(update.values, history)
+
+    assert indicators.get('FIGI', CandleResolution.min1) == update.values
+
+
+def test_late_candle_ignored(indicators):
+    candles = _candles(10)
+    for candle in candles:
+        indicators.update(candle)
+    before = indicators.get('FIGI', '1min')
+
+    assert indicators.update(candles[3]).values == before
+
+
+def test_seed(indicators):
+    candles = _candles(40)
+    response = CandlesResponse.parse_obj(
+        {
+            'trackingId': 'ID',
+            'status': 'Ok',
+            'payload': {'figi': 'FIGI', 'interval': '1min', 'candles': candles[:30]},
+        }
+    )
+    indicators.seed(response)
+    _assert_values(indicators.get('FIGI', '1min'), candles[:30])
+
+    # the last seeded candle is revised by streaming
+    revised = {**candles[29], 'c': candles[29]['c'] + 1}
+    update = indicators.update(revised)
+    _assert_values(update.values, candles[:29] + [revised])
+
+    for i in range(30, 40):
+        update = indicators.update(candles[i])
+    _assert_values(update.values, candles[:29] + [revised] + candles[30:])
+
+
+def test_seed_dicts_and_empty(indicators):
+    indicators.seed([])
+    assert indicators.get('FIGI', '1min') == {}
+
+    candles = _candles(3)
+    indicators.seed({'payload': {'candles': list(reversed(candles))}})
+    _assert_values(indicators.get('FIGI', '1min'), candles)
+
+
+@pytest.mark.parametrize('indicator', [SMA, EMA, RSI, ATR])
+def test_period(indicator):
+    with pytest.raises(ValueError):
+        indicator(0)
+
+
+def test_empty():
+    with pytest.raises(ValueError):
+        Indicators()
+
+
+def test_indicator_abstract():
+    with pytest.raises(TypeError):
+        Indicator()  # type: ignore # pylint:disable=abstract-class-instantiated
+
+
+@pytest.mark.asyncio
+async def test_handlers(indicators):
+    events = StreamingEvents()
+    received = []
+
+    @events.indicators()
+    async def handle_indicators(api, payload: IndicatorUpdate):
+        received.append(payload)
+
+    events.candle()(indicators.handle)
+    indicators.add_handlers(events)
+
+    for candle in _candles(6):
+        await indicators.handle(None, candle)
+
+    assert len(received) == 6
+    assert received[-1]['sma'] == pytest.approx(_sma(_candles(6), 5))
+    assert received[-1].figi == 'FIGI'
+    assert 'FIGI' in repr(received[-1])
@@ -0,0 +1,168 @@
+# pylint:disable=redefined-outer-name
+# pylint:disable=unused-argument
+# pylint:disable=unused-variable
+# pylint:disable=protected-access
+import asyncio
+
+import pytest
+
+from tinvest import (
+    BreakerState,
+    CircuitBreaker,
+    HandlerErrorStreaming,
+    HandlerIsolation,
+    Streaming,
+    StreamingConfig,
+    StreamingEvents,
+)
+
+
+@pytest.fixture()
+def clock(mocker):
+    clock = mocker.patch('tinvest.isolation.time.monotonic')
+    clock.return_value = 100.0
+    return clock
+
+
+def test_breaker(clock):
+    breaker = CircuitBreaker(failures=2, reset_after=10)
+
+    assert breaker.allow()
+    assert not breaker.failed()
+    breaker.succeeded()
+    assert not breaker.failed()
+    assert breaker.failed()
+    assert breaker.state is BreakerState.open
+    assert not breaker.allow()
+    assert breaker.skipped == 1
+
+    clock.return_value = 110.0
+    assert breaker.allow()
+    assert breaker.state is BreakerState.half_open
+    assert not breaker.allow()
+    assert breaker.failed()
+    assert breaker.state is BreakerState.open
+
+    clock.return_value = 120.0
+    assert breaker.allow()
+    breaker.succeeded()
+    assert breaker.state is BreakerState.closed
+    assert 'closed' in repr(breaker)
+
+
+@pytest.mark.parametrize(
+    'kwargs',
+    [{'timeout': 0}, {'failures': 0}],
+)
+def test_isolation_values(kwargs):
+    with pytest.raises(ValueError):
+        HandlerIsolation(**kwargs)
+    with pytest.raises(ValueError):
+        CircuitBreaker(failures=0)
+
+
+@pytest.fixture()
+def events():
+    events = StreamingEvents()
+    events.calls = []
+    events.errors = []
+
+    @events.candle()
+    async def fail(api, payload):
+        raise ZeroDivisionError
+
+    @events.candle()
+    async def hang(api, payload):
+        await asyncio.sleep(payload)
+        events.calls.append(('hang', payload))
+
+    @events.candle()
+    def ok(api, payload):
+        events.calls.append(('ok', payload))
+
+    @events.error()
+    async def handle_error(api, payload):
+        events.errors.append(payload)
+
+    return events
+
+
+@pytest.mark.asyncio
+async def test_isolation(events):
+    isolation = HandlerIsolation(timeout=0.05, failures=2, reset_after=10)
+    streaming = Streaming(
+        'TOKEN', config=StreamingConfig(isolation=isolation)
+    ).add_handlers(events)
+
+    await streaming._dispatch_event('candle', 'api', 0, None)
+    await streaming._dispatch_event('candle', 'api', 1, None)
+
+    assert sorted(events.calls) == [('hang', 0), ('ok', 0), ('ok', 1)]
+    assert [(e.event, e.handler.__name__) for e in events.errors] == [
+        ('candle', 'fail'),
+        ('candle', 'fail'),
+        ('candle', 'hang'),
+    ]
+    error = events.errors[0]
+    assert isinstance(error, HandlerErrorStreaming)
+    assert isinstance(error.exception, ZeroDivisionError)
+    assert 'fail failed: ZeroDivisionError()' in error.error
+
+    breakers = {func.__name__: breaker for func, breaker in streaming.breakers.items()}
+    assert breakers['fail'].state is BreakerState.open
+    assert breakers['hang'].state is BreakerState.closed
+    assert breakers['ok'].state is BreakerState.closed
+
+    await streaming._dispatch_event('candle', 'api', 0, None)
+    assert breakers['fail'].skipped == 1
+    assert len(events.errors) == 3
+
+
+@pytest.mark.asyncio
+async def test_error_handler_failure_is_not_reported():
+    events = StreamingEvents()
+    calls = []
+
+    @events.error()
+    async def fail(api, payload):
+        calls.append(payload)
+        raise ZeroDivisionError
+
+    streaming = Streaming('TOKEN', config=StreamingConfig(isolation=HandlerIsolation()))
+    streaming.add_handlers(events)
+
+    await streaming._dispatch_event('error', 'api', 'payload', None)
+
+    assert calls == ['payload']
+
+
+@pytest.mark.asyncio
+async def test_latest_only():
+    events = StreamingEvents()
+    errors = []
+
+    @events.orderbook(latest_only=True)
+    async def fail(api, payload):
+        raise ZeroDivisionError
+
+    @events.error()
+    async def handle_error(api, payload):
+        errors.append(payload.handler)
+
+    streaming = Streaming('TOKEN', config=StreamingConfig(isolation=HandlerIsolation()))
+    streaming.add_handlers(events)
+
+    await streaming._dispatch_event('orderbook', 'api', {'figi': 'A'}, None)
+    await asyncio.sleep(0.01)
+    await streaming._close_dispatch()
+
+    assert errors == [fail]
+
+
+@pytest.mark.asyncio
+async def test_without_isolation(events):
+    streaming = Streaming('TOKEN').add_handlers(events)
+
+    with pytest.raises(ZeroDivisionError):
+        await streaming._dispatch_event('candle', 'api', 0, None)
+    assert streaming.breakers == {}
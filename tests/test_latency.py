@@ -0,0 +1,156 @@
+# pylint:disable=protected-access
+import json
+import logging
+from datetime import datetime, timezone
+
+import aiohttp
+import asynctest
+import pytest
+
+from tinvest import (
+    EventTimes,
+    LatencyMonitor,
+    Streaming,
+    StreamingConfig,
+    StreamingEvents,
+)
+from tinvest.metrics import Histogram
+
+SERVER_TIME = datetime(2020, 1, 2, tzinfo=timezone.utc)
+T = SERVER_TIME.timestamp()
+
+
+def test_histogram():
+    histogram = Histogram()
+    for i in range(1, 101):
+        histogram.add(i / 1000)
+
+    assert histogram.count == 100
+    assert histogram.min == 0.001
+    assert histogram.max == 0.1
+    assert histogram.mean == pytest.approx(0.0505)
+    assert histogram.quantile(0.5) == pytest.approx(0.05, rel=0.26)
+    assert histogram.quantile(0.99) == pytest.approx(0.099, rel=0.26)
+    assert histogram.quantile(0) == 0.001
+    assert histogram.quantile(1) == pytest.approx(0.1)
+    assert histogram.as_dict()['count'] == 100
+    assert 'Histogram' in repr(histogram)
+
+
+def test_histogram_out_of_range():
+    histogram = Histogram(low=0.01, high=1)
+    histogram.add(-1)
+    histogram.add(10)
+
+    assert histogram.counts[0] == histogram.counts[-1] == 1
+    assert histogram.quantile(1) == 10
+    assert Histogram().quantile(0.5) == 0.0
+    assert Histogram().as_dict() == {'count': 0}
+
+
+def test_histogram_merge():
+    histogram, other = Histogram(), Histogram()
+    histogram.add(0.001)
+    other.add(0.1)
+    histogram.merge(other)
+
+    assert (histogram.count, histogram.min, histogram.max) == (2, 0.001, 0.1)
+    with pytest.raises(ValueError):
+        histogram.merge(Histogram(per_decade=5))
+
+
+@pytest.mark.parametrize(('low', 'high'), [(0, 1), (1, 1), (1, 0.5)])
+def test_histogram_range(low, high):
+    with pytest.raises(ValueError):
+        Histogram(low=low, high=high)
+
+
+def test_histogram_quantile():
+    with pytest.raises(ValueError):
+        Histogram().quantile(1.5)
+
+
+def test_record():
+    monitor = LatencyMonitor()
+    monitor.record(
+        'candle', {'figi': 'A'}, EventTimes(SERVER_TIME, T + 0.5, T + 0.6, T + 1)
+    )
+    monitor.record(
+        'candle', {'figi': 'A'}, EventTimes(SERVER_TIME, T + 0.2, T + 0.3, T + 1)
+    )
+    monitor.record(
+        'error', {'error': 'e'}, EventTimes(SERVER_TIME, T + 0.1, T + 0.1, T + 1)
+    )
+
+    snapshot = monitor.snapshot()
+    assert set(snapshot) == {('candle', 'A'), ('error', None)}
+    latency = snapshot[('candle', 'A')]
+    assert latency.network.count == 2
+    assert latency.network.max == pytest.approx(0.5)
+    assert latency.parse.max == pytest.approx(0.1)
+    assert latency.handler.max == pytest.approx(0.7)
+    assert latency.skew == pytest.approx(0.2)
+    assert monitor.skew() == pytest.approx(0.1)
+    assert latency.as_dict()['skew'] == latency.skew
+    assert 'EventLatency' in repr(latency)
+
+
+def test_not_by_figi():
+    monitor = LatencyMonitor(by_figi=False)
+    monitor.record('candle', {'figi': 'A'}, EventTimes(SERVER_TIME, T, T, T))
+
+    assert list(monitor.snapshot()) == [('candle', None)]
+
+
+def test_window():
+    monitor = LatencyMonitor(window=10)
+    monitor.record('candle', {}, EventTimes(SERVER_TIME, T, T, T))
+    monitor.record('candle', {}, EventTimes(SERVER_TIME, T + 11, T + 11, T + 11))
+    assert monitor.snapshot()[('candle', None)].network.count == 2
+
+    monitor.record('candle', {}, EventTimes(SERVER_TIME, T + 22, T + 22, T + 22))
+    assert monitor.snapshot()[('candle', None)].network.count == 2
+    assert monitor.skew() == pytest.approx(11)
+    assert LatencyMonitor().skew() is None
+
+
+def test_report(caplog):
+    reports = []
+    monitor = LatencyMonitor(report_every=1, callback=reports.append)
+    for i in range(3):
+        monitor.record('candle', {}, EventTimes(SERVER_TIME, T + i, T + i, T + i))
+
+    assert len(reports) == 2
+    assert reports[-1][('candle', None)].network.count == 3
+
+    caplog.set_level(logging.INFO)
+    LatencyMonitor().report()
+    monitor = LatencyMonitor(report_every=0)
+    monitor.record('candle', {}, EventTimes(SERVER_TIME, T, T, T))
+    assert 'Latency candle None' in caplog.text
+
+
+def test_window_value():
+    with pytest.raises(ValueError):
+        LatencyMonitor(window=0)
+
+
+@pytest.mark.asyncio
+async def test_streaming():
+    session = asynctest.Mock(aiohttp.ClientSession, autospec=True)
+    monitor = LatencyMonitor()
+    streaming = Streaming(
+        'token', session=session, config=StreamingConfig(latency=monitor)
+    )
+    streaming.add_handlers(StreamingEvents())
+    message = {
+        'event': 'orderbook',
+        'time': '2020-01-02T00:00:00Z',
+        'payload': {'figi': 'A', 'depth': 1, 'bids': [], 'asks': []},
+    }
+
+    await streaming._handle_message(None, json.dumps(message))
+
+    latency = monitor.snapshot()[('orderbook', 'A')]
+    assert latency.network.count == latency.parse.count == 1
+    assert latency.skew > 0
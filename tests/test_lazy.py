@@ -0,0 +1,84 @@
+import pytest
+
+from tinvest import (
+    CandleResolution,
+    CandleStreaming,
+    LazyCandleStreaming,
+    LazyInstrumentInfoStreaming,
+    LazyOrderbookStreaming,
+)
+
+CANDLE = {
+    'o': 64.0128,
+    'c': 64.0128,
+    'h': 64.0128,
+    'l': 64.0128,
+    'v': 156,
+    'time': '2019-08-07T15:35:00Z',
+    'interval': '5min',
+    'figi': 'BBG0013HGFT4',
+}
+
+ORDERBOOK = {
+    'figi': 'BBG0013HGFT4',
+    'depth': 2,
+    'bids': [[64.3525, 204], [64.1975, 136]],
+    'asks': [[64.38, 168], [64.3825, 162]],
+}
+
+
+def test_lazy_candle():
+    candle = LazyCandleStreaming(CANDLE)
+
+    assert 'time' not in candle.__dict__
+    assert candle.time == CandleStreaming.parse_obj(CANDLE).time
+    assert 'time' in candle.__dict__
+    assert candle.interval is CandleResolution.min5
+    assert candle.dict() == CandleStreaming.parse_obj(CANDLE).dict()
+    assert candle.to_model() == CandleStreaming.parse_obj(CANDLE)
+
+
+def test_lazy_field_is_converted_once(mocker):
+    candle = LazyCandleStreaming(CANDLE)
+    converter = mocker.Mock(return_value='converted')
+    mocker.patch.dict(
+        LazyCandleStreaming._fields,  # pylint:disable=protected-access
+        {'time': ('time', converter, None)},
+    )
+
+    assert candle.time == 'converted'
+    assert candle.time == 'converted'
+    converter.assert_called_once_with(CANDLE['time'])
+
+
+def test_lazy_orderbook():
+    orderbook = LazyOrderbookStreaming(ORDERBOOK)
+
+    assert orderbook.figi == 'BBG0013HGFT4'
+    assert orderbook.bids[0] == [64.3525, 204]
+    assert 'asks' not in orderbook.__dict__
+
+
+def test_lazy_optional_fields():
+    info = LazyInstrumentInfoStreaming(
+        {
+            'figi': 'BBG0013HGFT4',
+            'trade_status': 'normal_trading',
+            'min_price_increment': 0.0025,
+            'lot': 1000,
+        }
+    )
+
+    assert info.limit_up is None
+
+
+def test_lazy_unknown_field():
+    with pytest.raises(AttributeError):
+        assert LazyCandleStreaming(CANDLE).unknown
+
+
+def test_lazy_eq():
+    assert LazyCandleStreaming(CANDLE) == LazyCandleStreaming(dict(CANDLE))
+    assert LazyCandleStreaming(CANDLE) != LazyOrderbookStreaming(ORDERBOOK)
+    assert LazyCandleStreaming(CANDLE) != CANDLE
+    assert repr(LazyCandleStreaming({})) == 'LazyCandleStreaming({})'
@@ -0,0 +1,125 @@
+# pylint:disable=redefined-outer-name
+import pytest
+
+from tinvest import (
+    LazyOrderbookStreaming,
+    LocalOrderbook,
+    LocalOrderbooks,
+    OrderbookResponse,
+    OrderbookStreaming,
+    StreamingEvents,
+)
+from tinvest.dispatch import CompiledHandler
+
+STREAMING_PAYLOAD = {
+    'figi': 'BBG0013HGFT4',
+    'depth': 3,
+    'bids': [[100.0, 5], [99.5, 10], [99.0, 1]],
+    'asks': [[100.5, 2], [101.0, 7], [101.5, 3]],
+}
+
+REST_RESPONSE = {
+    'trackingId': 'QBASTAN',
+    'status': 'Ok',
+    'payload': {
+        'figi': 'BBG0013HGFT4',
+        'depth': 2,
+        'bids': [{'price': 100.0, 'quantity': 5}, {'price': 99.5, 'quantity': 10}],
+        'asks': [{'price': 100.5, 'quantity': 2}],
+        'tradeStatus': 'NormalTrading',
+        'minPriceIncrement': 0.5,
+    },
+}
+
+
+@pytest.fixture()
+def books():
+    return LocalOrderbooks()
+
+
+def _assert_book(book):
+    assert book.best_bid == 100.0
+    assert book.best_ask == 100.5
+    assert book.spread == 0.5
+    assert book.mid == 100.25
+
+
+@pytest.mark.parametrize(
+    'payload',
+    [
+        STREAMING_PAYLOAD,
+        OrderbookStreaming.parse_obj(STREAMING_PAYLOAD),
+        LazyOrderbookStreaming.parse_obj(STREAMING_PAYLOAD),
+    ],
+)
+def test_apply_streaming(books, payload):
+    book = books.apply_streaming(payload)
+
+    _assert_book(book)
+    assert books['BBG0013HGFT4'] is book
+    assert book.bid_depth(2) == 15
+    assert book.bid_depth() == 16
+    assert book.ask_depth(1) == 2
+    assert book.ask_depth(0) == 0
+    assert book.bids == [(100.0, 5), (99.5, 10), (99.0, 1)]
+    assert book.ask(2) == (101.5, 3)
+
+
+@pytest.mark.parametrize(
+    'response', [REST_RESPONSE, OrderbookResponse.parse_obj(REST_RESPONSE)]
+)
+def test_apply_rest(books, response):
+    book = books.apply_rest(response)
+
+    _assert_book(book)
+    assert book.bid_depth() == 15
+    assert book.asks == [(100.5, 2)]
+    with pytest.raises(IndexError):
+        book.ask(1)
+
+
+def test_update_in_place(books):
+    book = books.apply_streaming(STREAMING_PAYLOAD)
+    books.apply_streaming({**STREAMING_PAYLOAD, 'bids': [], 'asks': [[102.0, 1]]})
+
+    assert books['BBG0013HGFT4'] is book
+    assert book.updates == 2
+    assert book.best_bid is None
+    assert book.spread is None
+    assert book.mid is None
+    assert book.bid_depth() == 0
+    assert book.best_ask == 102.0
+
+
+def test_depth_limit():
+    book = LocalOrderbook('FIGI', depth=2)
+    book.update(STREAMING_PAYLOAD['bids'], STREAMING_PAYLOAD['asks'])
+
+    assert book.bid_count == book.ask_count == 2
+    assert book.bid_depth(20) == 15
+
+
+@pytest.mark.parametrize('depth', [0, 21])
+def test_depth_validation(depth):
+    with pytest.raises(ValueError):
+        LocalOrderbook('FIGI', depth)
+    with pytest.raises(ValueError):
+        LocalOrderbooks(depth)
+
+
+@pytest.mark.asyncio
+async def test_handler(books):
+    events = StreamingEvents()
+    events.orderbook()(books.handle)
+    assert len(events.handlers) == 1
+    func = events.handlers[0][1]
+    handler = CompiledHandler(func)
+
+    await handler.call_event(None, STREAMING_PAYLOAD, 'time')
+
+    assert handler.receive_server_time
+    assert books['BBG0013HGFT4'].server_time == 'time'
+    assert len(books) == 1
+    assert list(books) == ['BBG0013HGFT4']
+    assert 'BBG0013HGFT4' in books
+    assert books.get('FIGI') is None
@@ -0,0 +1,163 @@
+# pylint:disable=redefined-outer-name
+import asyncio
+import pickle
+
+import aiohttp
+import asynctest
+import pytest
+
+from tinvest import (
+    AsyncClient,
+    RateGroup,
+    RateLimit,
+    RateLimiter,
+    SubscriptionRegistry,
+    SyncClient,
+)
+from tinvest.rate_limit import TokenBucket, get_rate_group
+from tinvest.streaming_api import StreamingApi
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock():
+    return Clock()
+
+
+@pytest.mark.parametrize(
+    ('path', 'expected'),
+    [
+        ('/market/candles', RateGroup.market),
+        ('/orders/limit-order', RateGroup.orders),
+        ('/portfolio/currencies', RateGroup.portfolio),
+        ('/user/accounts', RateGroup.portfolio),
+        ('/operations', RateGroup.operations),
+        ('/sandbox/register', RateGroup.sandbox),
+        ('/unknown', None),
+    ],
+)
+def test_get_rate_group(path, expected):
+    assert get_rate_group(path) is expected
+
+
+def test_bucket_queues_in_order(clock):
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+
+    assert [bucket.reserve() for _ in range(5)] == [0, 0, 0.5, 1, 1.5]
+    clock.now = 10
+    assert bucket.reserve() == 0
+    assert bucket.wait.count == 6
+    assert bucket.wait.max == 1.5
+
+
+@pytest.mark.asyncio
+async def test_bucket_cancelled_acquire_gives_token_back(clock, mocker):
+    sleep = mocker.patch('asyncio.sleep', asynctest.CoroutineMock())
+    sleep.side_effect = asyncio.CancelledError
+    bucket = TokenBucket(rate=1, clock=clock)
+    bucket.reserve()
+
+    with pytest.raises(asyncio.CancelledError):
+        await bucket.acquire()
+
+    assert bucket.pending == 0
+    assert bucket.reserve() == 1
+
+
+@pytest.mark.parametrize(
+    ('count', 'period', 'burst'), [(240, 60, 1), (100, 60, 10), (5, 1, 4)]
+)
+def test_limiter_never_exceeds_limit(clock, count, period, burst):
+    limiter = RateLimiter({'market': RateLimit(count, period, burst)}, clock=clock)
+    bucket = limiter.buckets[RateGroup.market]
+    # request times when every request is sent as soon as it is allowed
+    times = [bucket.reserve() for _ in range(count * 3)]
+
+    for i, start in enumerate(times):
+        in_period = [t for t in times[i:] if t < start + period]
+        assert len(in_period) <= count
+
+
+@pytest.mark.parametrize('limit', [RateLimit(10, burst=10), RateLimit(10, burst=0)])
+def test_limiter_values(limit):
+    with pytest.raises(ValueError):
+        RateLimiter({'market': limit})
+
+
+@pytest.mark.parametrize(('rate', 'capacity'), [(0, 1), (1, 0.5)])
+def test_bucket_values(rate, capacity):
+    with pytest.raises(ValueError):
+        TokenBucket(rate, capacity)
+
+
+@pytest.mark.asyncio
+async def test_acquire():
+    limiter = RateLimiter({'orders': RateLimit(101, 1, burst=1)})
+
+    assert await limiter.acquire(RateGroup.orders) == 0
+    assert 0 < await limiter.acquire(RateGroup.orders) <= 0.01
+    assert await limiter.acquire(None) == 0
+    assert limiter.stats[RateGroup.orders].count == 2
+    assert limiter.buckets[RateGroup.orders].pending == 0
+
+
+def test_acquire_blocking():
+    limiter = RateLimiter({'orders': RateLimit(101, 1, burst=1)})
+
+    assert limiter.acquire_blocking(RateGroup.orders) == 0
+    assert 0 < limiter.acquire_blocking(RateGroup.orders) <= 0.01
+    assert limiter.acquire_blocking(None) == 0
+
+
+def test_pickle():
+    limiter = pickle.loads(pickle.dumps(RateLimiter()))
+
+    assert limiter.acquire_blocking(RateGroup.market) == 0
+
+
+@pytest.mark.asyncio
+async def test_async_client(mocker, token):
+    session = asynctest.MagicMock()
+    limiter = RateLimiter()
+    acquire = mocker.patch.object(limiter, 'acquire', asynctest.CoroutineMock())
+    client = AsyncClient(token, session=session, rate_limiter=limiter)
+
+    async with client.request('GET', '/market/candles', response_model=None):
+        pass
+
+    acquire.assert_awaited_once_with(RateGroup.market)
+
+
+def test_sync_client(mocker, token):
+    session = mocker.Mock()
+    limiter = RateLimiter()
+    acquire = mocker.patch.object(limiter, 'acquire_blocking')
+    client = SyncClient(token, session=session, rate_limiter=limiter)
+
+    client.request('GET', '/orders', response_model=None)
+
+    acquire.assert_called_once_with(RateGroup.orders)
+
+
+@pytest.mark.asyncio
+async def test_subscriptions(mocker):
+    limiter = RateLimiter()
+    acquire = mocker.patch.object(limiter, 'acquire', asynctest.CoroutineMock())
+    registry = SubscriptionRegistry(rate_limiter=limiter)
+    ws = asynctest.Mock(aiohttp.ClientWebSocketResponse, autospec=True)
+    api = StreamingApi(ws, subscriptions=registry)
+
+    await api.instrument_info.subscribe('A')
+    await api.instrument_info.unsubscribe('A')
+    await api.instrument_info.subscribe('B')
+    await registry.resubscribe(ws)
+
+    assert acquire.await_count == 4
+    acquire.assert_awaited_with(RateGroup.streaming)
@@ -0,0 +1,132 @@
+# pylint:disable=redefined-outer-name
+# pylint:disable=unused-argument
+# pylint:disable=unused-variable
+import json
+from datetime import datetime, timezone
+
+import asynctest
+import pytest
+
+from tinvest import Recorder, Replay, Streaming, StreamingConfig, StreamingEvents
+from tinvest.recording import read_records
+from tinvest.utils import to_ns
+
+
+def _message(i):
+    return json.dumps(
+        {
+            'event': 'instrument_info',
+            'time': '2020-09-27T14:40:44.418351179Z',
+            'payload': {
+                'figi': f'FIGI{i}',
+                'trade_status': 'normal_trading',
+                'min_price_increment': 0.01,
+                'lot': 1,
+            },
+        }
+    )
+
+
+@pytest.fixture(params=[False, True], ids=['plain', 'gzip'])
+def record_path(tmp_path, request):
+    path = str(tmp_path / 'ws.rec')
+    with Recorder(path, compress=request.param) as recorder:
+        for i in range(3):
+            recorder.write(_message(i), i * 1_000_000_000, i)
+    return path
+
+
+def test_to_ns():
+    dt = datetime(2020, 9, 27, 14, 40, 44, 418351, tzinfo=timezone.utc)
+    assert to_ns(dt) == 1601217644418351000
+
+
+def test_read_records(record_path):
+    records = list(read_records(record_path))
+
+    assert [r.received_ns for r in records] == [0, 1_000_000_000, 2_000_000_000]
+    assert [r.server_ns for r in records] == [0, 1, 2]
+    assert json.loads(records[2].data)['payload']['figi'] == 'FIGI2'
+
+
+def test_recorder_appends(record_path):
+    compressed = open(record_path, 'rb').read(2) == b'\x1f\x8b'
+    with Recorder(record_path, compress=compressed) as recorder:
+        recorder.write(_message(3).encode(), 3, 3)
+
+    assert len(list(read_records(record_path))) == 4
+
+
+def test_recorder_compression_mismatch(record_path):
+    compressed = open(record_path, 'rb').read(2) == b'\x1f\x8b'
+    with pytest.raises(ValueError):
+        Recorder(record_path, compress=not compressed)
+
+
+def test_read_records_truncated(tmp_path):
+    path = str(tmp_path / 'ws.rec')
+    with Recorder(path) as recorder:
+        recorder.write(_message(0), 0, 0)
+    with open(path, 'ab') as f:
+        f.write(b'\x10\x00')
+
+    assert len(list(read_records(path))) == 1
+
+
+def test_read_records_bad_magic(tmp_path):
+    path = tmp_path / 'ws.rec'
+    path.write_bytes(b'garbage')
+    with pytest.raises(ValueError):
+        list(read_records(str(path)))
+
+
+def test_replay_speed():
+    with pytest.raises(ValueError):
+        Replay('ws.rec', speed=0)
+
+
+@pytest.mark.asyncio
+async def test_streaming_replay(record_path):
+    events = StreamingEvents()
+    received = []
+
+    @events.instrument_info()
+    def handle(api, payload):
+        received.append(payload.figi)
+
+    replay = Replay(record_path)
+    streaming = Streaming('token').add_handlers(events)
+    await streaming.replay(replay)
+    await streaming.close()
+
+    assert received == ['FIGI0', 'FIGI1', 'FIGI2']
+    assert replay.count == 3
+
+
+@pytest.mark.asyncio
+async def test_replay_paced(record_path, mocker):
+    sleep = mocker.patch('asyncio.sleep', asynctest.CoroutineMock())
+
+    messages = [message async for message in Replay(record_path, speed=2)]
+
+    assert len(messages) == 3
+    delays = [call[0][0] for call in sleep.call_args_list]
+    assert len(delays) == 2
+    assert delays[0] == pytest.approx(0.5, abs=0.05)
+
+
+@pytest.mark.asyncio
+async def test_streaming_records(tmp_path):
+    path = str(tmp_path / 'ws.rec')
+    with Recorder(str(tmp_path / 'src.rec')) as recorder:
+        recorder.write(_message(0), 0, 0)
+    source = Replay(str(tmp_path / 'src.rec'))
+
+    with Recorder(path) as recorder:
+        streaming = Streaming('token', config=StreamingConfig(recorder=recorder))
+        await streaming.replay(source)
+        await streaming.close()
+
+    (record,) = read_records(path)
+    assert record.data == _message(0).encode()
+    assert record.server_ns == 1601217644418351000
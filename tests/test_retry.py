@@ -0,0 +1,166 @@
+# pylint:disable=redefined-outer-name
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import aiohttp
+import asynctest
+import pytest
+import requests
+
+from tinvest import (
+    AsyncClient,
+    Backoff,
+    CandleResolution,
+    LimitOrderRequest,
+    MarketOrderRequest,
+    OperationType,
+    RetryPolicy,
+    SyncClient,
+)
+from tinvest.apis import MarketApi, OrdersApi
+from tinvest.retry import parse_retry_after
+
+
+@pytest.fixture()
+def policy():
+    return RetryPolicy(attempts=3, backoff=Backoff(base=0.001, jitter=0))
+
+
+def test_parse_retry_after():
+    date = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+    assert parse_retry_after('2') == 2
+    assert parse_retry_after('-1') == 0
+    assert 25 < parse_retry_after(format_datetime(date, usegmt=True)) <= 30
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(None) is None
+
+
+def test_policy_values():
+    with pytest.raises(ValueError):
+        RetryPolicy(attempts=0)
+
+
+def test_retry_state(policy):
+    state = policy.start('get')
+
+    assert state.on_response(200, {}) is None
+    assert state.on_response(503, {}) == 0.001
+    assert state.on_response(429, {'Retry-After': '0.5'}) == 0.5
+    assert state.on_response(503, {}) is None
+    assert policy.stats.as_dict() == {
+        'requests': 1,
+        'retries': 2,
+        'gave_up': 1,
+        'delays': policy.stats.delays.as_dict(),
+        'reasons': {'503': 1, '429': 1},
+    }
+    assert policy.stats.delays.max == 0.5
+
+
+def test_retry_state_not_retried(policy):
+    assert policy.start('POST').on_response(503, {}) is None
+    assert policy.start('POST').on_error(requests.Timeout()) is None
+    assert policy.stats.retries == 0
+
+
+def test_deadline():
+    policy = RetryPolicy(attempts=5, deadline=1)
+    state = policy.start('GET')
+
+    assert state.on_response(503, {'Retry-After': '2'}) is None
+    assert policy.stats.gave_up == 1
+
+
+def _async_response(status, error=None):
+    response = asynctest.MagicMock()
+    response.status = status
+    response.headers = {}
+    context = asynctest.MagicMock()
+    context.__aenter__.return_value = response
+    context.__aenter__.side_effect = error
+    return context
+
+
+@pytest.mark.asyncio
+async def test_async_client(token, policy):
+    session = asynctest.MagicMock()
+    failed = _async_response(503)
+    session.request.side_effect = [
+        _async_response(None, aiohttp.ServerDisconnectedError()),
+        failed,
+        _async_response(200),
+    ]
+    client = AsyncClient(token, session=session, retry_policy=policy)
+
+    async with client.request('GET', '/market/candles', None) as response:
+        assert response.status == 200
+
+    assert session.request.call_count == 3
+    failed.__aexit__.assert_awaited_once()
+    assert policy.stats.reasons == {'ServerDisconnectedError': 1, '503': 1}
+
+
+@pytest.mark.asyncio
+async def test_async_client_gives_up(token, policy):
+    session = asynctest.MagicMock()
+    session.request.side_effect = [_async_response(503) for _ in range(3)]
+    client = AsyncClient(token, session=session, retry_policy=policy)
+
+    async with client.request('GET', '/market/candles', None) as response:
+        assert response.status == 503
+    assert policy.stats.gave_up == 1
+
+
+@pytest.mark.asyncio
+async def test_orders_are_not_retried(token, policy):
+    session = asynctest.MagicMock()
+    session.request.return_value = _async_response(
+        None, aiohttp.ServerDisconnectedError()
+    )
+    client = AsyncClient(token, session=session, retry_policy=policy)
+    body = MarketOrderRequest(lots=1, operation=OperationType.buy)
+
+    with pytest.raises(aiohttp.ServerDisconnectedError):
+        async with OrdersApi(client).orders_market_order_post('A', body):
+            pass
+    assert session.request.call_count == 1
+
+
+def _sync_response(mocker, status, headers=None):
+    response = mocker.Mock()
+    response.status_code = status
+    response.headers = headers or {}
+    return response
+
+
+def test_sync_client(mocker, token, policy):
+    session = mocker.Mock()
+    failed = _sync_response(mocker, 429, {'Retry-After': '0'})
+    session.request.side_effect = [
+        requests.ConnectionError(),
+        failed,
+        _sync_response(mocker, 200),
+    ]
+    client = SyncClient(token, session=session, retry_policy=policy)
+
+    response = MarketApi(client).market_candles_get(
+        'A', '2020-01-01', '2020-01-02', CandleResolution.day
+    )
+
+    assert response.status_code == 200
+    assert session.request.call_count == 3
+    failed.close.assert_called_once_with()
+    assert policy.stats.delays.as_dict()['count'] == 2
+
+
+def test_sync_client_orders_are_not_retried(mocker, token, policy):
+    session = mocker.Mock()
+    session.request.return_value = _sync_response(mocker, 503)
+    client = SyncClient(token, session=session, retry_policy=policy)
+    body = LimitOrderRequest(lots=1, operation=OperationType.buy, price=1)
+
+    response = OrdersApi(client).orders_limit_order_post('A', body)
+
+    assert response.status_code == 503
+    assert session.request.call_count == 1
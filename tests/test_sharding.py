@@ -0,0 +1,235 @@
+# pylint:disable=redefined-outer-name
+# pylint:disable=unused-argument
+# pylint:disable=protected-access
+import asyncio
+
+import aiohttp
+import pytest
+
+from tinvest import (
+    CandleResolution,
+    QueueDispatcher,
+    RateLimiter,
+    ShardedStreaming,
+    StreamingConfig,
+    StreamingEvents,
+    SubscriptionRegistry,
+)
+from tinvest.sharding import HashRing, _run_process
+
+FIGIS = [f'BBG{i:09}' for i in range(200)]
+
+
+class FakeWs:
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+
+@pytest.fixture()
+async def sharded():
+    _sharded = ShardedStreaming('TOKEN', shards=3)
+    yield _sharded
+    await _sharded.close()
+
+
+def test_hash_ring_distribution():
+    ring = HashRing(range(4))
+    owners = [ring.get(figi) for figi in FIGIS]
+
+    assert set(owners) == {0, 1, 2, 3}
+    assert all(owners.count(node) > 20 for node in range(4))
+
+
+def test_hash_ring_remove_moves_only_removed_node_keys():
+    ring = HashRing(range(4))
+    before = {figi: ring.get(figi) for figi in FIGIS}
+    ring.remove(2)
+    after = {figi: ring.get(figi) for figi in FIGIS}
+
+    assert 2 not in ring
+    assert len(ring) == 3
+    assert all(before[figi] == after[figi] for figi in FIGIS if before[figi] != 2)
+    assert all(after[figi] != 2 for figi in FIGIS)
+
+    ring.add(2)
+    assert {figi: ring.get(figi) for figi in FIGIS} == before
+
+
+def test_hash_ring_empty():
+    with pytest.raises(LookupError):
+        HashRing().get('figi')
+
+
+@pytest.mark.asyncio
+async def test_sharded_subscribe_routes_to_owner(sharded):
+    for figi in FIGIS[:30]:
+        await sharded.api.candle.subscribe(figi, CandleResolution.min1)
+    await sharded.api.candle.subscribe(FIGIS[0], CandleResolution.min1)
+
+    assert len(sharded.subscriptions) == 30
+    assert isinstance(sharded.api.subscriptions, SubscriptionRegistry)
+    assert len(sharded.api.subscriptions) == 30
+    for index, shard in enumerate(sharded.shards):
+        assert all(
+            sharded.get_shard(payload['figi']) == index
+            for _, payload in shard.subscriptions
+        )
+
+
+@pytest.mark.asyncio
+async def test_sharded_subscribe_sends_to_connected_owner(sharded, figi):
+    owner = sharded.shards[sharded.get_shard(figi)]
+    owner.ws = FakeWs()
+
+    await sharded.api.orderbook.subscribe(figi, 5)
+    await sharded.api.orderbook.unsubscribe(figi, 5)
+
+    assert owner.ws.sent == [
+        {'event': 'orderbook:subscribe', 'figi': figi, 'depth': 5},
+        {'event': 'orderbook:unsubscribe', 'figi': figi, 'depth': 5},
+    ]
+    assert not sharded.subscriptions
+
+
+@pytest.mark.asyncio
+async def test_sharded_send_throttled(mocker, figi):
+    limiter = RateLimiter()
+    acquire = mocker.patch.object(limiter, 'acquire')
+    sharded = ShardedStreaming(
+        'TOKEN', shards=3, config=StreamingConfig(rate_limiter=limiter)
+    )
+    owner = sharded.shards[sharded.get_shard(figi)]
+    owner.ws = FakeWs()
+
+    await sharded.api.candle.subscribe(figi, CandleResolution.min1)
+    await sharded.api.candle.unsubscribe(figi, CandleResolution.min1)
+    await sharded.close()
+
+    assert acquire.call_count == 2
+    assert len(owner.ws.sent) == 2
+
+
+@pytest.mark.asyncio
+async def test_sharded_rebalance(sharded):
+    for figi in FIGIS[:30]:
+        await sharded.api.instrument_info.subscribe(figi)
+    down = sharded.shards[0]
+    count = len(down.subscriptions)
+
+    await sharded._shard_down(down)
+
+    assert not down.subscriptions
+    assert len(sharded.subscriptions) == 30
+
+    await sharded._shard_up(down)
+
+    assert len(down.subscriptions) == count
+    assert len(sharded.subscriptions) == 30
+
+
+@pytest.mark.asyncio
+async def test_sharded_handlers(sharded):
+    events = StreamingEvents()
+
+    @events.candle()
+    async def handle_candle(api, payload):
+        pass
+
+    sharded.add_handlers(events)
+    sharded.add_handlers([('orderbook', handle_candle)])
+
+    for shard in sharded.shards:
+        assert shard._get_handlers('candle') == [handle_candle]
+        assert shard._create_api(None) is sharded.api
+
+
+@pytest.mark.asyncio
+async def test_sharded_run(sharded, mocker):
+    runs = []
+
+    async def run(self):
+        runs.append(self.index)
+
+    mocker.patch('tinvest.sharding._Shard.run', run)
+    await sharded.run()
+
+    assert sorted(runs) == [0, 1, 2]
+
+
+@pytest.mark.parametrize(
+    'kwargs',
+    [
+        {'shards': 0},
+        {'processes': True, 'session': object()},
+        {'config': StreamingConfig(subscriptions=SubscriptionRegistry())},
+        {'config': StreamingConfig(dispatcher=QueueDispatcher())},
+    ],
+)
+def test_sharded_invalid_arguments(kwargs):
+    with pytest.raises(ValueError):
+        ShardedStreaming('TOKEN', **kwargs)
+
+
+def test_sharded_processes_without_shards():
+    sharded = ShardedStreaming('TOKEN', processes=True)
+
+    assert not sharded.shards
+    assert asyncio.iscoroutinefunction(sharded.run)
+
+
+@pytest.mark.asyncio
+async def test_sharded_own_sessions(sharded):
+    first, second = sharded.shards[:2]
+
+    await first.close()
+
+    assert first._session.closed
+    assert not second._session.closed
+
+
+@pytest.mark.asyncio
+async def test_sharded_shared_session_closed_once():
+    session = aiohttp.ClientSession()
+    sharded = ShardedStreaming('TOKEN', shards=2, session=session)
+
+    for shard in sharded.shards:
+        await shard.close()
+    assert not session.closed
+
+    await sharded.close()
+    assert session.closed
+
+
+@pytest.mark.asyncio
+async def test_sharded_processes_subscribe_before_run(figi):
+    sharded = ShardedStreaming('TOKEN', shards=3, processes=True)
+    owner = sharded.get_shard(figi)
+
+    await sharded.api.orderbook.subscribe(figi, 5)
+
+    assert len(sharded.subscriptions) == 1
+
+    sharded._create_shards([owner])
+    shard = sharded.shards[0]
+
+    assert len(sharded.shards) == 1
+    assert shard.index == owner
+    assert list(shard.subscriptions) == [('orderbook', {'figi': figi, 'depth': 5})]
+    await sharded.close()
+
+
+def test_run_process_creates_own_shard(mocker):
+    sharded = ShardedStreaming('TOKEN', shards=3, processes=True)
+    runs = []
+
+    async def run(self):
+        runs.append(self.index)
+
+    mocker.patch('tinvest.sharding._Shard.run', run)
+    _run_process(sharded, 1)
+
+    assert runs == [1]
+    assert [shard.index for shard in sharded.shards] == [1]
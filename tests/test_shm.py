@@ -0,0 +1,176 @@
+# pylint:disable=redefined-outer-name
+# pylint:disable=protected-access
+# pylint:disable=unused-argument
+import asyncio
+from datetime import datetime, timezone
+
+import aiohttp
+import asynctest
+import pytest
+
+from tinvest import SharedMemoryPool, Streaming, StreamingConfig, StreamingEvents
+from tinvest.shm import _SLOT_SIZE, _encode, _Worker
+
+SERVER_TIME = datetime(2020, 1, 2, 3, 4, 5, 678000, tzinfo=timezone.utc)
+ORDERBOOK = {
+    'figi': 'BBG0013HGFT4',
+    'depth': 2,
+    'bids': [[100.5, 10], [100.0, 20]],
+    'asks': [[101.0, 5]],
+}
+CANDLE = {
+    'figi': 'BBG0013HGFT4',
+    'interval': '1min',
+    'time': '2020-01-02T03:04:00Z',
+    'o': 1.0,
+    'h': 3.0,
+    'l': 0.5,
+    'c': 2.0,
+    'v': 7,
+}
+
+
+def spread(api, book, server_time):
+    return api, book.spread, server_time
+
+
+def close(api, candle):
+    return candle.figi, candle.interval.value, candle.c
+
+
+def fail(api, payload):
+    raise ZeroDivisionError
+
+
+@pytest.fixture()
+def pool():
+    results = []
+    errors = []
+    pool = SharedMemoryPool(
+        1,
+        on_result=lambda handler, result: results.append((handler, result)),
+        on_error=lambda handler, error: errors.append((handler, error)),
+    )
+    pool.results, pool.failures = results, errors
+    yield pool
+    pool.close()
+
+
+async def wait(pool):
+    while pool.pending:
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.parametrize(
+    ('event_name', 'payload', 'handler', 'expected'),
+    [
+        ('orderbook', ORDERBOOK, spread, (None, 0.5, SERVER_TIME)),
+        ('candle', CANDLE, close, ('BBG0013HGFT4', '1min', 2.0)),
+    ],
+)
+def test_encode_decode(event_name, payload, handler, expected):
+    buf = bytearray(_SLOT_SIZE * 2)
+    _encode(buf, _SLOT_SIZE, event_name, payload, 1577934245678000000)
+    worker = _Worker(buf, [handler])
+
+    assert worker.run(1, [0]) == [(True, expected)]
+
+
+@pytest.mark.asyncio
+async def test_pool(pool):
+    pool.register('orderbook', spread)
+    pool.register('candle', close)
+    pool.register('candle', fail)
+
+    await pool._entries['orderbook'].call_event('api', ORDERBOOK, SERVER_TIME)
+    await pool._entries['candle'].call_event('api', CANDLE, SERVER_TIME)
+    await wait(pool)
+
+    assert sorted(pool.results, key=repr) == sorted(
+        [(spread, (None, 0.5, SERVER_TIME)), (close, ('BBG0013HGFT4', '1min', 2.0))],
+        key=repr,
+    )
+    assert [handler for handler, _ in pool.failures] == [fail]
+    assert isinstance(pool.failures[0][1], ZeroDivisionError)
+    assert pool.errors == 1
+    assert pool.latency.count == 2
+
+
+@pytest.mark.asyncio
+async def test_pool_waits_for_free_slot():
+    results = []
+    pool = SharedMemoryPool(1, slots=1, on_result=lambda _, r: results.append(r))
+    entry = pool.register('candle', close)
+
+    for c in range(3):
+        await entry.call_event(None, dict(CANDLE, c=c), None)
+        assert pool.pending <= 1
+    await wait(pool)
+    pool.close()
+
+    assert [result[2] for result in results] == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_close_does_not_wait(pool, mocker):
+    pool.start()
+    shutdown = mocker.spy(pool._executor, 'shutdown')
+
+    pool.close()
+
+    shutdown.assert_called_once_with(wait=False)
+    assert pool._executor is None
+
+
+def test_register(pool):
+    entry = pool.register('candle', close)
+
+    assert pool.register('candle', close) is entry
+    assert pool.register('candle', fail) is entry
+    assert len(pool._handlers) == 2
+    with pytest.raises(ValueError):
+        pool.register('instrument_info', close)
+
+
+@pytest.mark.asyncio
+async def test_register_after_start(pool):
+    pool.register('candle', close)
+    pool.start()
+
+    with pytest.raises(RuntimeError):
+        pool.register('candle', fail)
+
+
+def test_slots():
+    with pytest.raises(ValueError):
+        SharedMemoryPool(slots=0)
+
+
+@pytest.mark.asyncio
+async def test_streaming(pool):
+    events = StreamingEvents()
+    events.candle(process=True)(close)
+    events.orderbook(process=True)(spread)
+    calls = []
+
+    @events.candle()
+    async def handle_candle(api, payload):
+        calls.append(payload)
+
+    session = asynctest.Mock(aiohttp.ClientSession, autospec=True)
+    streaming = Streaming(
+        'token', session=session, config=StreamingConfig(process_pool=pool)
+    )
+    streaming.add_handlers(events)
+
+    await streaming._dispatch_event('candle', None, CANDLE, SERVER_TIME)
+    await streaming._dispatch_event('orderbook', None, ORDERBOOK, SERVER_TIME)
+    await wait(pool)
+
+    assert calls == [CANDLE]
+    assert len(pool.results) == 2
+    assert streaming._get_handlers('candle') == [handle_candle]
+
+    await streaming.close()
+    assert pool._executor is None
+    assert pool._ring.shm is None
@@ -0,0 +1,207 @@
+# pylint:disable=redefined-outer-name
+# pylint:disable=unused-argument
+# pylint:disable=protected-access
+import asyncio
+import multiprocessing
+from array import array
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from tinvest import CandleColumns, CandleResolution, CandleSeries, CandleStore
+from tinvest.cli import main
+from tinvest.utils import parse_time, to_ns
+
+START = datetime(2020, 9, 25, tzinfo=timezone.utc)
+
+
+def _candle(figi, minute, c=100.0):
+    return {
+        'figi': figi,
+        'interval': '1min',
+        'time': (START + timedelta(minutes=minute)).isoformat(),
+        'o': 100.0,
+        'c': c,
+        'h': 101.0,
+        'l': 99.0,
+        'v': minute,
+    }
+
+
+def _minutes(columns):
+    return [(t - to_ns(START)) // 60_000_000_000 for t in columns.time]
+
+
+@pytest.fixture()
+def store(tmp_path):
+    return CandleStore(tmp_path)
+
+
+@pytest.fixture()
+def series(store):
+    series = store.series('A', '1min')
+    series.append([_candle('A', minute, c=100 + minute) for minute in range(10)])
+    return series
+
+
+def test_read(series):
+    columns = series.read()
+
+    assert len(series) == 10
+    assert _minutes(columns) == list(range(10))
+    assert list(columns.c) == [100.0 + minute for minute in range(10)]
+    assert columns.v.tolist() == list(range(10))
+    assert isinstance(columns.time, memoryview)
+    assert series.last_time() == to_ns(START + timedelta(minutes=9))
+
+
+def test_read_range(series):
+    assert _minutes(series.read(START + timedelta(minutes=3))) == list(range(3, 10))
+    assert _minutes(series.read(to=START + timedelta(minutes=2))) == [0, 1]
+    assert _minutes(series.read('2020-09-25T00:02:30', '2020-09-25T00:05:00')) == [3, 4]
+    assert len(series.read(START + timedelta(days=1))) == 0
+
+
+def test_read_empty(store):
+    series = store.series('B', CandleResolution.day)
+
+    assert len(series.read()) == 0
+    assert series.last_time() is None
+    assert store.keys() == []
+
+
+def test_append_skips_stored(series):
+    assert series.append([_candle('A', minute) for minute in range(8, 12)]) == 2
+    assert series.append([_candle('A', 11)]) == 0
+    assert _minutes(series.read()) == list(range(12))
+
+
+def test_append_columns(series):
+    columns = CandleColumns('A', '1min', [_candle('A', 20), _candle('A', 21)])
+
+    assert series.append(columns) == 2
+    assert series.read()[-1]['v'] == 21
+
+
+def test_append_unordered(series):
+    with pytest.raises(ValueError):
+        series.append([_candle('A', 21), _candle('A', 20)])
+
+
+def test_interrupted_append(series):
+    with open(series._file('o'), 'ab') as f:
+        f.write(array('d', [1.0, 2.0]))
+
+    assert series.append([_candle('A', 10)]) == 1
+    assert series._file('o').stat().st_size == 11 * 8
+    assert list(series.read().o) == [100.0] * 11
+
+
+def test_interrupted_time_append(series):
+    with open(series._file('o'), 'ab') as f:
+        f.write(array('d', [1.0]))
+    with open(series._file('time'), 'ab') as f:
+        f.write(b'\x00' * 3)
+
+    assert len(series) == 10
+    assert series.append([_candle('A', 10)]) == 1
+    assert series._file('time').stat().st_size == 11 * 8
+    assert _minutes(series.read()) == list(range(11))
+
+
+def test_lock(series):
+    with series.lock():
+        with pytest.raises(BlockingIOError):
+            with CandleSeries(series.path, 'A', '1min').lock(blocking=False):
+                pass
+
+
+def _read_len(path, queue):
+    queue.put(len(CandleStore(path).read('A', '1min')))
+
+
+def test_read_from_process(store, series):
+    queue = multiprocessing.get_context('spawn').Queue()
+    process = multiprocessing.get_context('spawn').Process(
+        target=_read_len, args=(store.path, queue)
+    )
+    process.start()
+    process.join(30)
+
+    assert queue.get(timeout=1) == 10
+
+
+def test_keys(store, series):
+    store.series('B', 'day').append([{**_candle('B', 0), 'interval': 'day'}])
+
+    assert store.keys() == [('A', CandleResolution.min1), ('B', CandleResolution.day)]
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.status = 200
+        self._data = data
+
+    def raise_for_status(self):
+        pass
+
+    async def json(self):
+        return self._data
+
+
+class FakeClient:
+    def __init__(self, minutes):
+        self.minutes = minutes
+        self.requests = []
+
+    @asynccontextmanager
+    async def request(self, method, path, response_model, **kwargs):
+        params = kwargs['params']
+        self.requests.append(params)
+        await asyncio.sleep(0)
+        from_, to = parse_time(params['from']), parse_time(params['to'])
+        candles = [
+            _candle(params['figi'], minute)
+            for minute in range(self.minutes)
+            if from_ <= START + timedelta(minutes=minute) <= to
+        ]
+        yield FakeResponse({'payload': {'candles': candles}})
+
+
+@pytest.mark.asyncio
+async def test_sync(store, series):
+    client = FakeClient(minutes=30)
+    until = START + timedelta(minutes=20, seconds=30)
+
+    appended = await store.sync(client, ['A', 'B'], '1min', since=START, until=until)
+
+    # the candle of 00:20 is not finished
+    assert appended == {'A': 10, 'B': 20}
+    assert _minutes(store.read('A', '1min')) == list(range(20))
+    assert _minutes(store.read('B', '1min')) == list(range(20))
+    assert parse_time(client.requests[0]['from']) > START + timedelta(minutes=9)
+
+    appended = await store.sync(client, ['A'], '1min', since=START)
+    assert appended == {'A': 10}
+
+
+def test_cli_sync(mocker, tmp_path):
+    sync = mocker.patch('tinvest.cli.sync.sync')
+    mocker.patch(
+        'sys.argv',
+        ['tinvest', 'sync', str(tmp_path), '1min', 'A', 'B', '--token', 'T'],
+    )
+
+    main.run()
+
+    sync.assert_called_once_with(
+        str(tmp_path), '1min', ['A', 'B'], token='T', since=None
+    )
+
+
+def test_cli_sync_usage(mocker):
+    mocker.patch('sys.argv', ['tinvest', 'sync', 'path', '--token', 'T'])
+
+    with pytest.raises(SystemExit):
+        main.run()
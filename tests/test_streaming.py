@@ -2,11 +2,30 @@
 # pylint:disable=unused-argument
 # pylint:disable=unused-variable
 # pylint:disable=protected-access
+import asyncio
+import inspect
+import json
+from datetime import datetime, timezone
+
 import aiohttp
 import asynctest
 import pytest
 
-from tinvest import CandleResolution, Streaming, StreamingApi, StreamingEvents
+from tinvest import (
+    Backoff,
+    CandleResolution,
+    ErrorStreaming,
+    LazyOrderbookStreaming,
+    OrderbookStreaming,
+    QueueDispatcher,
+    Streaming,
+    StreamingApi,
+    StreamingConfig,
+    StreamingEvents,
+)
+
+# one connection attempt of the reconnecting `Streaming.run`
+run_once = inspect.unwrap(Streaming.run)
 
 
 @pytest.fixture()
@@ -174,3 +193,242 @@ def test_streaming_events(streaming_events):
 
     assert some_func.__name__ == 'some_func'
     assert some_func()
+
+
+@pytest.mark.asyncio
+async def test_streaming_dispatch_table(streaming_events):
+    @streaming_events.candle()
+    async def candle(api, payload, server_time):
+        pass
+
+    @streaming_events.candle()
+    def sync_candle(api, payload):
+        pass
+
+    streaming = Streaming('TOKEN').add_handlers(streaming_events)
+    handlers = streaming._dispatch['candle']
+
+    assert [handler.func for handler in handlers] == [candle, sync_candle]
+    assert [handler.is_async for handler in handlers] == [True, False]
+    assert [handler.receive_server_time for handler in handlers] == [True, False]
+    assert 'orderbook' not in streaming._dispatch
+
+
+@pytest.mark.asyncio
+async def test_streaming_dispatch_event(streaming_events):
+    calls = []
+
+    @streaming_events.candle()
+    async def candle(api, payload, server_time):
+        calls.append((api, payload, server_time))
+
+    @streaming_events.candle()
+    def sync_candle(api, payload):
+        calls.append((api, payload))
+
+    streaming = Streaming('TOKEN').add_handlers(streaming_events)
+    await streaming._dispatch_event('candle', 'api', 'payload', 'time')
+    await streaming._dispatch_event('orderbook', 'api', 'payload', 'time')
+
+    assert sorted(calls) == [('api', 'payload'), ('api', 'payload', 'time')]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ('time_ns', 'expected'),
+    [
+        (False, datetime(2019, 8, 7, 15, 35, 0, 123456, tzinfo=timezone.utc)),
+        (True, 1565192100123456789),
+    ],
+)
+async def test_streaming_time_ns(streaming_events, time_ns, expected):
+    calls = []
+
+    @streaming_events.orderbook()
+    async def orderbook(api, payload, server_time):
+        calls.append(server_time)
+
+    streaming = Streaming(
+        'TOKEN', config=StreamingConfig(time_ns=time_ns)
+    ).add_handlers(streaming_events)
+    message = {
+        'event': 'orderbook',
+        'time': '2019-08-07T15:35:00.123456789Z',
+        'payload': {'figi': 'BBG0013HGFT4', 'depth': 1, 'bids': [], 'asks': []},
+    }
+    await streaming._handle_message('api', json.dumps(message))
+
+    assert calls == [expected]
+
+
+@pytest.mark.asyncio
+async def test_streaming_config_loads():
+    calls = []
+
+    def loads(raw):
+        calls.append(raw)
+        return json.loads(raw)
+
+    streaming = Streaming('TOKEN', config=StreamingConfig(loads=loads))
+    message = json.dumps(
+        {'event': 'some_event', 'time': '2019-08-07T15:35:00Z', 'payload': {}}
+    )
+
+    await streaming._handle_message(None, message)
+
+    assert calls == [message]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('trusted', [True, False])
+async def test_streaming_trusted_parsers(trusted):
+    payload = {
+        'figi': 'BBG0013HGFT4',
+        'depth': 1,
+        'bids': [[64.3525, 204]],
+        'asks': [[64.38, 168]],
+    }
+    streaming = Streaming('TOKEN', config=StreamingConfig(trusted=trusted))
+
+    orderbook = streaming._parser.parsers['orderbook'](payload)
+
+    assert isinstance(orderbook, OrderbookStreaming)
+    assert orderbook.figi == 'BBG0013HGFT4'
+    assert 'unknown_event' not in streaming._parser.parsers
+
+
+@pytest.mark.asyncio
+async def test_streaming_lazy_parsers():
+    streaming = Streaming('TOKEN', config=StreamingConfig(lazy=True))
+
+    assert streaming._parser.parsers['orderbook'] is LazyOrderbookStreaming
+    assert streaming._parser.parsers['error'] == ErrorStreaming.parse_obj
+
+
+@pytest.mark.asyncio
+async def test_streaming_handle_event_with_dispatcher(streaming_events, mocker):
+    @streaming_events.orderbook()
+    async def orderbook(api, payload):
+        pass
+
+    dispatcher = QueueDispatcher()
+    put = mocker.patch.object(dispatcher, 'put', asynctest.CoroutineMock())
+    streaming = Streaming('TOKEN', config=StreamingConfig(dispatcher=dispatcher))
+    streaming.add_handlers(streaming_events)
+
+    await streaming._handle_event('orderbook', 'api', 'payload', 'time')
+
+    put.assert_called_once_with(
+        'orderbook', streaming._dispatch['orderbook'], 'api', 'payload', 'time'
+    )
+
+
+@pytest.mark.asyncio
+async def test_streaming_latest_only(streaming_events):
+    calls = []
+
+    @streaming_events.orderbook(latest_only=True)
+    async def orderbook(api, payload):
+        calls.append(payload.bids[0][0])
+        await asyncio.sleep(0.01)
+
+    streaming = Streaming('TOKEN').add_handlers(streaming_events)
+    for price in range(5):
+        payload = OrderbookStreaming(
+            figi='BBG0013HGFT4', depth=1, bids=[(price, 1)], asks=[]
+        )
+        await streaming._handle_event('orderbook', 'api', payload, 'time')
+    await asyncio.sleep(0.05)
+
+    assert calls == [0, 4]
+    assert streaming.skipped_snapshots == {orderbook: {('BBG0013HGFT4', 1): 3}}
+    await streaming._close_dispatch()
+
+
+def test_handler_options_not_set_on_function(streaming_events):
+    async def orderbook(api, payload):
+        pass
+
+    streaming_events.orderbook(latest_only=True)(orderbook)
+    streaming_events.orderbook()(orderbook)
+
+    assert streaming_events.handlers == [
+        ('orderbook', orderbook, {'latest_only': True}),
+        ('orderbook', orderbook),
+    ]
+    assert not hasattr(orderbook, 'latest_only__')
+    streaming = Streaming('TOKEN').add_handlers(streaming_events)
+    assert [h.latest_only is not None for h in streaming._dispatch['orderbook']] == [
+        True,
+        False,
+    ]
+
+
+class FakeWs:
+    def __init__(self, *messages):
+        self.sent = []
+        self.messages = [
+            aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, json.dumps(message), None)
+            for message in messages
+        ]
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+    async def __aiter__(self):
+        for message in self.messages:
+            yield message
+
+
+@pytest.mark.asyncio
+async def test_streaming_resubscribe_before_startup(streaming_events, session, figi):
+    streaming = Streaming('TOKEN', session=session)
+    streaming.subscriptions.add('instrument_info', {'figi': figi})
+
+    @streaming_events.startup()
+    async def startup(api):
+        await api.instrument_info.subscribe(figi)
+        await api.orderbook.subscribe(figi, 5)
+
+    ws = FakeWs()
+    await streaming.add_handlers(streaming_events)._run(ws)
+
+    assert ws.sent == [
+        {'event': 'instrument_info:subscribe', 'figi': figi},
+        {'event': 'orderbook:subscribe', 'figi': figi, 'depth': 5},
+    ]
+    assert len(streaming.subscriptions) == 2
+
+
+@pytest.mark.asyncio
+async def test_streaming_reconnect_keeps_session(streaming_events, session, mocker):
+    sleep = mocker.patch('asyncio.sleep', asynctest.CoroutineMock())
+    session.ws_connect.side_effect = aiohttp.ClientConnectorError(
+        mocker.Mock(), OSError()
+    )
+    reconnect = mocker.Mock()
+    streaming_events.reconnect()(reconnect)
+    streaming = Streaming(
+        'TOKEN',
+        session=session,
+        config=StreamingConfig(backoff=Backoff(base=1, jitter=0)),
+    ).add_handlers(streaming_events)
+
+    await run_once(streaming)
+    await run_once(streaming)
+
+    assert [c.args for c in sleep.call_args_list] == [(1,), (2,)]
+    assert streaming.reconnect_stats.attempts == 2
+    assert reconnect.call_count == 2
+    session.close.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_streaming_cancel_closes_session(session):
+    session.ws_connect.side_effect = asyncio.CancelledError
+    streaming = Streaming('TOKEN', session=session)
+
+    with pytest.raises(asyncio.CancelledError):
+        await run_once(streaming)
+
+    session.close.assert_called_once_with()
@@ -0,0 +1,98 @@
+# pylint:disable=redefined-outer-name
+import aiohttp
+import asynctest
+import pytest
+
+from tinvest import (
+    CandleResolution,
+    Streaming,
+    StreamingApi,
+    StreamingConfig,
+    SubscriptionRegistry,
+)
+from tinvest.schemas import EventName
+
+
+@pytest.fixture()
+def ws():
+    return asynctest.Mock(aiohttp.ClientWebSocketResponse, autospec=True)
+
+
+@pytest.fixture()
+def registry():
+    return SubscriptionRegistry(batch_size=2, pause=1)
+
+
+@pytest.fixture()
+def streaming_api(ws, registry):
+    return StreamingApi(ws, subscriptions=registry)
+
+
+def test_registry_add(registry, figi):
+    payload = {'figi': figi, 'interval': CandleResolution.min1}
+
+    assert registry.add(EventName.candle, {**payload, 'request_id': '1'})
+    assert not registry.add('candle', {'figi': figi, 'interval': '1min'})
+    assert registry.add(EventName.candle, {'figi': figi, 'interval': '5min'})
+    assert ('candle', payload) in registry
+    assert list(registry)[0] == (EventName.candle, payload)
+    assert len(registry) == 2
+
+
+def test_registry_remove(registry, figi):
+    payload = {'figi': figi, 'depth': 5}
+    registry.add(EventName.orderbook, payload)
+
+    assert registry.remove(EventName.orderbook, payload)
+    assert not registry.remove(EventName.orderbook, payload)
+    assert not registry
+
+
+def test_registry_batch_size():
+    with pytest.raises(ValueError):
+        SubscriptionRegistry(batch_size=0)
+
+
+@pytest.mark.asyncio
+async def test_registry_resubscribe(registry, ws, mocker):
+    sleep = mocker.patch('asyncio.sleep', asynctest.CoroutineMock())
+    for figi in ('A', 'B', 'C', 'D', 'E'):
+        registry.add(EventName.instrument_info, {'figi': figi})
+
+    await registry.resubscribe(ws)
+
+    assert ws.send_json.call_count == 5
+    ws.send_json.assert_any_call({'event': 'instrument_info:subscribe', 'figi': 'E'})
+    assert sleep.call_count == 2
+    sleep.assert_called_with(1)
+
+
+@pytest.mark.asyncio
+async def test_streaming_api_deduplicates_subscriptions(streaming_api, ws, figi):
+    await streaming_api.orderbook.subscribe(figi, 5)
+    await streaming_api.orderbook.subscribe(figi, 5, 'request_id')
+    await streaming_api.orderbook.subscribe(figi, 10)
+
+    assert ws.send_json.call_count == 2
+    assert len(streaming_api.subscriptions) == 2
+
+
+@pytest.mark.asyncio
+async def test_streaming_api_unsubscribe(streaming_api, ws, figi):
+    await streaming_api.candle.subscribe(figi, CandleResolution.min1)
+    await streaming_api.candle.unsubscribe(figi, CandleResolution.min1)
+    await streaming_api.candle.subscribe(figi, CandleResolution.min1)
+
+    assert ws.send_json.call_count == 3
+    ws.send_json.assert_any_call(
+        {'event': 'candle:unsubscribe', 'figi': figi, 'interval': '1min'}
+    )
+    assert len(streaming_api.subscriptions) == 1
+
+
+def test_streaming_keeps_empty_registry():
+    registry = SubscriptionRegistry(batch_size=7)
+
+    streaming = Streaming('TOKEN', config=StreamingConfig(subscriptions=registry))
+
+    assert streaming.subscriptions is registry
@@ -1,4 +1,6 @@
 # pylint:disable=redefined-outer-name
+import json
+
 import pytest
 
 from tinvest.constants import PRODUCTION
@@ -66,3 +68,39 @@ def test_response_wrapper_attr(mocker):
     response_wrapper = ResponseWrapper(response, Empty)
 
     assert response_wrapper.json() == {}
+
+
+def test_response_wrapper_loads(mocker, empty):
+    response = mocker.Mock()
+    response.headers = {'Content-Type': 'application/json; charset=utf-8'}
+    response.content = empty.json(by_alias=True).encode()
+    loads = mocker.Mock(wraps=json.loads)
+    response_wrapper = ResponseWrapper(response, Empty, loads)
+
+    assert response_wrapper.parse_json() == empty
+    loads.assert_called_once_with(response.content)
+    response.json.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    ('content_type', 'content'),
+    [('application/json', b''), ('text/html', b'<html>')],
+)
+def test_response_wrapper_loads_not_json(mocker, error, content_type, content):
+    response = mocker.Mock()
+    response.headers = {'Content-Type': content_type}
+    response.content = content
+    response.json.return_value = error.dict(by_alias=True)
+    loads = mocker.Mock(wraps=json.loads)
+    response_wrapper = ResponseWrapper(response, Empty, loads)
+
+    assert response_wrapper.parse_error() == error
+    loads.assert_not_called()
+
+
+def test_response_wrapper_trusted(mocker, empty):
+    response = mocker.Mock()
+    response.json.return_value = empty.dict(by_alias=True)
+    response_wrapper = ResponseWrapper(response, Empty)
+
+    assert response_wrapper.parse_json(trusted=True) == empty
@@ -1,9 +1,19 @@
-from datetime import datetime
+import json
+from datetime import datetime, timedelta, timezone
 
 import asynctest
 import pytest
-
-from tinvest.utils import Func, isoformat, set_default_headers
+from pydantic.datetime_parse import parse_datetime  # pylint:disable=E0611
+
+from tinvest.utils import (
+    Func,
+    get_json_loads,
+    isoformat,
+    parse_time,
+    parse_time_ns,
+    set_default_headers,
+    to_ns,
+)
 
 
 def test_set_default_headers(token):
@@ -55,3 +65,75 @@ async def test_async_func():
     assert await Func(some_async_func, 1, key='')() == 1
 
     some_async_func.assert_called_once_with(1, key='')
+
+
+@pytest.mark.parametrize('data', [b'{"a": [1, 2.5]}', '{"a": [1, 2.5]}'])
+def test_get_json_loads(data):
+    assert get_json_loads()(data) == {'a': [1, 2.5]}
+
+
+@pytest.mark.parametrize(
+    ('orjson', 'ujson', 'expected'),
+    [
+        ('orjson', 'ujson', 'orjson'),
+        (None, 'ujson', 'ujson'),
+        (None, None, json.loads),
+    ],
+)
+def test_get_json_loads_fallback(mocker, orjson, ujson, expected):
+    if orjson:
+        orjson = mocker.Mock(loads='orjson')
+    if ujson:
+        ujson = mocker.Mock(loads='ujson')
+    mocker.patch('tinvest.utils.orjson', orjson)
+    mocker.patch('tinvest.utils.ujson', ujson)
+
+    assert get_json_loads() == expected
+
+
+@pytest.mark.parametrize(
+    'value',
+    [
+        '2019-08-07T15:35:00Z',
+        '2019-08-07T15:35:00.1Z',
+        '2019-08-07T15:35:00.123456Z',
+        '2019-08-07T15:35:00.123456789Z',
+        '2019-08-07T18:35:00.123+03:00',
+        '2019-08-07T15:35:00',
+        '2019-08-07 15:35:00',
+        '2019-08-07T15:35:00+0300',
+        '1565192100',
+        1565192100,
+        datetime(2019, 8, 7, tzinfo=timezone.utc),
+    ],
+)
+def test_parse_time(value):
+    assert parse_time(value) == parse_datetime(value)
+
+
+def test_parse_time_invalid():
+    with pytest.raises(ValueError):
+        parse_time('2019-08-07T15:35:00.12x456Z')
+
+
+@pytest.mark.parametrize(
+    ('value', 'expected'),
+    [
+        ('2019-08-07T15:35:00Z', 1565192100000000000),
+        ('2019-08-07T15:35:00.123456789Z', 1565192100123456789),
+        ('2019-08-07T15:35:00.1234567Z', 1565192100123456700),
+        ('2019-08-07T18:35:00.12345678+03:00', 1565192100123456780),
+        ('2019-08-07T18:35:00.123456+03:00', 1565192100123456000),
+    ],
+)
+def test_parse_time_ns(value, expected):
+    assert parse_time_ns(value) == expected
+
+
+def test_to_ns():
+    dt = datetime(2019, 8, 7, 15, 35, 0, 123456, tzinfo=timezone.utc)
+
+    assert to_ns(dt) == 1565192100123456000
+    assert to_ns(dt.astimezone(timezone(timedelta(hours=3)))) == to_ns(dt)
+    assert to_ns(1) == 1
+    assert to_ns(datetime(2019, 8, 7)) == int(datetime(2019, 8, 7).timestamp()) * 10**9
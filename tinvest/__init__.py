@@ -11,6 +11,30 @@ from .apis import (
     UserApi,
 )
 from .async_client import AsyncClient
+from .backfill import CandleBackfill
+from .backoff import Backoff
+from .candles import AggregatedCandle, CandleAggregator
+from .columnar import CandleColumns
+from .dispatch import Overflow, QueueDispatcher
+from .executor import ExecutorKind, HandlerExecutor
+from .history import CandleHistory
+from .indicators import ATR, EMA, RSI, SMA, VWAP, Indicators, IndicatorUpdate
+from .isolation import (
+    BreakerState,
+    CircuitBreaker,
+    HandlerErrorStreaming,
+    HandlerIsolation,
+)
+from .latency import EventLatency, EventTimes, LatencyMonitor
+from .lazy import (
+    LazyCandleStreaming,
+    LazyInstrumentInfoStreaming,
+    LazyOrderbookStreaming,
+)
+from .orderbook import LocalOrderbook, LocalOrderbooks
+from .rate_limit import RateGroup, RateLimit, RateLimiter
+from .recording import Recorder, Replay
+from .retry import RetryPolicy, RetryStats
 from .schemas import (
     BrokerAccountType,
     Candle,
@@ -69,22 +93,69 @@ from .schemas import (
     UserAccounts,
     UserAccountsResponse,
 )
-from .streaming import Streaming, StreamingApi, StreamingEvents
+from .sharding import ShardedStreaming, ShardedStreamingApi
+from .shm import SharedMemoryPool
+from .store import CandleSeries, CandleStore
+from .streaming import Streaming, StreamingApi, StreamingConfig, StreamingEvents
+from .subscriptions import SubscriptionRegistry
 from .sync_client import SyncClient
 
 __all__ = (
     # Http Clients
     'AsyncClient',
     'SyncClient',
+    'RetryPolicy',
+    'RetryStats',
     # Streaming
     'Streaming',
     'StreamingApi',
     'StreamingEvents',
+    'StreamingConfig',
+    'QueueDispatcher',
+    'Overflow',
+    'HandlerExecutor',
+    'ExecutorKind',
+    'SharedMemoryPool',
+    'LatencyMonitor',
+    'EventLatency',
+    'EventTimes',
+    'HandlerIsolation',
+    'CircuitBreaker',
+    'BreakerState',
+    'HandlerErrorStreaming',
+    'RateLimiter',
+    'RateLimit',
+    'RateGroup',
+    'SubscriptionRegistry',
+    'Backoff',
+    'ShardedStreaming',
+    'ShardedStreamingApi',
+    'Recorder',
+    'Replay',
+    'LocalOrderbook',
+    'LocalOrderbooks',
+    'CandleAggregator',
+    'CandleBackfill',
+    'CandleHistory',
+    'CandleColumns',
+    'CandleStore',
+    'CandleSeries',
+    'Indicators',
+    'IndicatorUpdate',
+    'SMA',
+    'EMA',
+    'RSI',
+    'VWAP',
+    'ATR',
     # Streaming Schemas
     'InstrumentInfoStreaming',
     'OrderbookStreaming',
     'ErrorStreaming',
     'CandleStreaming',
+    'LazyCandleStreaming',
+    'LazyInstrumentInfoStreaming',
+    'LazyOrderbookStreaming',
+    'AggregatedCandle',
     # API Clients
     'OpenApi',
     'MarketApi',
@@ -1,11 +1,15 @@
-from contextlib import asynccontextmanager
-from typing import Any, AsyncIterator, Generic, Type, TypeVar
+import asyncio
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Generic, Optional, Type, TypeVar
 
-from aiohttp import ClientResponse, ClientSession
+from aiohttp import ClientConnectionError, ClientResponse, ClientSession
 from pydantic import BaseModel  # pylint:disable=no-name-in-module
 
 from .base_client import BaseClient
+from .construct import get_constructor
+from .rate_limit import get_rate_group
 from .schemas import Error
+from .typedefs import JsonLoads
 from .utils import set_default_headers
 
 __all__ = (
@@ -19,21 +23,41 @@ T = TypeVar('T', bound=BaseModel)  # pragma: no mutate
 class ResponseWrapper(Generic[T]):
     S = TypeVar('S', bound=BaseModel)
 
-    def __init__(self, response: ClientResponse, response_model: Type[T]):
+    def __init__(
+        self,
+        response: ClientResponse,
+        response_model: Type[T],
+        loads: Optional[JsonLoads] = None,
+    ):
         self._response = response
         self._response_model = response_model
+        self._loads = loads
 
     def __getattr__(self, name):
         return getattr(self._response, name)
 
-    async def parse_json(self, **kwargs: Any) -> Any:
+    async def parse_json(self, *, trusted: bool = False, **kwargs: Any) -> Any:
+        """
+        `trusted=True` builds the model without validation, see `get_constructor`.
+        """
+        if trusted:
+            return get_constructor(self._response_model)(await self.json(**kwargs))
         return await self._parse_json(self._response_model, **kwargs)
 
     async def parse_error(self, **kwargs: Any) -> Error:
         return await self._parse_json(Error, **kwargs)
 
     async def _parse_json(self, response_model: Type[S], **kwargs: Any) -> S:
-        return response_model.parse_obj(await self._response.json(**kwargs))
+        return response_model.parse_obj(await self.json(**kwargs))
+
+    async def json(self, **kwargs: Any) -> Any:
+        """
+        Decoded by `aiohttp` with the `loads` of the client: the content type
+        is checked and an empty body is `None`.
+        """
+        if self._loads is not None:
+            kwargs.setdefault('loads', self._loads)
+        return await self._response.json(**kwargs)
 
 
 class AsyncClient(BaseClient[ClientSession]):
@@ -48,9 +72,42 @@ class AsyncClient(BaseClient[ClientSession]):
     ) -> AsyncIterator[ResponseWrapper]:
         url = self._base_url + path
         set_default_headers(kwargs, self._token)
-
-        async with self.session.request(method, url, **kwargs) as response:
-            yield ResponseWrapper[T](response, response_model)
+        async with AsyncExitStack() as stack:
+            response = await self._send(stack, method, path, url, kwargs)
+            yield ResponseWrapper[T](response, response_model, self._loads)
+
+    async def _send(  # pylint:disable=too-many-arguments
+        self,
+        stack: AsyncExitStack,
+        method: str,
+        path: str,
+        url: str,
+        kwargs: Dict[str, Any],
+    ) -> ClientResponse:
+        """
+        Sends the request until it is not retried, the response is released
+        with `stack`.
+        """
+        retry = self._start_retry(method)
+        while True:
+            if self._rate_limiter is not None:
+                await self._rate_limiter.acquire(get_rate_group(path))
+            context = self.session.request(method, url, **kwargs)
+            try:
+                response = await context.__aenter__()
+            except (ClientConnectionError, asyncio.TimeoutError) as e:
+                delay = retry.on_error(e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+
+            delay = retry.on_response(response.status, response.headers)
+            if delay is None:
+                stack.push_async_exit(context)
+                return response
+            await context.__aexit__(None, None, None)
+            await asyncio.sleep(delay)
 
     async def close(self) -> None:
         await self.session.close()
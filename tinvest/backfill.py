@@ -0,0 +1,136 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from itertools import chain
+from typing import Any, Dict, List, Optional, Tuple
+
+from .apis import MarketApi
+from .history import MAX_PERIODS, Window, split_period
+from .schemas import CandleResolution, EventName
+from .subscriptions import SubscriptionRegistry
+from .typedefs import AnyDict
+from .utils import parse_time
+
+__all__ = ('CandleBackfill', 'MAX_PERIODS')
+
+logger = logging.getLogger(__name__)
+
+
+class CandleBackfill:
+    """
+    Fetches candles missed while `Streaming` was disconnected.
+
+    `Streaming` keeps the last candle `time` per FIGI and interval,
+    and after a reconnect requests the candles from that time
+    with `MarketApi.market_candles_get`, at most `concurrency` requests
+    at a time. The candles are passed to the candle handlers in order,
+    starting with the last received candle, before live messages.
+    Gaps longer than one request allows are split into periods
+    of `MAX_PERIODS`, the requests of all FIGIs and periods share
+    `concurrency`.
+    A failed request is logged and kept in `errors` until the next `fetch`,
+    the candles of the other requests are still returned.
+
+    ```python
+    client = tinvest.AsyncClient(TOKEN)
+    config = tinvest.StreamingConfig(backfill=tinvest.CandleBackfill(client))
+    streaming = tinvest.Streaming(TOKEN, config=config)
+    ```
+    """
+
+    def __init__(self, client: Any, *, concurrency: int = 4) -> None:
+        if concurrency < 1:
+            raise ValueError(f'not 0 < {concurrency}')
+        self._api = MarketApi(client)
+        self._concurrency = concurrency
+        self._last: Dict[Tuple[str, str], str] = {}
+        self.errors: Dict[Tuple[str, str], BaseException] = {}
+
+    def track(self, payload: AnyDict) -> None:
+        self._last[(payload['figi'], payload['interval'])] = payload['time']
+
+    def last_time(self, figi: str, interval: CandleResolution) -> Optional[datetime]:
+        time = self._last.get((figi, CandleResolution(interval).value))
+        return None if time is None else parse_time(time)
+
+    async def fetch(
+        self, subscriptions: Optional[SubscriptionRegistry] = None
+    ) -> List[AnyDict]:
+        """
+        Returns the candles since the last tracked ones of `subscriptions`,
+        ordered by time for every FIGI and interval.
+        """
+        now = datetime.now(timezone.utc)
+        semaphore = asyncio.Semaphore(self._concurrency)
+        keys = [
+            (figi, interval)
+            for figi, interval in self._last
+            if subscriptions is None
+            or (EventName.candle, {'figi': figi, 'interval': interval}) in subscriptions
+        ]
+        results = await asyncio.gather(
+            *[self._fetch(semaphore, key, now) for key in keys],
+            return_exceptions=True,
+        )
+        self.errors = {}
+        candles: List[AnyDict] = []
+        for key, result in zip(keys, results):
+            if isinstance(result, BaseException):
+                logger.error('Backfill %s %s failed: %r', *key, result)
+                self.errors[key] = result
+            else:
+                candles.extend(result)
+        return candles
+
+    async def _fetch(
+        self, semaphore: asyncio.Semaphore, key: Tuple[str, str], now: datetime
+    ) -> List[AnyDict]:
+        figi, interval = key
+        since = parse_time(self._last[key])
+        pages = await asyncio.gather(
+            *[
+                self._fetch_window(semaphore, key, window)
+                for window in split_period(since, now, interval)
+            ],
+            return_exceptions=True,
+        )
+        for page in pages:
+            if isinstance(page, BaseException):
+                raise page
+            if page is None:
+                return []
+
+        # neighbouring periods may both return the candle of their border
+        by_time = {
+            parse_time(candle['time']): candle for candle in chain.from_iterable(pages)
+        }
+        candles = [by_time[time] for time in sorted(by_time) if time >= since]
+        if candles:
+            self.track(candles[-1])
+        logger.info(
+            'Backfill %s %s: %s candles in %s requests',
+            figi,
+            interval,
+            len(candles),
+            len(pages),
+        )
+        return candles
+
+    async def _fetch_window(
+        self, semaphore: asyncio.Semaphore, key: Tuple[str, str], window: Window
+    ) -> Optional[List[AnyDict]]:
+        figi, interval = key
+        async with semaphore:
+            async with self._api.market_candles_get(
+                figi, *window, CandleResolution(interval)
+            ) as response:
+                if response.status != 200:
+                    logger.error(
+                        'Backfill %s %s failed with status %s',
+                        figi,
+                        interval,
+                        response.status,
+                    )
+                    return None
+                data = await response.json()
+        return data['payload']['candles']
@@ -0,0 +1,95 @@
+import logging
+import random
+import time
+from typing import Optional
+
+from .metrics import Timing
+
+__all__ = ('Backoff', 'ReconnectStats', 'Reconnector')
+
+logger = logging.getLogger(__name__)
+
+
+class Backoff:
+    """
+    Exponential backoff: `base * factor ** attempt` seconds capped by `cap`.
+    Every delay is randomly shortened by up to `jitter` of its value,
+    so that many clients do not retry in lockstep.
+    """
+
+    def __init__(
+        self,
+        base: float = 1,
+        factor: float = 2,
+        cap: float = 60,
+        jitter: float = 0.5,
+    ) -> None:
+        if not 0 <= jitter <= 1:
+            raise ValueError(f'not 0 <= {jitter} <= 1')
+        self.base = base
+        self.factor = factor
+        self.cap = cap
+        self.jitter = jitter
+        self.attempts = 0
+        self._delay = float(base)
+
+    def next_delay(self) -> float:
+        delay = min(self._delay, self.cap)
+        self.attempts += 1
+        if delay < self.cap:
+            self._delay *= self.factor
+        return delay * (1 - self.jitter * random.random())  # noqa: S311
+
+    def reset(self) -> None:
+        self.attempts = 0
+        self._delay = float(self.base)
+
+
+class ReconnectStats:
+    def __init__(self) -> None:
+        self.attempts = 0
+        self.downtime = Timing()
+
+
+class Reconnector:
+    """
+    Tracks connection state for `Streaming`: the delay before
+    the next attempt, and the reset of the backoff after a connection
+    that lasted at least `stable_after` seconds.
+    """
+
+    def __init__(self, backoff: Backoff, stable_after: float = 60) -> None:
+        self.backoff = backoff
+        self.stats = ReconnectStats()
+        self._stable_after = stable_after
+        self._connected_at: Optional[float] = None
+        self._disconnected_at: Optional[float] = None
+
+    def connected(self) -> None:
+        now = time.monotonic()
+        self._connected_at = now
+        if self._disconnected_at is not None:
+            downtime = now - self._disconnected_at
+            self.stats.downtime.add(downtime)
+            self._disconnected_at = None
+            logger.info(
+                'Reconnected after %.3fs and %s attempts',
+                downtime,
+                self.backoff.attempts,
+            )
+
+    def disconnected(self) -> float:
+        now = time.monotonic()
+        if (
+            self._connected_at is not None
+            and now - self._connected_at >= self._stable_after
+        ):
+            self.backoff.reset()
+        self._connected_at = None
+        if self._disconnected_at is None:
+            self._disconnected_at = now
+
+        self.stats.attempts += 1
+        delay = self.backoff.next_delay()
+        logger.info('Reconnect attempt %s in %.3fs', self.backoff.attempts, delay)
+        return delay
@@ -1,6 +1,10 @@
 from typing import Generic, Optional, TypeVar
 
 from .constants import PRODUCTION, SANDBOX
+from .rate_limit import RateLimiter
+from .retry import RetryPolicy, RetryState
+from .typedefs import JsonLoads
+from .utils import get_json_loads
 
 __all__ = ('BaseClient',)
 
@@ -9,7 +13,14 @@ T = TypeVar('T')  # pragma: no mutate
 
 class BaseClient(Generic[T]):
     def __init__(
-        self, token: str, *, use_sandbox: bool = False, session: Optional[T] = None
+        self,
+        token: str,
+        *,
+        use_sandbox: bool = False,
+        session: Optional[T] = None,
+        loads: Optional[JsonLoads] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
     ):
         if not token:
             raise ValueError('Token can not be empty')
@@ -19,6 +30,14 @@ class BaseClient(Generic[T]):
 
         self._token: str = token
         self._session = session
+        self._loads: JsonLoads = loads or get_json_loads()
+        self._rate_limiter = rate_limiter
+        self._retry_policy = retry_policy
+
+    def _start_retry(self, method: str) -> RetryState:
+        if self._retry_policy is None:
+            return RetryState(None)
+        return self._retry_policy.start(method)
 
     @property
     def session(self) -> T:
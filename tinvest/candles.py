@@ -0,0 +1,232 @@
+import logging
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .dispatch import CompiledHandler, event_key, run_handlers
+from .schemas import Candle, CandleResolution, EventName
+from .utils import parse_time
+
+__all__ = ('AggregatedCandle', 'CandleAggregator', 'read_candle')
+
+logger = logging.getLogger(__name__)
+
+MOSCOW = timezone(timedelta(hours=3))  # pragma: no mutate
+
+_MINUTES = {
+    CandleResolution.min2: 2,
+    CandleResolution.min3: 3,
+    CandleResolution.min5: 5,
+    CandleResolution.min10: 10,
+    CandleResolution.min15: 15,
+    CandleResolution.min30: 30,
+    CandleResolution.hour: 60,
+}
+_CALENDAR = (CandleResolution.day, CandleResolution.week, CandleResolution.month)
+_OHLCV = ('o', 'h', 'l', 'c', 'v')  # pragma: no mutate
+
+
+class AggregatedCandle(Candle):
+    """
+    Candle built by `CandleAggregator`, `complete` is `False`
+    while the interval is in progress.
+    """
+
+    complete: bool = False
+
+
+def read_candle(payload: Any) -> Tuple[Any, ...]:
+    """
+    Returns figi, interval, time, o, h, l, c, v of a candle model or dict.
+    """
+    if isinstance(payload, dict):
+        time = payload['time']
+        if not isinstance(time, datetime):
+            time = parse_time(time)
+        return (
+            payload['figi'],
+            getattr(payload['interval'], 'value', payload['interval']),
+            time,
+            payload['o'],
+            payload['h'],
+            payload['l'],
+            payload['c'],
+            payload['v'],
+        )
+    return (
+        payload.figi,
+        getattr(payload.interval, 'value', payload.interval),
+        payload.time,
+        payload.o,
+        payload.h,
+        payload.l,
+        payload.c,
+        payload.v,
+    )
+
+
+class _Bucket:
+    __slots__ = ('start', 'time', 'minute', 'base', 'current')
+
+    def __init__(self, start: Any, time: datetime, minute: datetime) -> None:
+        self.start = start
+        self.time = time
+        self.minute = minute
+        # open, high, low, close, volume of the finished minutes and the current one
+        self.base: Optional[List[Any]] = None
+        self.current: List[Any] = []
+
+    def update(self, time: datetime, ohlcv: List[Any]) -> None:
+        if time > self.minute:
+            self.base = self._merge()
+            self.minute = time
+        self.current = ohlcv
+
+    def _merge(self) -> List[Any]:
+        if self.base is None:
+            return list(self.current)
+        open_, high, low, _, volume = self.base
+        _, current_high, current_low, close, current_volume = self.current
+        return [
+            open_,
+            max(high, current_high),
+            min(low, current_low),
+            close,
+            volume + current_volume,
+        ]
+
+    def to_candle(
+        self, figi: str, interval: CandleResolution, complete: bool
+    ) -> AggregatedCandle:
+        return AggregatedCandle.construct(
+            figi=figi,
+            interval=interval,
+            time=self.time,
+            complete=complete,
+            **dict(zip(_OHLCV, self._merge())),
+        )
+
+
+class CandleAggregator:
+    """
+    Builds coarser candles from `1min` candles, so only `CandleResolution.min1`
+    needs to be subscribed.
+
+    Every `1min` update is passed to the candle handlers as
+    an in-progress `AggregatedCandle` of every interval in `intervals`,
+    or of one interval if the handlers are added with `interval`.
+    When a minute of the next interval arrives, the finished candle is passed
+    with `complete=True` first. Minute intervals and `hour` start at
+    multiples of the interval, the `time` of them is the interval start.
+    `day`, `week` and `month` are calendar periods in `tz` (Moscow time),
+    the `time` of them is the time of the first minute, as in the REST API.
+
+    ```python
+    aggregator = tinvest.CandleAggregator(
+        [tinvest.CandleResolution.min5, tinvest.CandleResolution.hour]
+    )
+    aggregator.add_handlers(events)
+    aggregator.add_handlers([("candle", handle_hour)], tinvest.CandleResolution.hour)
+    events.candle()(aggregator.handle)
+    ```
+    """
+
+    def __init__(
+        self,
+        intervals: Iterable[CandleResolution] = tuple(_MINUTES) + _CALENDAR,
+        *,
+        tz: tzinfo = MOSCOW,
+    ) -> None:
+        self._intervals = [CandleResolution(interval) for interval in intervals]
+        for interval in self._intervals:
+            if interval not in _MINUTES and interval not in _CALENDAR:
+                raise ValueError(f'{interval} can not be built from 1min candles')
+        self._tz = tz
+        self._buckets: Dict[Tuple[str, CandleResolution], _Bucket] = {}
+        self._handlers: Dict[CandleResolution, List[CompiledHandler]] = {
+            interval: [] for interval in self._intervals
+        }
+
+    def add_handlers(
+        self,
+        handlers: Union[Sequence[Tuple[str, Any]], Any],
+        interval: Optional[CandleResolution] = None,
+    ) -> None:
+        """
+        Candle handlers of `StreamingEvents` or a list of handlers,
+        for `interval` only or for every interval.
+        """
+        intervals = self._intervals
+        if interval is not None:
+            intervals = [CandleResolution(interval)]
+            if intervals[0] not in self._handlers:
+                raise ValueError(f'{interval} not in {self._intervals}')
+        compiled = [
+            CompiledHandler(func)
+            for event_name, func, *_ in getattr(handlers, 'handlers', handlers)
+            if event_key(event_name) == EventName.candle.value
+            and getattr(func, '__func__', None) is not CandleAggregator.handle
+        ]
+        for aggregated in intervals:
+            self._handlers[aggregated].extend(compiled)
+
+    def get(self, figi: str, interval: CandleResolution) -> Optional[AggregatedCandle]:
+        bucket = self._buckets.get((figi, CandleResolution(interval)))
+        if bucket is None:
+            return None
+        return bucket.to_candle(figi, CandleResolution(interval), False)
+
+    def update(self, payload: Any) -> List[AggregatedCandle]:
+        """
+        Applies a `1min` candle, returns the finished and in-progress candles.
+        """
+        figi, interval, time, *ohlcv = read_candle(payload)
+        if interval != CandleResolution.min1.value:
+            return []
+        return [
+            candle
+            for aggregated in self._intervals
+            for candle in self._update((figi, aggregated), time, ohlcv)
+        ]
+
+    def _update(
+        self, key: Tuple[str, CandleResolution], time: datetime, ohlcv: List[Any]
+    ) -> List[AggregatedCandle]:
+        figi, interval = key
+        bucket = self._buckets.get(key)
+        if bucket is not None and time < bucket.minute:
+            logger.debug('Skip late candle %s %s', figi, time)
+            return []
+
+        candles = []
+        start = self._get_start(interval, time)
+        if bucket is not None and start != bucket.start:
+            candles.append(bucket.to_candle(figi, interval, True))
+            bucket = None
+        if bucket is None:
+            bucket_time = time
+            if interval in _MINUTES:
+                bucket_time = datetime.fromtimestamp(start, timezone.utc)
+            bucket = self._buckets[key] = _Bucket(start, bucket_time, time)
+        bucket.update(time, ohlcv)
+        candles.append(bucket.to_candle(figi, interval, False))
+        return candles
+
+    async def handle(
+        self, api: Any, payload: Any, server_time: Optional[datetime] = None
+    ) -> None:
+        for candle in self.update(payload):
+            handlers = self._handlers[candle.interval]
+            if handlers:
+                await run_handlers(handlers, api, candle, server_time)
+
+    def _get_start(self, interval: CandleResolution, time: datetime) -> Any:
+        minutes = _MINUTES.get(interval)
+        if minutes is not None:
+            seconds = int(time.timestamp())
+            return seconds - seconds % (minutes * 60)
+        local = time.astimezone(self._tz).date()
+        if interval is CandleResolution.day:
+            return local
+        if interval is CandleResolution.week:
+            return local - timedelta(days=local.weekday())
+        return local.replace(day=1)
@@ -1,7 +1,8 @@
 import argparse
+import os
 
 from .. import __api_version__, __version__
-from ..cli import issues
+from ..cli import issues, sync
 
 
 def run():
@@ -10,6 +11,14 @@ def run():
     )
     argparser.add_argument('command', help='The command to execute')
     argparser.add_argument('arg', nargs='*', help='The arguments of the command')
+    argparser.add_argument(
+        '--token',
+        default=os.environ.get('TINVEST_TOKEN', ''),
+        help='The token of sync, TINVEST_TOKEN by default',
+    )
+    argparser.add_argument(
+        '--since', help='The start of new series of sync, a year ago by default'
+    )
     args = argparser.parse_args()
 
     if args.command == 'issues':
@@ -17,3 +26,8 @@ def run():
             issues.create(issues.Repositories.INVEST_OPENAPI)
         elif not args.arg:
             issues.create()
+    elif args.command == 'sync':
+        if len(args.arg) < 3 or not args.token:
+            argparser.error('usage: tinvest sync PATH INTERVAL FIGI... --token TOKEN')
+        path, interval, *figis = args.arg
+        sync.sync(path, interval, figis, token=args.token, since=args.since)
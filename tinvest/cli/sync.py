@@ -0,0 +1,37 @@
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from ..async_client import AsyncClient
+from ..rate_limit import RateLimiter
+from ..retry import RetryPolicy
+from ..store import CandleStore
+
+# the start of new series without `--since`
+DEFAULT_PERIOD = timedelta(days=365)
+
+
+def sync(
+    path: str,
+    interval: str,
+    figis: List[str],
+    *,
+    token: str,
+    since: Optional[str] = None,
+) -> Dict[str, int]:
+    start = since or datetime.now(timezone.utc) - DEFAULT_PERIOD
+    appended = asyncio.run(_sync(path, interval, figis, token, start))
+    for figi, count in appended.items():
+        sys.stdout.write(f'{figi} {interval}: {count} new candles\n')
+    return appended
+
+
+async def _sync(
+    path: str, interval: str, figis: List[str], token: str, since: Any
+) -> Dict[str, int]:
+    client = AsyncClient(token, rate_limiter=RateLimiter(), retry_policy=RetryPolicy())
+    try:
+        return await CandleStore(path).sync(client, figis, interval, since)
+    finally:
+        await client.close()
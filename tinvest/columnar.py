@@ -0,0 +1,161 @@
+from array import array
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from .schemas import CandleResolution
+from .typedefs import AnyDict
+from .utils import parse_time_ns
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None  # type: ignore # pragma: no mutate
+
+try:
+    import pandas
+except ImportError:  # pragma: no cover
+    pandas = None  # type: ignore # pragma: no mutate
+
+__all__ = ('CandleColumns',)
+
+# column, `array` typecode
+COLUMNS = (
+    ('time', 'q'),
+    ('o', 'd'),
+    ('h', 'd'),
+    ('l', 'd'),
+    ('c', 'd'),
+    ('v', 'q'),
+)  # pragma: no mutate
+PRICES = ('o', 'h', 'l', 'c')  # pragma: no mutate
+
+
+class CandleColumns:
+    """
+    Candles of one FIGI and interval as columns: `time` (epoch nanoseconds)
+    and `v` are int64, `o`, `h`, `l`, `c` are float64 `array.array`s,
+    `figi` and `interval` are stored once.
+
+    A replacement of `CandlesResponse` for long periods: 100k `min1` candles
+    take 5MB instead of 110MB of models and are parsed 3-6 times faster,
+    see `benchmarks/candles_columnar.py`. `to_numpy()` and `to_pandas()`
+    need `numpy` and `pandas` installed.
+
+    ```python
+    async with api.market_candles_get(figi, from_, to, interval) as response:
+        columns = tinvest.CandleColumns.parse_obj(await response.json())
+    frame = columns.to_pandas()
+    ```
+    """
+
+    __slots__ = ('figi', 'interval', 'time', 'o', 'h', 'l', 'c', 'v')
+
+    figi: str
+    interval: CandleResolution
+    time: array
+    o: array
+    h: array
+    l: array
+    c: array
+    v: array
+
+    def __init__(
+        self, figi: str, interval: CandleResolution, candles: Iterable[AnyDict] = ()
+    ) -> None:
+        self.figi = figi
+        self.interval = CandleResolution(interval)
+        for name, typecode in COLUMNS:
+            setattr(self, name, array(typecode))
+        self.extend(candles)
+
+    @classmethod
+    def from_columns(
+        cls, figi: str, interval: CandleResolution, columns: Dict[str, Any]
+    ) -> 'CandleColumns':
+        """
+        Columns of `COLUMNS` names without a copy, e.g. memoryviews
+        of `CandleStore`, such columns can not be extended.
+        """
+        self = cls.__new__(cls)
+        self.figi = figi
+        self.interval = CandleResolution(interval)
+        for name, _ in COLUMNS:
+            setattr(self, name, columns[name])
+        return self
+
+    @classmethod
+    def parse_obj(cls, obj: AnyDict) -> 'CandleColumns':
+        """
+        Columns of a `CandlesResponse` or `Candles` dict.
+        """
+        payload = obj.get('payload', obj)
+        return cls(payload['figi'], payload['interval'], payload['candles'])
+
+    def extend(self, candles: Iterable[AnyDict]) -> None:
+        """
+        Appends candle dicts of the same FIGI and interval.
+        """
+        time, v = self.time, self.v
+        prices = [(name, getattr(self, name)) for name in PRICES]
+        for candle in candles:
+            time.append(parse_time_ns(candle['time']))
+            for name, column in prices:
+                column.append(candle[name])
+            v.append(candle['v'])
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __iter__(self) -> Iterator[AnyDict]:
+        """
+        Yields candle dicts with `time` in epoch nanoseconds.
+        """
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, i: int) -> AnyDict:
+        candle: AnyDict = {'figi': self.figi, 'interval': self.interval}
+        for name, _ in COLUMNS:
+            candle[name] = getattr(self, name)[i]
+        return candle
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            len(column) * column.itemsize
+            for column in (getattr(self, name) for name, _ in COLUMNS)
+        )
+
+    def columns(self) -> Dict[str, array]:
+        return {name: getattr(self, name) for name, _ in COLUMNS}
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """
+        Numpy arrays sharing the memory of the columns,
+        `time` is `datetime64[ns]` in UTC. The columns can not be extended
+        while the arrays are referenced.
+        """
+        if numpy is None:
+            raise ImportError('numpy is required')
+        arrays = {
+            name: numpy.asarray(column) for name, column in self.columns().items()
+        }
+        arrays['time'] = arrays['time'].view('datetime64[ns]')
+        return arrays
+
+    def to_pandas(self, index: Optional[str] = 'time') -> Any:
+        """
+        `pandas.DataFrame` of the columns indexed by `time` (UTC).
+        """
+        if pandas is None:
+            raise ImportError('pandas is required')
+        frame = pandas.DataFrame(self.to_numpy())
+        frame['time'] = frame['time'].dt.tz_localize('UTC')
+        if index is None:
+            return frame
+        return frame.set_index(index)
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}(figi={self.figi!r}, '
+            f'interval={self.interval.value!r}, len={len(self)})'
+        )
@@ -0,0 +1,88 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel  # pylint:disable=no-name-in-module
+from pydantic.fields import (  # pylint:disable=E0611
+    SHAPE_LIST,
+    SHAPE_SINGLETON,
+    ModelField,
+)
+
+from .typedefs import AnyDict
+from .utils import parse_time
+
+__all__ = ('get_constructor',)
+
+T = TypeVar('T', bound=BaseModel)  # pragma: no mutate
+
+_Converter = Optional[Callable[[Any], Any]]  # pragma: no mutate
+_FieldSpec = Tuple[str, str, _Converter]  # pragma: no mutate
+
+_constructors: Dict[Type[BaseModel], Callable[[AnyDict], Any]] = {}
+
+
+def get_constructor(model: Type[T]) -> Callable[[AnyDict], T]:
+    """
+    Builds a constructor of `model` for trusted payloads.
+
+    Aliases, enums, datetimes and nested models are applied, but values are
+    not validated and other containers are kept as decoded
+    (e.g. orderbook levels stay lists), so it should only be used
+    for data received from the API.
+
+    ```python
+    parse = get_constructor(tinvest.OrderbookStreaming)
+    orderbook = parse({"figi": "BBG0013HGFT4", "depth": 1, "bids": [], "asks": []})
+    ```
+    """
+    if model not in _constructors:
+        _constructors[model] = _build_constructor(model)
+    return _constructors[model]
+
+
+def _build_constructor(model: Type[T]) -> Callable[[AnyDict], T]:
+    specs: List[_FieldSpec] = []
+    for name, field in model.__fields__.items():
+        specs.append((name, field.alias, _get_field_converter(field)))
+
+    def constructor(data: AnyDict) -> T:
+        values = {}
+        for name, alias, converter in specs:
+            if alias not in data:
+                continue
+            value = data[alias]
+            if converter is not None and value is not None:
+                value = converter(value)
+            values[name] = value
+        return model.construct(**values)
+
+    return constructor
+
+
+def _get_field_converter(field: ModelField) -> _Converter:
+    if field.shape not in (SHAPE_SINGLETON, SHAPE_LIST):
+        return None
+    converter = _get_converter(field.type_)
+    if converter is not None and field.shape == SHAPE_LIST:
+        return _list_of(converter)
+    return converter
+
+
+def _get_converter(type_: Any) -> _Converter:
+    if not isinstance(type_, type):
+        return None
+    if issubclass(type_, BaseModel):
+        return get_constructor(type_)
+    if issubclass(type_, Enum):
+        return type_
+    if issubclass(type_, datetime):
+        return parse_time
+    return None
+
+
+def _list_of(converter: Callable[[Any], Any]) -> Callable[[List[Any]], List[Any]]:
+    def convert(values: List[Any]) -> List[Any]:
+        return [converter(value) for value in values]
+
+    return convert
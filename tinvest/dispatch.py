@@ -0,0 +1,336 @@
+import asyncio
+import logging
+from collections import deque
+from enum import Enum
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from .executor import ExecutorKind, HandlerExecutor
+from .isolation import HandlerIsolation, _Guard, _OnError
+from .metrics import Timing
+from .utils import run_in_threadpool
+
+__all__ = (
+    'Overflow',
+    'QueueStats',
+    'QueueDispatcher',
+    'LatestOnly',
+    'CompiledHandler',
+    'run_handlers',
+    'get_figi',
+    'event_key',
+)
+
+logger = logging.getLogger(__name__)
+
+# event_name, handlers, api, data, server_time, enqueued_at
+_Entry = Tuple[str, Sequence[Any], Any, Any, Any, float]  # pragma: no mutate
+
+
+async def run_handlers(
+    handlers: Sequence[Any], api: Any, data: Any, server_time: Any
+) -> None:
+    if len(handlers) == 1:
+        await handlers[0].call_event(api, data, server_time)
+        return
+    await asyncio.gather(
+        *[handler.call_event(api, data, server_time) for handler in handlers]
+    )
+
+
+def get_figi(data: Any) -> Optional[str]:
+    if isinstance(data, dict):
+        return data.get('figi')
+    return getattr(data, 'figi', None)
+
+
+class Overflow(str, Enum):
+    block = 'block'
+    drop_oldest = 'drop_oldest'
+    coalesce = 'coalesce'
+
+
+class QueueStats:
+    def __init__(self) -> None:
+        self.depth = 0
+        self.max_depth = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.wait = Timing()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'depth': self.depth,
+            'max_depth': self.max_depth,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+            'wait': self.wait.as_dict(),
+        }
+
+
+class _Partition:
+    def __init__(self, maxsize: int, overflow: Overflow) -> None:
+        self.stats = QueueStats()
+        self._maxsize = maxsize
+        self._overflow = overflow
+        self._entries: Deque[_Entry] = deque()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._task = asyncio.ensure_future(self._work())
+
+    async def put(self, entry: _Entry) -> None:
+        while len(self._entries) >= self._maxsize:
+            if self._overflow is Overflow.block:
+                self._not_full.clear()
+                await self._not_full.wait()
+                continue
+            if self._overflow is Overflow.coalesce and self._coalesce(entry):
+                return
+            self._entries.popleft()
+            self.stats.dropped += 1
+
+        self._entries.append(entry)
+        self._update_depth()
+        self._not_empty.set()
+
+    def _coalesce(self, entry: _Entry) -> bool:
+        for i in range(len(self._entries) - 1, -1, -1):
+            if self._entries[i][0] == entry[0]:
+                self._entries[i] = entry
+                self.stats.coalesced += 1
+                return True
+        return False
+
+    def _update_depth(self) -> None:
+        self.stats.depth = len(self._entries)
+        if self.stats.depth > self.stats.max_depth:
+            self.stats.max_depth = self.stats.depth
+
+    async def _work(self) -> None:
+        loop = asyncio.get_event_loop()
+        while True:
+            if not self._entries:
+                self._not_empty.clear()
+                await self._not_empty.wait()
+                continue
+
+            _, handlers, api, data, server_time, enqueued_at = self._entries.popleft()
+            self._update_depth()
+            self._not_full.set()
+            self.stats.wait.add(loop.time() - enqueued_at)
+            try:
+                await run_handlers(handlers, api, data, server_time)
+            except asyncio.CancelledError:  # pylint:disable=try-except-raise
+                raise
+            except Exception:  # pylint:disable=broad-except
+                logger.exception('Handler error')
+
+    async def close(self) -> None:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+class QueueDispatcher:
+    """
+    Hands events to long-lived worker tasks via bounded queues,
+    so a slow handler does not stall the websocket read loop.
+
+    Events of one FIGI are handled in order, different FIGIs in parallel.
+    With `per_handler=True` every handler gets its own queue per FIGI.
+
+    `overflow` is applied when a queue is full:
+
+    - `block` waits for a free slot, so the read loop is paused;
+    - `drop_oldest` drops the oldest queued event;
+    - `coalesce` replaces the newest queued event of the same type,
+    falling back to `drop_oldest`.
+
+    ```python
+    dispatcher = tinvest.QueueDispatcher(maxsize=100, overflow="drop_oldest")
+    config = tinvest.StreamingConfig(dispatcher=dispatcher)
+    streaming = tinvest.Streaming(TOKEN, config=config)
+    ...
+    print(dispatcher.stats)
+    ```
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 100,
+        overflow: Overflow = Overflow.block,
+        *,
+        per_handler: bool = False,
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError(f'not 0 < {maxsize}')
+        self._maxsize = maxsize
+        self._overflow = Overflow(overflow)
+        self._per_handler = per_handler
+        self._partitions: Dict[Hashable, _Partition] = {}
+
+    @property
+    def stats(self) -> Dict[Hashable, QueueStats]:
+        return {key: partition.stats for key, partition in self._partitions.items()}
+
+    async def put(  # pylint:disable=too-many-arguments
+        self,
+        event_name: str,
+        handlers: Sequence[Any],
+        api: Any,
+        data: Any,
+        server_time: Any,
+    ) -> None:
+        if not handlers:
+            return
+        figi = get_figi(data)
+        enqueued_at = asyncio.get_event_loop().time()
+        if not self._per_handler:
+            entry = (event_name, handlers, api, data, server_time, enqueued_at)
+            await self._get_partition(figi).put(entry)
+            return
+        for handler in handlers:
+            entry = (event_name, (handler,), api, data, server_time, enqueued_at)
+            await self._get_partition((handler.func, figi)).put(entry)
+
+    def _get_partition(self, key: Hashable) -> _Partition:
+        if key not in self._partitions:
+            self._partitions[key] = _Partition(self._maxsize, self._overflow)
+        return self._partitions[key]
+
+    async def close(self) -> None:
+        partitions = list(self._partitions.values())
+        self._partitions.clear()
+        for partition in partitions:
+            await partition.close()
+
+
+class LatestOnly:
+    """
+    Runs a handler in the background so that at most one snapshot per
+    FIGI and depth is pending while the handler is busy: a newer snapshot
+    replaces the pending one and the replaced one is counted in `skipped`.
+    """
+
+    def __init__(self, call: Callable[[Any, Any, Any], Awaitable[Any]]) -> None:
+        self.skipped: Dict[Hashable, int] = {}
+        self._call = call
+        self._pending: Dict[Hashable, Tuple[Any, Any, Any]] = {}
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+
+    async def __call__(self, api: Any, data: Any, server_time: Any) -> None:
+        key = (get_figi(data), getattr(data, 'depth', None))
+        if key in self._tasks:
+            if key in self._pending:
+                self.skipped[key] = self.skipped.get(key, 0) + 1
+            self._pending[key] = (api, data, server_time)
+            return
+        self._tasks[key] = asyncio.ensure_future(self._run(key, api, data, server_time))
+
+    async def _run(self, key: Hashable, *args: Any) -> None:
+        pending: Optional[Tuple[Any, ...]] = args
+        try:
+            while pending is not None:
+                await self._call_logged(*pending)
+                pending = self._pending.pop(key, None)
+        finally:
+            del self._tasks[key]
+
+    async def _call_logged(self, *args: Any) -> None:
+        try:
+            await self._call(*args)
+        except asyncio.CancelledError:  # pylint:disable=try-except-raise
+            raise
+        except Exception:  # pylint:disable=broad-except
+            logger.exception('Handler error')
+
+    async def close(self) -> None:
+        tasks: Set[asyncio.Future] = set(self._tasks.values())
+        self._pending.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _get_varnames(func: Any) -> Tuple[str, ...]:
+    code = getattr(func, '__code__', None)
+    if code is None and callable(func):
+        code = getattr(func.__call__, '__code__', None)
+    return code.co_varnames if code else ()
+
+
+def event_key(event_name: Any) -> str:
+    return getattr(event_name, 'value', event_name)
+
+
+class CompiledHandler:
+    """
+    Handler with metadata precomputed once in `Streaming.add_handlers`,
+    so the per-message path makes direct calls only.
+    """
+
+    def __init__(
+        self,
+        func: Callable,
+        executor: Optional[HandlerExecutor] = None,
+        *,
+        latest_only: bool = False,
+    ) -> None:
+        self.func = func
+        self.is_async = asyncio.iscoroutinefunction(func)
+        self.executor = executor
+        self.receive_server_time = 'server_time' in _get_varnames(func)
+        target: Any = getattr(func, '__func__', func)
+        try:
+            target.receive_server_time__ = self.receive_server_time
+        except AttributeError:  # pragma: no cover
+            pass
+        self.guard: Optional[_Guard] = None
+        self.latest_only: Optional[LatestOnly] = None
+        if latest_only:
+            self.latest_only = LatestOnly(self._call_event)
+
+    def isolate(
+        self,
+        isolation: HandlerIsolation,
+        event_name: str,
+        on_error: Optional[_OnError] = None,
+    ) -> 'CompiledHandler':
+        self.guard = isolation.guard(self.func, event_name, self._call_event, on_error)
+        if self.latest_only is not None:
+            self.latest_only = LatestOnly(self.guard)
+        return self
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Awaitable[Any]:
+        if self.is_async:
+            return self.func(*args, **kwargs)
+        if self.executor is None or self.executor.kind is ExecutorKind.process:
+            return run_in_threadpool(self.func, *args, **kwargs)
+        return self.executor.run(self.func, *args, **kwargs)
+
+    def call_event(self, api: Any, data: Any, server_time: Any) -> Awaitable[Any]:
+        if self.latest_only is not None:
+            return self.latest_only(api, data, server_time)
+        if self.guard is not None:
+            return self.guard(api, data, server_time)
+        return self._call_event(api, data, server_time)
+
+    def _call_event(self, api: Any, data: Any, server_time: Any) -> Awaitable[Any]:
+        if self.executor is not None and not self.is_async:
+            kwargs = {'server_time': server_time} if self.receive_server_time else {}
+            return self.executor.run_event(self.func, api, data, kwargs)
+        if self.receive_server_time:
+            return self(api, data, server_time=server_time)
+        return self(api, data)
@@ -0,0 +1,121 @@
+import asyncio
+import contextvars
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .metrics import Timing
+
+__all__ = ('ExecutorKind', 'HandlerStats', 'HandlerExecutor')
+
+
+class ExecutorKind(str, Enum):
+    thread = 'thread'
+    process = 'process'
+    inline = 'inline'
+
+
+class HandlerStats:
+    def __init__(self) -> None:
+        self.wait = Timing()
+        self.execution = Timing()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {'wait': self.wait.as_dict(), 'execution': self.execution.as_dict()}
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}('
+            f'wait={self.wait!r}, execution={self.execution!r})'
+        )
+
+
+def _timed(
+    func: Callable, args: Tuple[Any, ...], kwargs: Dict[str, Any]
+) -> Tuple[float, float, Any]:
+    started_at = time.time()
+    result = func(*args, **kwargs)
+    return started_at, time.time(), result
+
+
+class HandlerExecutor:
+    """
+    Runs sync handlers of `Streaming`:
+
+    - `thread` in a pool of `max_workers` threads;
+    - `process` in a pool of `max_workers` processes for CPU-heavy handlers,
+    handlers and payloads must be picklable and `api` is passed as `None`,
+    service handlers (startup, cleanup, reconnect) still run in a thread;
+    - `inline` in the event loop thread, for cheap handlers only.
+
+    With `copy_context=True` thread handlers run in a copy of
+    the current `contextvars` context. Queue wait and execution time
+    are collected per handler in `stats`.
+
+    ```python
+    executor = tinvest.HandlerExecutor("thread", max_workers=4)
+    config = tinvest.StreamingConfig(executor=executor)
+    streaming = tinvest.Streaming(TOKEN, config=config)
+    ...
+    print(executor.stats)
+    executor.shutdown()
+    ```
+    """
+
+    def __init__(
+        self,
+        kind: ExecutorKind = ExecutorKind.thread,
+        max_workers: Optional[int] = None,
+        *,
+        copy_context: bool = False,
+    ) -> None:
+        self.kind = ExecutorKind(kind)
+        self.copy_context = copy_context
+        self.stats: Dict[Callable, HandlerStats] = {}
+        self._executor: Optional[Executor] = None
+        if self.kind is ExecutorKind.thread:
+            self._executor = ThreadPoolExecutor(
+                max_workers, thread_name_prefix='tinvest-handler'
+            )
+        elif self.kind is ExecutorKind.process:
+            self._executor = ProcessPoolExecutor(max_workers)
+
+    def _get_stats(self, func: Callable) -> HandlerStats:
+        if func not in self.stats:
+            self.stats[func] = HandlerStats()
+        return self.stats[func]
+
+    async def run(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        stats = self._get_stats(func)
+        if self._executor is None:
+            started_at = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats.wait.add(0.0)
+                stats.execution.add(time.perf_counter() - started_at)
+
+        call = func
+        if self.copy_context and self.kind is ExecutorKind.thread:
+            call = contextvars.copy_context().run
+            args = (func, *args)
+        loop = asyncio.get_event_loop()
+        submitted_at = time.time()
+        started_at, finished_at, result = await loop.run_in_executor(
+            self._executor, _timed, call, args, kwargs
+        )
+        stats.wait.add(max(started_at - submitted_at, 0.0))
+        stats.execution.add(finished_at - started_at)
+        return result
+
+    def run_event(
+        self, func: Callable, api: Any, data: Any, kwargs: Dict[str, Any]
+    ) -> Any:
+        if self.kind is ExecutorKind.process:
+            api = None
+        return self.run(func, api, data, **kwargs)
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
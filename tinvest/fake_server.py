@@ -0,0 +1,295 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+from aiohttp import WSMsgType, web
+
+from .recording import read_records
+from .schemas import CandleResolution, EventName
+
+__all__ = ('FakeStreamingServer',)
+
+logger = logging.getLogger(__name__)
+
+_Key = Tuple[str, str, Hashable]  # pragma: no mutate
+
+_INTERVALS = tuple(c.value for c in CandleResolution)  # pragma: no mutate
+_BATCH = 100  # pragma: no mutate
+
+
+def format_time(ns: int) -> str:
+    seconds, fraction = divmod(ns, 1_000_000_000)
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds)) + (
+        f'.{fraction:09d}Z'
+    )
+
+
+def _dump(event_name: str, payload: Dict[str, Any], now: Optional[int] = None) -> str:
+    return json.dumps(
+        {
+            'event': event_name,
+            'time': format_time(now or time.time_ns()),
+            'payload': payload,
+        }
+    )
+
+
+class _Connection:
+    def __init__(self, ws: web.WebSocketResponse) -> None:
+        self.ws = ws
+        self.subscriptions: Dict[_Key, Dict[str, Any]] = {}
+        self.subscribed = asyncio.Event()
+
+
+class _MarketData:
+    """
+    Messages of a recorded log in a loop, or synthetic market data
+    of the subscriptions.
+    """
+
+    def __init__(self, record: Optional[str], seed: Optional[int]) -> None:
+        self.records: List[bytes] = []
+        self._record = record
+        self._random = random.Random(seed)
+        self._prices: Dict[str, float] = {}
+
+    def load(self) -> None:
+        if self._record is not None:
+            self.records = [record.data for record in read_records(self._record)]
+
+    def get_message(self, connection: _Connection, i: int) -> Optional[str]:
+        if self.records:
+            data = json.loads(self.records[i % len(self.records)])
+            data['time'] = format_time(time.time_ns())
+            return json.dumps(data)
+        subscriptions = list(connection.subscriptions.values())
+        if not subscriptions:
+            return None
+        return self._generate(subscriptions[i % len(subscriptions)])
+
+    def _generate(self, subscription: Dict[str, Any]) -> str:
+        figi = subscription['figi']
+        price = self._prices.get(figi, 100.0)
+        price = self._prices[figi] = round(
+            max(price + self._random.choice((-0.01, 0, 0.01)), 0.01), 2
+        )
+        now = time.time_ns()
+        if 'interval' in subscription:
+            event_name = EventName.candle.value
+            payload: Dict[str, Any] = {
+                'figi': figi,
+                'interval': subscription['interval'],
+                'o': price,
+                'c': price,
+                'h': round(price + 0.01, 2),
+                'l': round(price - 0.01, 2),
+                'v': self._random.randint(1, 100),
+                'time': format_time(now - now % 60_000_000_000),
+            }
+        elif 'depth' in subscription:
+            event_name = EventName.orderbook.value
+            depth = subscription['depth']
+            payload = {
+                'figi': figi,
+                'depth': depth,
+                'bids': [
+                    [round(price - 0.01 * i, 2), self._random.randint(1, 100)]
+                    for i in range(1, depth + 1)
+                ],
+                'asks': [
+                    [round(price + 0.01 * i, 2), self._random.randint(1, 100)]
+                    for i in range(1, depth + 1)
+                ],
+            }
+        else:
+            event_name = EventName.instrument_info.value
+            payload = {
+                'figi': figi,
+                'trade_status': 'normal_trading',
+                'min_price_increment': 0.01,
+                'lot': 1,
+            }
+        return _dump(event_name, payload, now)
+
+
+class FakeStreamingServer:
+    """
+    Local stand-in for the streaming API (`md-openapi/ws`) to test
+    and load `Streaming` end to end over a real websocket.
+
+    Candle, orderbook and instrument_info subscriptions get synthetic
+    market data at `rate` messages per second per connection
+    (`rate=None` sends as fast as the client reads). With `record`
+    messages of a `tinvest.Recorder` log are sent in a loop instead,
+    regardless of subscriptions, with `time` set to the send time.
+    Invalid requests get an `error` event. The connection is closed
+    after every `disconnect_after` messages, or on `disconnect()`.
+
+    ```python
+    async with FakeStreamingServer(rate=5000) as server:
+        config = tinvest.StreamingConfig(url=server.url)
+        await tinvest.Streaming("token", config=config).add_handlers(events).run()
+    ```
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: Optional[float] = 1000,
+        record: Optional[str] = None,
+        disconnect_after: Optional[int] = None,
+        heartbeat: Optional[float] = None,
+        token: Optional[str] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        if rate is not None and rate <= 0:
+            raise ValueError(f'not 0 < {rate}')
+        self.url = ''
+        self.connections = 0
+        self.sent = 0
+        self._rate = rate
+        self._disconnect_after = disconnect_after
+        self._heartbeat = heartbeat
+        self._token = token
+        self._market_data = _MarketData(record, seed)
+        self._connections: Set[_Connection] = set()
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_get('/', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        self._market_data.load()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f'ws://{host}:{port}/'
+        return self.url
+
+    async def stop(self) -> None:
+        await self.disconnect()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def disconnect(self) -> None:
+        for connection in list(self._connections):
+            await connection.ws.close()
+
+    async def __aenter__(self) -> 'FakeStreamingServer':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.stop()
+
+    async def _handle(self, request: web.Request) -> web.WebSocketResponse:
+        if (
+            self._token is not None
+            and request.headers.get('Authorization') != f'Bearer {self._token}'
+        ):
+            raise web.HTTPUnauthorized()
+
+        ws = web.WebSocketResponse(heartbeat=self._heartbeat)
+        await ws.prepare(request)
+        connection = _Connection(ws)
+        self._connections.add(connection)
+        self.connections += 1
+        sender = asyncio.ensure_future(self._send(connection))
+        try:
+            async for msg in ws:
+                if msg.type == WSMsgType.TEXT:
+                    await self._receive(connection, msg.data)
+        finally:
+            self._connections.discard(connection)
+            sender.cancel()
+            await asyncio.gather(sender, return_exceptions=True)
+        return ws
+
+    async def _receive(self, connection: _Connection, raw: str) -> None:
+        data = None
+        try:
+            data = json.loads(raw)
+            name, action = data['event'].split(':')
+            key = self._get_key(name, data)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            request_id = data.get('request_id') if isinstance(data, dict) else None
+            await self._send_error(connection, f'Bad request: {e}', request_id)
+            return
+
+        if action == 'subscribe':
+            payload = {
+                k: v for k, v in data.items() if k not in ('event', 'request_id')
+            }
+            connection.subscriptions[key] = payload
+            connection.subscribed.set()
+        elif action == 'unsubscribe':
+            connection.subscriptions.pop(key, None)
+        else:
+            await self._send_error(
+                connection, f'Unknown action {action}', data.get('request_id')
+            )
+
+    @staticmethod
+    def _get_key(name: str, data: Dict[str, Any]) -> _Key:
+        if name == EventName.candle:
+            if data['interval'] not in _INTERVALS:
+                raise ValueError(f'{data["interval"]} not in {_INTERVALS}')
+            return name, data['figi'], data['interval']
+        if name == EventName.orderbook:
+            if not 0 < data['depth'] <= 20:
+                raise ValueError(f'not 0 < {data["depth"]} <= 20')
+            return name, data['figi'], data['depth']
+        if name == EventName.instrument_info:
+            return name, data['figi'], None
+        raise ValueError(f'Unknown event {name}')
+
+    async def _send_error(
+        self, connection: _Connection, error: str, request_id: Optional[str]
+    ) -> None:
+        payload = {'error': error, 'request_id': request_id}
+        await connection.ws.send_str(_dump(EventName.error.value, payload))
+
+    async def _send(self, connection: _Connection) -> None:
+        loop = asyncio.get_event_loop()
+        started_at = loop.time()
+        sent = 0
+        while not connection.ws.closed:
+            if not self._market_data.records and not connection.subscriptions:
+                connection.subscribed.clear()
+                await connection.subscribed.wait()
+                started_at, sent = loop.time(), 0
+                continue
+
+            due = await self._pace(loop.time() - started_at, sent)
+            if due > 0:
+                sent = await self._send_batch(connection, due, sent)
+
+    async def _pace(self, elapsed: float, sent: int) -> int:
+        """
+        Number of messages due at `rate`, sleeps if none.
+        """
+        if self._rate is None:
+            return _BATCH
+        due = min(int(elapsed * self._rate) - sent, _BATCH)
+        if due <= 0:
+            await asyncio.sleep(max(1 / self._rate, 0.001))
+        return due
+
+    async def _send_batch(self, connection: _Connection, due: int, sent: int) -> int:
+        for _ in range(due):
+            message = self._market_data.get_message(connection, sent)
+            if message is None:
+                break
+            await connection.ws.send_str(message)
+            sent += 1
+            self.sent += 1
+            if self._disconnect_after and not sent % self._disconnect_after:
+                logger.info('Disconnect after %s messages', sent)
+                await connection.ws.close()
+                break
+        await asyncio.sleep(0)
+        return sent
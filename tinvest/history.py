@@ -0,0 +1,191 @@
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import (
+    Any,
+    AsyncIterator,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Tuple,
+    Union,
+)
+
+from .apis import MarketApi
+from .schemas import CandleResolution
+from .typedefs import AnyDict, datetime_or_str
+from .utils import parse_time
+
+__all__ = ('CandleHistory', 'split_period', 'MAX_PERIODS')
+
+logger = logging.getLogger(__name__)
+
+Window = Tuple[datetime, datetime]  # pragma: no mutate
+
+# the longest period of one `market_candles_get` request
+MAX_PERIODS = {
+    CandleResolution.min1: timedelta(days=1),
+    CandleResolution.min2: timedelta(days=1),
+    CandleResolution.min3: timedelta(days=1),
+    CandleResolution.min5: timedelta(days=1),
+    CandleResolution.min10: timedelta(days=1),
+    CandleResolution.min15: timedelta(days=1),
+    CandleResolution.min30: timedelta(days=1),
+    CandleResolution.hour: timedelta(weeks=1),
+    CandleResolution.day: timedelta(days=365),
+    CandleResolution.week: timedelta(days=365 * 2),
+    CandleResolution.month: timedelta(days=365 * 10),
+}
+
+
+def _utc(value: datetime_or_str) -> datetime:
+    dt = parse_time(value) if isinstance(value, str) else value
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def split_period(
+    from_: datetime_or_str,
+    to: datetime_or_str,
+    interval: Union[CandleResolution, str],
+) -> List[Window]:
+    """
+    Splits `from_` - `to` into consecutive windows not longer than one
+    `market_candles_get` request of `interval` allows, see `MAX_PERIODS`.
+    Naive datetimes are UTC.
+    """
+    start, end = _utc(from_), _utc(to)
+    step = MAX_PERIODS[CandleResolution(interval)]
+    windows = []
+    while start < end:
+        windows.append((start, min(start + step, end)))
+        start += step
+    return windows
+
+
+class CandleHistory:
+    """
+    Downloads candles of any period for many FIGIs.
+
+    The period is split into windows allowed by the API for the interval,
+    the requests of every window and FIGI are sent in time order,
+    at most `concurrency` at a time. Requests are paced and retried by
+    the `rate_limiter` and `retry_policy` of the client. Candles are yielded
+    in time order (by FIGI for equal times) once a window is fetched
+    for all FIGIs, candles of overlapping windows are yielded once.
+    A failed request raises `aiohttp.ClientResponseError`.
+
+    ```python
+    client = tinvest.AsyncClient(TOKEN, rate_limiter=tinvest.RateLimiter())
+    history = tinvest.CandleHistory(client, concurrency=8)
+    async for candle in history.candles(
+        ["BBG0013HGFT4", "BBG000B9XRY4"],
+        datetime(2020, 1, 1),
+        datetime(2021, 1, 1),
+        tinvest.CandleResolution.min1,
+    ):
+        print(candle["figi"], candle["time"], candle["c"])
+    ```
+    """
+
+    def __init__(self, client: Any, *, concurrency: int = 8) -> None:
+        if concurrency < 1:
+            raise ValueError(f'not 0 < {concurrency}')
+        self._api = MarketApi(client)
+        self._concurrency = concurrency
+        self.requests = 0
+        self.duplicates = 0
+
+    async def candles(
+        self,
+        figis: Iterable[str],
+        from_: datetime_or_str,
+        to: datetime_or_str,
+        interval: Union[CandleResolution, str],
+    ) -> AsyncIterator[AnyDict]:
+        """
+        Yields the payload dicts of `Candle` from `from_` to `to` (exclusive).
+        """
+        figis = list(dict.fromkeys(figis))
+        resolution = CandleResolution(interval)
+        windows = split_period(from_, to, resolution)
+        running: Deque['asyncio.Task[List[AnyDict]]'] = deque()
+        try:
+            async for candle in self._candles(windows, figis, resolution, running):
+                yield candle
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def _candles(
+        self,
+        windows: List[Window],
+        figis: List[str],
+        resolution: CandleResolution,
+        running: Deque['asyncio.Task[List[AnyDict]]'],
+    ) -> AsyncIterator[AnyDict]:
+        jobs = iter([(window, figi) for window in windows for figi in figis])
+        last: Dict[str, datetime] = {}
+        for window in windows:
+            fetched = []
+            for _ in figis:
+                self._fill(running, jobs, resolution)
+                fetched.extend(await running.popleft())
+            for candle in self._merge(fetched, window, last):
+                yield candle
+
+    def _fill(
+        self,
+        running: Deque['asyncio.Task[List[AnyDict]]'],
+        jobs: Iterator[Tuple[Window, str]],
+        resolution: CandleResolution,
+    ) -> None:
+        while len(running) < self._concurrency:
+            job = next(jobs, None)
+            if job is None:
+                return
+            (start, end), figi = job
+            running.append(
+                asyncio.get_event_loop().create_task(
+                    self._fetch(figi, start, end, resolution)
+                )
+            )
+
+    async def _fetch(
+        self, figi: str, start: datetime, end: datetime, resolution: CandleResolution
+    ) -> List[AnyDict]:
+        self.requests += 1
+        async with self._api.market_candles_get(
+            figi, start, end, resolution
+        ) as response:
+            response.raise_for_status()
+            data = await response.json()
+        candles = data['payload']['candles']
+        logger.debug('History %s %s - %s: %s candles', figi, start, end, len(candles))
+        return candles
+
+    def _merge(
+        self, fetched: List[AnyDict], window: Window, last: Dict[str, datetime]
+    ) -> List[AnyDict]:
+        start, end = window
+        timed = sorted(
+            (
+                (parse_time(candle['time']), candle['figi'], candle)
+                for candle in fetched
+            ),
+            key=lambda item: item[:2],
+        )
+        merged = []
+        for time, figi, candle in timed:
+            if not start <= time < end:
+                continue
+            if figi in last and time <= last[figi]:
+                self.duplicates += 1
+                continue
+            last[figi] = time
+            merged.append(candle)
+        return merged
@@ -0,0 +1,398 @@
+import abc
+import copy
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .candles import MOSCOW, read_candle
+from .dispatch import CompiledHandler, event_key, run_handlers
+
+__all__ = (
+    'INDICATORS',
+    'Indicator',
+    'SMA',
+    'EMA',
+    'RSI',
+    'VWAP',
+    'ATR',
+    'IndicatorUpdate',
+    'Indicators',
+)
+
+INDICATORS = 'indicators'  # pragma: no mutate
+
+
+class _Ohlcv(NamedTuple):
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+
+def _check_period(period: int) -> None:
+    if period < 1:
+        raise ValueError(f'not 0 < {period}')
+
+
+def _typical(ohlcv: _Ohlcv) -> float:
+    return (ohlcv.high + ohlcv.low + ohlcv.close) / 3
+
+
+class Indicator(abc.ABC):
+    """
+    Indicator of a candle series with O(1) state.
+
+    The server re-sends the in-progress candle with the same `time`:
+    such a candle is a revision, it replaces the previous one, and a candle
+    is added to the state only when a candle with a later `time` arrives.
+    Subclasses implement `_commit` (add a finished candle to the state)
+    and `_peek` (value with the in-progress candle, the state is unchanged),
+    both get the candle as `ohlcv.open`, `.high`, `.low`, `.close`, `.volume`.
+    """
+
+    def __init__(self) -> None:
+        self.value: Optional[float] = None
+        self._time: Optional[datetime] = None
+        self._pending: Optional[_Ohlcv] = None
+
+    def update(self, time: datetime, ohlcv: _Ohlcv) -> Optional[float]:
+        if self._time is not None:
+            if time < self._time:
+                return self.value
+            if time > self._time:
+                self._commit(self._pending)  # type: ignore
+        self._time = time
+        self._pending = ohlcv
+        self.value = self._peek(ohlcv)
+        return self.value
+
+    def seed(
+        self, times: Sequence[datetime], columns: Sequence[Sequence[float]]
+    ) -> None:
+        """
+        Bulk update from time ordered columns of open, high, low, close, volume,
+        the last candle is treated as in progress.
+        """
+        if not times:
+            return
+        for ohlcv in zip(*(column[:-1] for column in columns)):
+            self._commit(_Ohlcv._make(ohlcv))
+        self._time = times[-1]
+        self._pending = _Ohlcv._make(column[-1] for column in columns)
+        self.value = self._peek(self._pending)
+
+    @abc.abstractmethod
+    def _commit(self, ohlcv: _Ohlcv) -> None:
+        """
+        Adds a finished candle to the state.
+        """
+
+    @abc.abstractmethod
+    def _peek(self, ohlcv: _Ohlcv) -> Optional[float]:
+        """
+        Value with the in-progress candle, the state is unchanged.
+        """
+
+
+class SMA(Indicator):
+    def __init__(self, period: int) -> None:
+        _check_period(period)
+        super().__init__()
+        self.period = period
+        self._closes: Deque[float] = deque(maxlen=period - 1)
+        self._sum = 0.0
+
+    def _commit(self, ohlcv: _Ohlcv) -> None:
+        if self.period == 1:
+            return
+        if len(self._closes) == self._closes.maxlen:
+            self._sum -= self._closes[0]
+        self._closes.append(ohlcv.close)
+        self._sum += ohlcv.close
+
+    def _peek(self, ohlcv: _Ohlcv) -> Optional[float]:
+        if len(self._closes) < self.period - 1:
+            return None
+        return (self._sum + ohlcv.close) / self.period
+
+    def seed(
+        self, times: Sequence[datetime], columns: Sequence[Sequence[float]]
+    ) -> None:
+        start = max(len(times) - self.period, 0)
+        super().seed(times[start:], [column[start:] for column in columns])
+
+
+class EMA(Indicator):
+    """
+    Exponential moving average, seeded by the first close,
+    the value is returned after `period` candles.
+    """
+
+    def __init__(self, period: int) -> None:
+        _check_period(period)
+        super().__init__()
+        self.period = period
+        self._alpha = 2 / (period + 1)
+        self._ema: Optional[float] = None
+        self._count = 0
+
+    def _next(self, close: float) -> float:
+        if self._ema is None:
+            return close
+        return self._ema + self._alpha * (close - self._ema)
+
+    def _commit(self, ohlcv: _Ohlcv) -> None:
+        self._ema = self._next(ohlcv.close)
+        self._count += 1
+
+    def _peek(self, ohlcv: _Ohlcv) -> Optional[float]:
+        if self._count + 1 < self.period:
+            return None
+        return self._next(ohlcv.close)
+
+
+class _Wilder:
+    """
+    Simple average of the first `period` values, then Wilder smoothing.
+    """
+
+    __slots__ = ('period', 'average', 'count')
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.average = 0.0
+        self.count = 0
+
+    def peek(self, value: float) -> Tuple[float, int]:
+        if self.count < self.period:
+            count = self.count + 1
+            return self.average + (value - self.average) / count, count
+        return (self.average * (self.period - 1) + value) / self.period, self.count
+
+    def commit(self, value: float) -> None:
+        self.average, self.count = self.peek(value)
+
+
+class RSI(Indicator):
+    """
+    Relative strength index with Wilder smoothing.
+    """
+
+    def __init__(self, period: int = 14) -> None:
+        _check_period(period)
+        super().__init__()
+        self.period = period
+        self._close: Optional[float] = None
+        self._gain = _Wilder(period)
+        self._loss = _Wilder(period)
+
+    def _commit(self, ohlcv: _Ohlcv) -> None:
+        close = ohlcv.close
+        if self._close is not None:
+            self._gain.commit(max(close - self._close, 0))
+            self._loss.commit(max(self._close - close, 0))
+        self._close = close
+
+    def _peek(self, ohlcv: _Ohlcv) -> Optional[float]:
+        if self._close is None:
+            return None
+        close = ohlcv.close
+        gain, count = self._gain.peek(max(close - self._close, 0))
+        loss, _ = self._loss.peek(max(self._close - close, 0))
+        if count < self.period:
+            return None
+        if not loss:
+            return 100.0
+        return 100 - 100 / (1 + gain / loss)
+
+
+class ATR(Indicator):
+    """
+    Average true range with Wilder smoothing.
+    """
+
+    def __init__(self, period: int = 14) -> None:
+        _check_period(period)
+        super().__init__()
+        self.period = period
+        self._close: Optional[float] = None
+        self._range = _Wilder(period)
+
+    def _true_range(self, ohlcv: _Ohlcv) -> float:
+        high, low = ohlcv.high, ohlcv.low
+        if self._close is None:
+            return high - low
+        return max(high - low, abs(high - self._close), abs(low - self._close))
+
+    def _commit(self, ohlcv: _Ohlcv) -> None:
+        self._range.commit(self._true_range(ohlcv))
+        self._close = ohlcv.close
+
+    def _peek(self, ohlcv: _Ohlcv) -> Optional[float]:
+        average, count = self._range.peek(self._true_range(ohlcv))
+        return average if count >= self.period else None
+
+
+class VWAP(Indicator):
+    """
+    Volume weighted average of the typical price (h + l + c) / 3,
+    reset at the start of every trading day (Moscow time).
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._day: Any = None
+        self._volume = 0.0
+        self._turnover = 0.0
+
+    def update(self, time: datetime, ohlcv: _Ohlcv) -> Optional[float]:
+        day = time.astimezone(MOSCOW).date()
+        if self._day is not None and day < self._day:
+            return self.value
+        if day != self._day:
+            self._day = day
+            self._volume = self._turnover = 0.0
+            self._time = self._pending = None
+        return super().update(time, ohlcv)
+
+    def seed(
+        self, times: Sequence[datetime], columns: Sequence[Sequence[float]]
+    ) -> None:
+        if not times:
+            return
+        day = times[-1].astimezone(MOSCOW).date()
+        start = len(times)
+        while start and times[start - 1].astimezone(MOSCOW).date() == day:
+            start -= 1
+        self._day = day
+        super().seed(times[start:], [column[start:] for column in columns])
+
+    def _commit(self, ohlcv: _Ohlcv) -> None:
+        self._volume += ohlcv.volume
+        self._turnover += _typical(ohlcv) * ohlcv.volume
+
+    def _peek(self, ohlcv: _Ohlcv) -> Optional[float]:
+        total = self._volume + ohlcv.volume
+        if not total:
+            return None
+        return (self._turnover + _typical(ohlcv) * ohlcv.volume) / total
+
+
+class IndicatorUpdate:
+    """
+    Payload of `indicators` handlers.
+    """
+
+    __slots__ = ('figi', 'interval', 'time', 'candle', 'values')
+
+    def __init__(  # pylint:disable=too-many-arguments
+        self,
+        figi: str,
+        interval: str,
+        time: datetime,
+        candle: Any,
+        values: Dict[str, Optional[float]],
+    ) -> None:
+        self.figi = figi
+        self.interval = interval
+        self.time = time
+        self.candle = candle
+        self.values = values
+
+    def __getitem__(self, name: str) -> Optional[float]:
+        return self.values[name]
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}({self.figi!r}, {self.interval!r}, '
+            f'{self.time!r}, {self.values!r})'
+        )
+
+
+class Indicators:
+    """
+    Indicators of every FIGI and interval, copied from the given prototypes.
+
+    `handle` is a candle handler, after every candle it passes
+    an `IndicatorUpdate` to the `indicators` handlers of `StreamingEvents`.
+    History from `market_candles_get` is applied with `seed`.
+
+    ```python
+    indicators = tinvest.Indicators(
+        ema20=tinvest.EMA(20), rsi=tinvest.RSI(14), atr=tinvest.ATR(14)
+    )
+
+    @events.indicators()
+    async def handle_indicators(api, payload: tinvest.IndicatorUpdate):
+        print(payload.figi, payload["ema20"], payload["rsi"])
+
+    indicators.add_handlers(events)
+    events.candle()(indicators.handle)
+    ...
+    indicators.seed((await response.parse_json()).payload)
+    ```
+    """
+
+    def __init__(self, **prototypes: Indicator) -> None:
+        if not prototypes:
+            raise ValueError('Indicators can not be empty')
+        self._prototypes = prototypes
+        self._series: Dict[Tuple[str, str], Dict[str, Indicator]] = {}
+        self._handlers: List[CompiledHandler] = []
+
+    def add_handlers(self, handlers: Union[Sequence[Tuple[str, Any]], Any]) -> None:
+        """
+        `indicators` handlers of `StreamingEvents` or a list of handlers.
+        """
+        self._handlers.extend(
+            CompiledHandler(func)
+            for event_name, func, *_ in getattr(handlers, 'handlers', handlers)
+            if event_key(event_name) == INDICATORS
+        )
+
+    def get(self, figi: str, interval: Any) -> Dict[str, Optional[float]]:
+        series = self._series.get((figi, getattr(interval, 'value', interval)), {})
+        return {name: indicator.value for name, indicator in series.items()}
+
+    def _get_series(self, figi: str, interval: str) -> Dict[str, Indicator]:
+        key = (figi, interval)
+        if key not in self._series:
+            self._series[key] = {
+                name: copy.deepcopy(prototype)
+                for name, prototype in self._prototypes.items()
+            }
+        return self._series[key]
+
+    def update(self, payload: Any) -> IndicatorUpdate:
+        figi, interval, time, *prices = read_candle(payload)
+        series = self._get_series(figi, interval)
+        ohlcv = _Ohlcv(*prices)
+        values = {
+            name: indicator.update(time, ohlcv) for name, indicator in series.items()
+        }
+        return IndicatorUpdate(figi, interval, time, payload, values)
+
+    def seed(self, candles: Any) -> None:
+        """
+        Applies `CandlesResponse`, its `Candles` payload or a list of candles
+        of one FIGI and interval, models or dicts.
+        """
+        candles = getattr(candles, 'payload', candles)
+        candles = getattr(candles, 'candles', candles)
+        if isinstance(candles, dict):
+            candles = candles.get('payload', candles)['candles']
+        rows = sorted((read_candle(candle) for candle in candles), key=lambda r: r[2])
+        if not rows:
+            return
+        figi, interval = rows[0][:2]
+        _, _, times, *columns = zip(*rows)
+        for indicator in self._get_series(figi, interval).values():
+            indicator.seed(times, columns)
+
+    async def handle(
+        self, api: Any, payload: Any, server_time: Optional[datetime] = None
+    ) -> None:
+        update = self.update(payload)
+        if self._handlers:
+            await run_handlers(self._handlers, api, update, server_time)
@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import time
+from enum import Enum
+from typing import Any, Awaitable, Callable, Optional
+
+from .schemas import ErrorStreaming
+
+__all__ = (
+    'BreakerState',
+    'CircuitBreaker',
+    'HandlerIsolation',
+    'HandlerErrorStreaming',
+)
+
+logger = logging.getLogger(__name__)
+
+# handler, event name, exception, api
+_OnError = Callable[[Callable, str, BaseException, Any], Awaitable[None]]
+
+
+class BreakerState(str, Enum):
+    closed = 'closed'
+    open = 'open'
+    half_open = 'half_open'
+
+
+class HandlerErrorStreaming(ErrorStreaming):
+    """
+    Payload of `error` handlers for a failed or timed out handler.
+    """
+
+    event: str
+    handler: Any
+    exception: Any
+
+
+class CircuitBreaker:
+    """
+    Opens after `failures` consecutive failures, `reset_after` seconds later
+    lets one call through (half-open): a success closes it,
+    a failure opens it again.
+    """
+
+    __slots__ = (
+        'failures',
+        'reset_after',
+        'state',
+        'consecutive_failures',
+        'opened_at',
+        'skipped',
+    )
+
+    def __init__(self, failures: int = 5, reset_after: float = 30) -> None:
+        if failures < 1:
+            raise ValueError(f'not 0 < {failures}')
+        self.failures = failures
+        self.reset_after = reset_after
+        self.state = BreakerState.closed
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.skipped = 0
+
+    def allow(self) -> bool:
+        if self.state is BreakerState.closed:
+            return True
+        if (
+            self.state is BreakerState.open
+            and time.monotonic() - self.opened_at >= self.reset_after
+        ):
+            self.state = BreakerState.half_open
+            return True
+        self.skipped += 1
+        return False
+
+    def succeeded(self) -> None:
+        self.state = BreakerState.closed
+        self.consecutive_failures = 0
+
+    def failed(self) -> bool:
+        """
+        Returns `True` if the breaker is opened.
+        """
+        self.consecutive_failures += 1
+        if (
+            self.state is BreakerState.half_open
+            or self.consecutive_failures >= self.failures
+        ):
+            self.state = BreakerState.open
+            self.opened_at = time.monotonic()
+            return True
+        return False
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}(state={self.state.value}, '
+            f'failures={self.consecutive_failures}, skipped={self.skipped})'
+        )
+
+
+class HandlerIsolation:
+    """
+    Isolates the event handlers of `Streaming` from each other.
+
+    An exception of a handler or a call longer than `timeout` seconds fails
+    only that handler: it is logged and passed to the `error` handlers
+    as `HandlerErrorStreaming`. Every handler has a `CircuitBreaker`,
+    events are skipped for a handler with `failures` consecutive failures
+    until `reset_after` seconds pass. A sync handler that times out
+    keeps running in its thread.
+
+    ```python
+    config = tinvest.StreamingConfig(
+        isolation=tinvest.HandlerIsolation(timeout=1, failures=5)
+    )
+    streaming = tinvest.Streaming(TOKEN, config=config)
+    ...
+    print(streaming.breakers)
+    ```
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        *,
+        failures: int = 5,
+        reset_after: float = 30,
+    ) -> None:
+        if timeout is not None and timeout <= 0:
+            raise ValueError(f'not 0 < {timeout}')
+        if failures < 1:
+            raise ValueError(f'not 0 < {failures}')
+        self.timeout = timeout
+        self.failures = failures
+        self.reset_after = reset_after
+
+    def guard(
+        self,
+        func: Callable,
+        event_name: str,
+        call: Callable[..., Awaitable[Any]],
+        on_error: Optional[_OnError] = None,
+    ) -> '_Guard':
+        return _Guard(
+            func,
+            event_name,
+            call,
+            self.timeout,
+            CircuitBreaker(self.failures, self.reset_after),
+            on_error,
+        )
+
+
+class _Guard:
+    __slots__ = ('func', 'event_name', 'call', 'timeout', 'breaker', 'on_error')
+
+    def __init__(  # pylint:disable=too-many-arguments
+        self,
+        func: Callable,
+        event_name: str,
+        call: Callable[..., Awaitable[Any]],
+        timeout: Optional[float],
+        breaker: CircuitBreaker,
+        on_error: Optional[_OnError],
+    ) -> None:
+        self.func = func
+        self.event_name = event_name
+        self.call = call
+        self.timeout = timeout
+        self.breaker = breaker
+        self.on_error = on_error
+
+    async def __call__(self, api: Any, data: Any, server_time: Any) -> Any:
+        if not self.breaker.allow():
+            return None
+        try:
+            if self.timeout is None:
+                result = await self.call(api, data, server_time)
+            else:
+                result = await asyncio.wait_for(
+                    self.call(api, data, server_time), self.timeout
+                )
+        except asyncio.CancelledError:  # pylint:disable=try-except-raise
+            raise
+        except Exception as e:  # pylint:disable=broad-except
+            logger.error('Handler %s %s error: %r', self.event_name, self.func, e)
+            if self.breaker.failed():
+                logger.warning(
+                    'Handler %s %s disabled for %s seconds',
+                    self.event_name,
+                    self.func,
+                    self.breaker.reset_after,
+                )
+            if self.on_error is not None:
+                await self.on_error(self.func, self.event_name, e, api)
+            return None
+        self.breaker.succeeded()
+        return result
@@ -0,0 +1,168 @@
+import logging
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from .metrics import Histogram
+from .typedefs import datetime_or_ns
+from .utils import to_ns
+
+__all__ = ('EventTimes', 'EventLatency', 'LatencyMonitor')
+
+logger = logging.getLogger(__name__)
+
+# event name and FIGI, `None` for events without FIGI or with `by_figi=False`
+LatencyKey = Tuple[str, Optional[str]]  # pragma: no mutate
+
+
+class EventTimes(NamedTuple):
+    """
+    Server `time` of an event, `received`, `parsed` and `done`
+    are `time.time()` values.
+    """
+
+    server_time: datetime_or_ns
+    received: float
+    parsed: float
+    done: float
+
+
+class EventLatency:
+    """
+    Delays of one event and FIGI in seconds:
+
+    - `network` from the server `time` to receive, includes the clock skew;
+    - `parse` from receive to the parsed payload (json and schema);
+    - `handler` from the parsed payload to the handlers done.
+    """
+
+    __slots__ = ('network', 'parse', 'handler')
+
+    def __init__(self) -> None:
+        self.network = Histogram()
+        self.parse = Histogram()
+        self.handler = Histogram()
+
+    @property
+    def skew(self) -> Optional[float]:
+        """
+        Estimate of the local clock offset from the server clock:
+        the minimal `network` delay, the minimal transfer time included.
+        """
+        return self.network.min if self.network.count else None
+
+    def merge(self, other: 'EventLatency') -> None:
+        self.network.merge(other.network)
+        self.parse.merge(other.parse)
+        self.handler.merge(other.handler)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'network': self.network.as_dict(),
+            'parse': self.parse.as_dict(),
+            'handler': self.handler.as_dict(),
+            'skew': self.skew,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}(network={self.network!r}, '
+            f'parse={self.parse!r}, handler={self.handler!r})'
+        )
+
+
+class LatencyMonitor:
+    """
+    Rolling latency histograms of `Streaming` events per event and FIGI.
+
+    Histograms are kept for the current and the previous `window` seconds,
+    so `snapshot` covers the last `window` to 2 × `window` seconds.
+    Every `report_every` seconds the snapshot is passed to `callback`
+    or logged. With a `dispatcher` or `latest_only` handlers
+    the `handler` delay ends when the event is queued.
+
+    ```python
+    monitor = tinvest.LatencyMonitor(report_every=60)
+    config = tinvest.StreamingConfig(latency=monitor)
+    streaming = tinvest.Streaming(TOKEN, config=config)
+    ...
+    print(monitor.snapshot()[("orderbook", "BBG0013HGFT4")].network.quantile(0.99))
+    ```
+    """
+
+    def __init__(
+        self,
+        window: float = 60,
+        *,
+        by_figi: bool = True,
+        report_every: Optional[float] = None,
+        callback: Optional[Callable[[Dict[LatencyKey, EventLatency]], Any]] = None,
+    ) -> None:
+        if window <= 0:
+            raise ValueError(f'not 0 < {window}')
+        self._window = window
+        self._by_figi = by_figi
+        self._report_every = report_every
+        self._callback = callback
+        self._current: Dict[LatencyKey, EventLatency] = {}
+        self._previous: Dict[LatencyKey, EventLatency] = {}
+        self._started: Optional[float] = None
+        self._reported: Optional[float] = None
+
+    def record(self, event_name: str, payload: Any, times: EventTimes) -> None:
+        server_time, received, parsed, done = times
+        if self._started is None:
+            self._started = self._reported = received
+        elif done - self._started >= self._window:
+            self._previous, self._current = self._current, {}
+            self._started = done
+
+        figi = None
+        if self._by_figi and isinstance(payload, dict):
+            figi = payload.get('figi')
+        latency = self._current.get((event_name, figi))
+        if latency is None:
+            latency = self._current[(event_name, figi)] = EventLatency()
+        latency.network.add(received - to_ns(server_time) / 1e9)
+        latency.parse.add(parsed - received)
+        latency.handler.add(done - parsed)
+
+        if self._report_every is not None and (
+            done - self._reported >= self._report_every  # type: ignore
+        ):
+            self._reported = done
+            self.report()
+
+    def snapshot(self) -> Dict[LatencyKey, EventLatency]:
+        result = {key: EventLatency() for key in {**self._previous, **self._current}}
+        for latencies in (self._previous, self._current):
+            for key, latency in latencies.items():
+                result[key].merge(latency)
+        return result
+
+    def skew(self) -> Optional[float]:
+        """
+        Estimate of the local clock offset over all events and FIGIs.
+        """
+        skews = [
+            latency.skew
+            for latency in self.snapshot().values()
+            if latency.skew is not None
+        ]
+        return min(skews) if skews else None
+
+    def report(self) -> None:
+        snapshot = self.snapshot()
+        if self._callback is not None:
+            self._callback(snapshot)
+            return
+        for (event_name, figi), latency in snapshot.items():
+            logger.info(
+                'Latency %s %s: network p50 %.6f p99 %.6f, '
+                'parse p99 %.6f, handler p99 %.6f, skew %.6f',
+                event_name,
+                figi,
+                latency.network.quantile(0.5),
+                latency.network.quantile(0.99),
+                latency.parse.quantile(0.99),
+                latency.handler.quantile(0.99),
+                latency.skew,
+            )
@@ -0,0 +1,79 @@
+from typing import Any, ClassVar, Dict, Tuple, Type
+
+from pydantic import BaseModel  # pylint:disable=no-name-in-module
+
+from .construct import _Converter, _get_field_converter
+from .schemas import CandleStreaming, InstrumentInfoStreaming, OrderbookStreaming
+from .typedefs import AnyDict
+
+__all__ = (
+    'LazyPayload',
+    'LazyCandleStreaming',
+    'LazyOrderbookStreaming',
+    'LazyInstrumentInfoStreaming',
+)
+
+
+class LazyPayload:
+    """
+    Streaming payload that keeps the decoded dict and converts
+    a field only on first access, then caches it as a plain attribute.
+
+    Attribute names are the same as in the `model`.
+    Values are not validated, see `tinvest.construct.get_constructor`.
+    """
+
+    model: ClassVar[Type[BaseModel]]
+    _fields: ClassVar[Dict[str, Tuple[str, _Converter, Any]]]
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)  # type: ignore
+        cls._fields = {
+            name: (field.alias, _get_field_converter(field), field.default)
+            for name, field in cls.model.__fields__.items()
+        }
+
+    def __init__(self, data: AnyDict) -> None:
+        self._data = data
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            alias, converter, default = self._fields[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+        value = self._data.get(alias, default)
+        if converter is not None and value is not None:
+            value = converter(value)
+        self.__dict__[name] = value
+        return value
+
+    @classmethod
+    def parse_obj(cls, data: AnyDict) -> 'LazyPayload':
+        return cls(data)
+
+    def dict(self) -> AnyDict:
+        return {name: getattr(self, name) for name in self._fields}
+
+    def to_model(self) -> Any:
+        return self.model.parse_obj(self._data)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, LazyPayload):
+            return self.model is other.model and self.dict() == other.dict()
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self._data!r})'
+
+
+class LazyCandleStreaming(LazyPayload):
+    model = CandleStreaming
+
+
+class LazyOrderbookStreaming(LazyPayload):
+    model = OrderbookStreaming
+
+
+class LazyInstrumentInfoStreaming(LazyPayload):
+    model = InstrumentInfoStreaming
@@ -0,0 +1,139 @@
+import math
+from array import array
+from typing import Any, Dict
+
+__all__ = ('Timing', 'Histogram')
+
+
+class Timing:
+    """
+    Count, total and maximum of measured durations in seconds.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.mean,
+            'max': self.max,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}('
+            f'count={self.count}, mean={self.mean:.6f}, max={self.max:.6f})'
+        )
+
+
+class Histogram:
+    """
+    Log-scale histogram of durations in seconds, `per_decade` buckets
+    per power of ten from `low` to `high`. Values out of the range are counted
+    in the first or the last bucket, quantiles are upper bounds of buckets,
+    count, mean, min and max are exact.
+    """
+
+    __slots__ = ('low', 'per_decade', 'counts', 'count', 'total', 'min', 'max')
+
+    def __init__(
+        self, low: float = 1e-6, high: float = 100.0, per_decade: int = 10
+    ) -> None:
+        if not 0 < low < high:
+            raise ValueError(f'not 0 < {low} < {high}')
+        self.low = low
+        self.per_decade = per_decade
+        size = math.ceil(math.log10(high / low) * per_decade) + 1
+        self.counts = array('L', bytes(array('L').itemsize * size))
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        index = 0
+        if value > self.low:
+            index = min(
+                math.ceil(math.log10(value / self.low) * self.per_decade),
+                len(self.counts) - 1,
+            )
+        self.counts[index] += 1
+
+    def merge(self, other: 'Histogram') -> None:
+        if (other.low, other.per_decade, len(other.counts)) != (
+            self.low,
+            self.per_decade,
+            len(self.counts),
+        ):
+            raise ValueError('Histograms have different buckets')
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        if not 0 <= q <= 1:
+            raise ValueError(f'not 0 <= {q} <= 1')
+        if not self.count:
+            return 0.0
+        i = self._find(max(math.ceil(q * self.count), 1))
+        if i == len(self.counts) - 1:
+            return self.max
+        bound = self.low * 10 ** (i / self.per_decade)
+        return min(max(bound, self.min), self.max)
+
+    def _find(self, rank: int) -> int:
+        """
+        Index of the bucket with the `rank`-th value.
+        """
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return i
+        return len(self.counts) - 1  # pragma: no cover
+
+    def as_dict(self) -> Dict[str, Any]:
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}(count={self.count}, '
+            f'p50={self.quantile(0.5):.6f}, p99={self.quantile(0.99):.6f})'
+        )
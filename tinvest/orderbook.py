@@ -0,0 +1,246 @@
+from array import array
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .dispatch import get_figi
+
+__all__ = ('LocalOrderbook', 'LocalOrderbooks')
+
+MAX_DEPTH = 20  # pragma: no mutate
+
+_Level = Tuple[float, float]  # pragma: no mutate
+
+
+class _Side:
+    """
+    Price, quantity and cumulative quantity columns of one side.
+    """
+
+    __slots__ = ('prices', 'quantities', 'cumulative', 'count')
+
+    def __init__(self, depth: int) -> None:
+        zeros = [0.0] * depth
+        self.prices = array('d', zeros)
+        self.quantities = array('d', zeros)
+        self.cumulative = array('d', zeros)
+        self.count = 0
+
+    def fill(self, levels: Iterable[Any]) -> None:
+        prices, quantities, cumulative = self.prices, self.quantities, self.cumulative
+        depth = len(prices)
+        total = 0.0
+        count = 0
+        for price, quantity in levels:
+            if count == depth:
+                break
+            prices[count] = price
+            quantities[count] = quantity
+            total += quantity
+            cumulative[count] = total
+            count += 1
+        self.count = count
+
+    def total(self, levels: int) -> float:
+        levels = min(levels, self.count)
+        return self.cumulative[levels - 1] if levels > 0 else 0.0
+
+    def level(self, level: int) -> _Level:
+        if not 0 <= level < self.count:
+            raise IndexError(level)
+        return self.prices[level], self.quantities[level]
+
+
+def _rest_levels(levels: Iterable[Any]) -> Iterator[_Level]:
+    for level in levels:
+        if isinstance(level, dict):
+            yield level['price'], level['quantity']
+        else:
+            yield level.price, level.quantity
+
+
+def _get(data: Any, name: str) -> Any:
+    if isinstance(data, dict):
+        return data[name]
+    return getattr(data, name)
+
+
+def _get_rest_payload(orderbook: Any) -> Any:
+    if isinstance(orderbook, dict):
+        return orderbook.get('payload', orderbook)
+    return getattr(orderbook, 'payload', orderbook)
+
+
+class LocalOrderbook:
+    """
+    Order book of one FIGI in preallocated `array` columns, best level first.
+    Snapshots overwrite the columns in place, no object is created per level.
+    """
+
+    __slots__ = ('figi', 'depth', 'server_time', 'updates', '_bids', '_asks')
+
+    def __init__(self, figi: str, depth: int = MAX_DEPTH) -> None:
+        if not 0 < depth <= MAX_DEPTH:
+            raise ValueError(f'not 0 < {depth} <= {MAX_DEPTH}')
+        self.figi = figi
+        self.depth = depth
+        self.server_time: Optional[datetime] = None
+        self.updates = 0
+        self._bids = _Side(depth)
+        self._asks = _Side(depth)
+
+    def update(
+        self,
+        bids: Iterable[Any],
+        asks: Iterable[Any],
+        server_time: Optional[datetime] = None,
+    ) -> None:
+        """
+        `bids` and `asks` are (price, quantity) pairs, best level first,
+        levels deeper than `depth` are ignored.
+        """
+        self._bids.fill(bids)
+        self._asks.fill(asks)
+        self.server_time = server_time
+        self.updates += 1
+
+    def apply_streaming(
+        self, payload: Any, server_time: Optional[datetime] = None
+    ) -> None:
+        """
+        Updates from `OrderbookStreaming`, a lazy or trusted payload or a dict.
+        """
+        self.update(_get(payload, 'bids'), _get(payload, 'asks'), server_time)
+
+    def apply_rest(self, orderbook: Any) -> None:
+        """
+        Updates from `OrderbookResponse` or its `Orderbook` payload,
+        models or dicts.
+        """
+        orderbook = _get_rest_payload(orderbook)
+        self.update(
+            _rest_levels(_get(orderbook, 'bids')),
+            _rest_levels(_get(orderbook, 'asks')),
+        )
+
+    @property
+    def bid_count(self) -> int:
+        return self._bids.count
+
+    @property
+    def ask_count(self) -> int:
+        return self._asks.count
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        return self._bids.prices[0] if self._bids.count else None
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        return self._asks.prices[0] if self._asks.count else None
+
+    @property
+    def spread(self) -> Optional[float]:
+        if not self.bid_count or not self.ask_count:
+            return None
+        return self._asks.prices[0] - self._bids.prices[0]
+
+    @property
+    def mid(self) -> Optional[float]:
+        if not self.bid_count or not self.ask_count:
+            return None
+        return (self._asks.prices[0] + self._bids.prices[0]) / 2
+
+    def bid_depth(self, levels: int = MAX_DEPTH) -> float:
+        """
+        Total quantity of the best `levels` bids.
+        """
+        return self._bids.total(levels)
+
+    def ask_depth(self, levels: int = MAX_DEPTH) -> float:
+        """
+        Total quantity of the best `levels` asks.
+        """
+        return self._asks.total(levels)
+
+    def bid(self, level: int) -> _Level:
+        return self._bids.level(level)
+
+    def ask(self, level: int) -> _Level:
+        return self._asks.level(level)
+
+    @property
+    def bids(self) -> List[_Level]:
+        return [self.bid(i) for i in range(self.bid_count)]
+
+    @property
+    def asks(self) -> List[_Level]:
+        return [self.ask(i) for i in range(self.ask_count)]
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}({self.figi!r}, '
+            f'bid={self.best_bid}, ask={self.best_ask})'
+        )
+
+
+class LocalOrderbooks:
+    """
+    Local order books by FIGI, kept up to date by the `handle` orderbook
+    handler. Use it with `StreamingConfig(lazy=True)` or `trusted=True`
+    so that snapshots are not validated level by level.
+
+    ```python
+    books = tinvest.LocalOrderbooks()
+    events.orderbook()(books.handle)
+
+    response = tinvest.MarketApi(client).market_orderbook_get(figi, 20)
+    books.apply_rest(response.parse_json())
+
+    book = books[figi]
+    print(book.best_bid, book.best_ask, book.spread, book.bid_depth(5))
+    ```
+    """
+
+    def __init__(self, depth: int = MAX_DEPTH) -> None:
+        if not 0 < depth <= MAX_DEPTH:
+            raise ValueError(f'not 0 < {depth} <= {MAX_DEPTH}')
+        self._depth = depth
+        self._books: Dict[str, LocalOrderbook] = {}
+
+    def get_or_create(self, figi: str) -> LocalOrderbook:
+        if figi not in self._books:
+            self._books[figi] = LocalOrderbook(figi, self._depth)
+        return self._books[figi]
+
+    def apply_streaming(
+        self, payload: Any, server_time: Optional[datetime] = None
+    ) -> LocalOrderbook:
+        book = self.get_or_create(get_figi(payload))  # type: ignore
+        book.apply_streaming(payload, server_time)
+        return book
+
+    def apply_rest(self, orderbook: Any) -> LocalOrderbook:
+        figi = _get(_get_rest_payload(orderbook), 'figi')
+        book = self.get_or_create(figi)
+        book.apply_rest(orderbook)
+        return book
+
+    async def handle(  # pylint:disable=unused-argument
+        self, api: Any, payload: Any, server_time: Optional[datetime] = None
+    ) -> None:
+        self.apply_streaming(payload, server_time)
+
+    def get(self, figi: str) -> Optional[LocalOrderbook]:
+        return self._books.get(figi)
+
+    def __getitem__(self, figi: str) -> LocalOrderbook:
+        return self._books[figi]
+
+    def __contains__(self, figi: str) -> bool:
+        return figi in self._books
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._books)
+
+    def __len__(self) -> int:
+        return len(self._books)
@@ -0,0 +1,200 @@
+import asyncio
+import threading
+import time
+from enum import Enum
+from typing import Any, Callable, Dict, Mapping, NamedTuple, Optional
+
+from .metrics import Timing
+
+__all__ = (
+    'RateGroup',
+    'RateLimit',
+    'DEFAULT_LIMITS',
+    'TokenBucket',
+    'RateLimiter',
+    'get_rate_group',
+)
+
+
+class RateGroup(str, Enum):
+    market = 'market'
+    orders = 'orders'
+    portfolio = 'portfolio'
+    operations = 'operations'
+    sandbox = 'sandbox'
+    streaming = 'streaming'
+
+
+class RateLimit(NamedTuple):
+    """
+    At most `tokens` requests in any `period` seconds,
+    `burst` of them can be sent at once.
+    """
+
+    tokens: int
+    period: float = 60
+    burst: int = 1
+
+
+# requests per minute of the API, `/user` requests count as portfolio ones
+DEFAULT_LIMITS: Dict[RateGroup, RateLimit] = {
+    RateGroup.market: RateLimit(240),
+    RateGroup.orders: RateLimit(100),
+    RateGroup.portfolio: RateLimit(120),
+    RateGroup.operations: RateLimit(120),
+    RateGroup.sandbox: RateLimit(120),
+    RateGroup.streaming: RateLimit(120),
+}
+
+_PATH_GROUPS = {group.value: group for group in RateGroup}
+_PATH_GROUPS['user'] = RateGroup.portfolio
+
+
+def get_rate_group(path: str) -> Optional[RateGroup]:
+    """
+    Group of a REST path, e.g. `/market/candles` is `RateGroup.market`.
+    """
+    return _PATH_GROUPS.get(path.lstrip('/').split('/', 1)[0])
+
+
+class TokenBucket:
+    """
+    Token bucket of `capacity` tokens refilled at `rate` tokens per second.
+
+    A request takes a token right away and waits until the token is refilled,
+    so requests are served in the order they came from every thread
+    and event loop, and waiting requests never let a newer one in.
+    A cancelled `acquire` gives its token back.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = 1,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError(f'not 0 < {rate}')
+        if capacity < 1:
+            raise ValueError(f'not 1 <= {capacity}')
+        self.rate = rate
+        self.capacity = capacity
+        self.wait = Timing()
+        self.pending = 0
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Takes a token, returns the seconds to wait before using it.
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            delay = max(-self._tokens / self.rate, 0.0)
+            self.wait.add(delay)
+            return delay
+
+    def release(self) -> None:
+        """
+        Gives back a reserved token that was not used.
+        """
+        with self._lock:
+            self._tokens += 1
+
+    async def acquire(self) -> float:
+        delay = self.reserve()
+        if not delay:
+            return delay
+        self.pending += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.release()
+            raise
+        finally:
+            self.pending -= 1
+        return delay
+
+    def acquire_blocking(self) -> float:
+        delay = self.reserve()
+        if delay:
+            self.pending += 1
+            try:
+                time.sleep(delay)
+            finally:
+                self.pending -= 1
+        return delay
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = dict(self.__dict__)
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+class RateLimiter:
+    """
+    Paces requests of `AsyncClient`, `SyncClient` and streaming subscriptions
+    by the request limits of the API, a `TokenBucket` per `RateGroup`.
+
+    `limits` override `DEFAULT_LIMITS`, a `RateLimit(tokens, period, burst)`
+    never exceeds `tokens` requests in any `period` seconds.
+    Requests of paths out of the groups are not paced. One limiter can be
+    shared by clients and `Streaming` of the same token, wait times
+    are collected per group in `stats`. Processes get a copy of the limiter,
+    so the budget is not shared between them.
+
+    ```python
+    limiter = tinvest.RateLimiter({"market": tinvest.RateLimit(240, burst=10)})
+    client = tinvest.AsyncClient(TOKEN, rate_limiter=limiter)
+    config = tinvest.StreamingConfig(rate_limiter=limiter)
+    streaming = tinvest.Streaming(TOKEN, config=config)
+    ...
+    print(limiter.stats)
+    ```
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Mapping[Any, RateLimit]] = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        merged = dict(DEFAULT_LIMITS)
+        for group, limit in (limits or {}).items():
+            merged[RateGroup(group)] = RateLimit(*limit)
+        self.buckets: Dict[RateGroup, TokenBucket] = {}
+        for group, (tokens, period, burst) in merged.items():
+            if not 0 < burst < tokens:
+                raise ValueError(f'not 0 < {burst} < {tokens}')
+            self.buckets[group] = TokenBucket(
+                (tokens - burst) / period, burst, clock=clock
+            )
+
+    @property
+    def stats(self) -> Dict[RateGroup, Timing]:
+        return {group: bucket.wait for group, bucket in self.buckets.items()}
+
+    async def acquire(self, group: Optional[RateGroup]) -> float:
+        """
+        Waits for a request of `group`, returns the waited seconds.
+        """
+        if group is None:
+            return 0.0
+        return await self.buckets[group].acquire()
+
+    def acquire_blocking(self, group: Optional[RateGroup]) -> float:
+        if group is None:
+            return 0.0
+        return self.buckets[group].acquire_blocking()
@@ -0,0 +1,128 @@
+import asyncio
+import gzip
+import os
+import struct
+from typing import IO, Any, AsyncIterator, Iterator, NamedTuple, Optional, Union
+
+import aiohttp
+
+__all__ = ('Record', 'Recorder', 'Replay', 'read_records')
+
+MAGIC = b'TINVREC1'  # pragma: no mutate
+GZIP_MAGIC = b'\x1f\x8b'  # pragma: no mutate
+
+# length of data, receive time and server time in epoch nanoseconds
+_HEADER = struct.Struct('<Iqq')  # pragma: no mutate
+
+
+class Record(NamedTuple):
+    received_ns: int
+    server_ns: int
+    data: bytes
+
+
+class Recorder:
+    """
+    Appends raw streaming messages with the receive and server time
+    to a length-prefixed binary log, gzip-compressed with `compress=True`.
+
+    ```python
+    with tinvest.Recorder("orderbook.rec", compress=True) as recorder:
+        config = tinvest.StreamingConfig(recorder=recorder)
+        await tinvest.Streaming(TOKEN, config=config).add_handlers(events).run()
+    ```
+    """
+
+    def __init__(
+        self, path: str, *, compress: bool = False, flush_every: int = 100
+    ) -> None:
+        self._path = path
+        self._flush_every = flush_every
+        self._unflushed = 0
+        new = not os.path.exists(path) or not os.path.getsize(path)
+        if not new and _is_compressed(path) != compress:
+            raise ValueError(f'{path} compression does not match')
+        opener: Any = gzip.open if compress else open
+        self._file: IO[bytes] = opener(path, 'ab')
+        if new:
+            self._file.write(MAGIC)
+
+    def write(self, data: Union[str, bytes], received_ns: int, server_ns: int) -> None:
+        if isinstance(data, str):
+            data = data.encode()
+        self._file.write(_HEADER.pack(len(data), received_ns, server_ns))
+        self._file.write(data)
+        self._unflushed += 1
+        if self._unflushed >= self._flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        self._file.flush()
+        self._unflushed = 0
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> 'Recorder':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+def _is_compressed(path: str) -> bool:
+    with open(path, 'rb') as f:
+        return f.read(len(GZIP_MAGIC)) == GZIP_MAGIC
+
+
+def read_records(path: str) -> Iterator[Record]:
+    opener: Any = gzip.open if _is_compressed(path) else open
+    with opener(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} is not a streaming record')
+        while True:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return
+            length, received_ns, server_ns = _HEADER.unpack(header)
+            data = f.read(length)
+            if len(data) < length:
+                return
+            yield Record(received_ns, server_ns, data)
+
+
+class Replay:
+    """
+    Source of recorded messages for `Streaming.replay`, no network is used.
+    `speed=None` replays as fast as possible, `speed=1` at the recorded speed,
+    `speed=2` twice as fast. Subscribe calls of handlers are ignored.
+
+    ```python
+    await streaming.add_handlers(events).replay(tinvest.Replay("orderbook.rec"))
+    ```
+    """
+
+    def __init__(self, path: str, *, speed: Optional[float] = None) -> None:
+        if speed is not None and speed <= 0:
+            raise ValueError(f'not 0 < {speed}')
+        self._path = path
+        self._speed = speed
+        self.count = 0
+
+    async def send_json(self, data: Any) -> None:
+        pass
+
+    async def __aiter__(self) -> AsyncIterator[aiohttp.WSMessage]:
+        loop = asyncio.get_event_loop()
+        started_at = loop.time()
+        first_ns = None
+        for record in read_records(self._path):
+            if self._speed is not None:
+                if first_ns is None:
+                    first_ns = record.received_ns
+                offset = (record.received_ns - first_ns) / 1e9 / self._speed
+                delay = started_at + offset - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            self.count += 1
+            yield aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, record.data, None)
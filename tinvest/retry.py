@@ -0,0 +1,163 @@
+import copy
+import logging
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Collection, Dict, Mapping, Optional
+
+from .backoff import Backoff
+from .metrics import Timing
+
+__all__ = (
+    'RETRY_STATUSES',
+    'RetryPolicy',
+    'RetryState',
+    'RetryStats',
+    'parse_retry_after',
+)
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))  # pragma: no mutate
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds of a `Retry-After` header, delay seconds or an HTTP date.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max((date - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class RetryStats:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.retries = 0
+        self.gave_up = 0
+        self.delays = Timing()
+        self.reasons: Dict[str, int] = {}
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'gave_up': self.gave_up,
+            'delays': self.delays.as_dict(),
+            'reasons': dict(self.reasons),
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}(requests={self.requests}, '
+            f'retries={self.retries}, gave_up={self.gave_up})'
+        )
+
+
+class RetryPolicy:
+    """
+    Retries of `AsyncClient` and `SyncClient` requests.
+
+    A request of `methods` is retried after a connection error, a timeout
+    or a response with one of `statuses`, at most `attempts` attempts
+    in total. The delay is the `Retry-After` header of the response if any,
+    otherwise the next delay of a copy of `backoff`. No retry is started
+    if it would end later than `deadline` seconds after the first attempt,
+    the last response or error is returned to the caller then.
+
+    Only GET requests are retried by default, so orders are never
+    placed twice. Retries, delays and their reasons are collected in `stats`.
+
+    ```python
+    policy = tinvest.RetryPolicy(attempts=5, deadline=30)
+    client = tinvest.AsyncClient(TOKEN, retry_policy=policy)
+    ...
+    print(policy.stats.as_dict())
+    ```
+    """
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        *,
+        backoff: Optional[Backoff] = None,
+        deadline: Optional[float] = 30,
+        statuses: Collection[int] = RETRY_STATUSES,
+        methods: Collection[str] = ('GET',),
+    ) -> None:
+        if attempts < 1:
+            raise ValueError(f'not 0 < {attempts}')
+        self.attempts = attempts
+        self.backoff = backoff or Backoff(base=0.5, cap=10)
+        self.deadline = deadline
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(method.upper() for method in methods)
+        self.stats = RetryStats()
+
+    def start(self, method: str) -> 'RetryState':
+        self.stats.requests += 1
+        if method.upper() not in self.methods:
+            return RetryState(None)
+        return RetryState(self)
+
+
+class RetryState:
+    """
+    Retries of one request, a `None` delay means no retry.
+    A state without a policy never retries.
+    """
+
+    def __init__(self, policy: Optional[RetryPolicy]) -> None:
+        self._policy = policy
+        self._backoff = copy.copy(policy.backoff) if policy else None
+        self._started = time.monotonic()
+        self._attempts = 1
+        if self._backoff is not None:
+            self._backoff.reset()
+
+    def on_response(self, status: int, headers: Mapping[str, str]) -> Optional[float]:
+        if self._policy is None or status not in self._policy.statuses:
+            return None
+        retry_after = parse_retry_after(headers.get('Retry-After'))
+        return self._next_delay(self._policy, str(status), retry_after)
+
+    def on_error(self, error: BaseException) -> Optional[float]:
+        if self._policy is None:
+            return None
+        return self._next_delay(self._policy, type(error).__name__, None)
+
+    def _next_delay(
+        self, policy: RetryPolicy, reason: str, retry_after: Optional[float]
+    ) -> Optional[float]:
+        assert self._backoff is not None
+        if self._attempts >= policy.attempts:
+            self._give_up(policy, reason)
+            return None
+        delay = self._backoff.next_delay()
+        if retry_after is not None:
+            delay = retry_after
+        elapsed = time.monotonic() - self._started
+        if policy.deadline is not None and elapsed + delay > policy.deadline:
+            self._give_up(policy, reason)
+            return None
+
+        self._attempts += 1
+        policy.stats.retries += 1
+        policy.stats.delays.add(delay)
+        policy.stats.reasons[reason] = policy.stats.reasons.get(reason, 0) + 1
+        logger.info('Retry %s in %.3fs after %s', self._attempts, delay, reason)
+        return delay
+
+    def _give_up(self, policy: RetryPolicy, reason: str) -> None:
+        policy.stats.gave_up += 1
+        logger.warning('Gave up after %s attempts: %s', self._attempts, reason)
@@ -0,0 +1,359 @@
+import asyncio
+import logging
+import multiprocessing
+import zlib
+from bisect import bisect, insort
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import aiohttp
+
+from .schemas import EventName
+from .streaming import (
+    CandleEvent,
+    InstrumentInfoEvent,
+    OrderbookEvent,
+    Streaming,
+    StreamingApi,
+    StreamingConfig,
+    StreamingEvents,
+    _Handler,
+)
+from .subscriptions import SubscriptionRegistry
+from .typedefs import AnyDict
+
+__all__ = ('HashRing', 'ShardedStreaming', 'ShardedStreamingApi')
+
+logger = logging.getLogger(__name__)
+
+# state of one connection, can not be shared between shards
+PER_SHARD = ('subscriptions', 'dispatcher', 'executor')  # pragma: no mutate
+
+
+def _hash(key: str) -> int:
+    return zlib.crc32(key.encode())
+
+
+class HashRing:
+    """
+    Consistent hashing: removing a node moves only the keys of that node.
+    """
+
+    def __init__(self, nodes: Iterable[int] = (), replicas: int = 100) -> None:
+        self._replicas = replicas
+        self._ring: List[Tuple[int, int]] = []
+        self._hashes: List[int] = []
+        self._nodes: List[int] = []
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node: int) -> None:
+        if node in self._nodes:
+            return
+        self._nodes.append(node)
+        for i in range(self._replicas):
+            insort(self._ring, (_hash(f'{node}:{i}'), node))
+        self._hashes = [h for h, _ in self._ring]
+
+    def remove(self, node: int) -> None:
+        if node not in self._nodes:
+            return
+        self._nodes.remove(node)
+        self._ring = [(h, n) for h, n in self._ring if n != node]
+        self._hashes = [h for h, _ in self._ring]
+
+    def get(self, key: str) -> int:
+        if not self._ring:
+            raise LookupError('Ring is empty')
+        i = bisect(self._hashes, _hash(key)) % len(self._ring)
+        return self._ring[i][1]
+
+    def __contains__(self, node: int) -> bool:
+        return node in self._nodes
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+
+class _RoutedEvent:
+    event_name: EventName
+
+    def __init__(self, sharded: 'ShardedStreaming') -> None:
+        self.ws: Any = None
+        self.subscriptions: Optional[SubscriptionRegistry] = None
+        self._sharded = sharded
+
+    async def _subscribe(self, payload: AnyDict) -> None:
+        await self._sharded.subscribe(self.event_name, payload)
+
+    async def _unsubscribe(self, payload: AnyDict) -> None:
+        await self._sharded.unsubscribe(self.event_name, payload)
+
+
+class _RoutedCandleEvent(_RoutedEvent, CandleEvent):
+    pass
+
+
+class _RoutedOrderbookEvent(_RoutedEvent, OrderbookEvent):
+    pass
+
+
+class _RoutedInstrumentInfoEvent(_RoutedEvent, InstrumentInfoEvent):
+    pass
+
+
+class ShardedStreamingApi(StreamingApi):
+    """
+    `StreamingApi` that sends every subscription to the shard owning the FIGI.
+    """
+
+    def __init__(  # pylint:disable=super-init-not-called
+        self, sharded: 'ShardedStreaming', state: Optional[AnyDict] = None
+    ) -> None:
+        self.candle = _RoutedCandleEvent(sharded)
+        self.orderbook = _RoutedOrderbookEvent(sharded)
+        self.instrument_info = _RoutedInstrumentInfoEvent(sharded)
+        self._sharded = sharded
+        self._state = state
+
+    @property  # type: ignore
+    def subscriptions(self) -> SubscriptionRegistry:  # type: ignore
+        return self._sharded.subscriptions
+
+
+class _Shard(Streaming):
+    def __init__(
+        self, sharded: 'ShardedStreaming', index: int, token: str, **kwargs: Any
+    ) -> None:
+        super().__init__(token, **kwargs)
+        self.index = index
+        self._sharded = sharded
+
+    def _create_api(self, ws) -> StreamingApi:
+        return self._sharded.api
+
+    async def close(self) -> None:
+        """
+        A session passed to `ShardedStreaming` is closed once by its `close`.
+        """
+        shared = self._sharded._session  # pylint:disable=protected-access
+        if self._session is not shared:
+            await super().close()
+        elif self._config.process_pool is not None:
+            self._config.process_pool.close()
+
+    async def send(self, event_name: str, action: str, payload: AnyDict) -> None:
+        """
+        Sends a message if connected, paced by the rate limiter of the shard.
+        """
+        if self.ws is None:
+            return
+        await self.subscriptions.throttle()
+        await self.ws.send_json({'event': f'{event_name}:{action}', **payload})
+
+    async def _run(self, ws):
+        await self._sharded._shard_up(self)  # pylint:disable=protected-access
+        try:
+            await super()._run(ws)
+        except (asyncio.TimeoutError, aiohttp.ClientError):
+            await self._sharded._shard_down(self)  # pylint:disable=protected-access
+            raise
+        await self._sharded._shard_down(self)  # pylint:disable=protected-access
+
+
+class ShardedStreaming:
+    """
+    Spreads subscriptions across `shards` websocket connections
+    by a consistent hash of FIGI. Every shard calls the same handlers,
+    and `api` passed to the handlers routes subscribe calls to the owning shard.
+
+    When a shard loses its connection, its subscriptions move to the other
+    shards and come back after it reconnects. Startup, cleanup and reconnect
+    handlers are called for every shard connection.
+
+    With `processes=True` every shard runs in its own process:
+    handlers must be picklable, each process keeps only subscriptions
+    of its own FIGIs and subscriptions are not moved between processes.
+    Subscriptions made before `run` are sent by the owning process.
+
+    Every shard has its own `aiohttp` session, a `session` passed
+    is shared by the shards and closed once by `close`.
+    Other keyword arguments are passed to every `Streaming`, `config`
+    can not set `subscriptions`, `dispatcher` or `executor`:
+    every shard has its own.
+
+    ```python
+    await (
+        tinvest.ShardedStreaming(TOKEN, shards=4)
+        .add_handlers(events)
+        .run()
+    )
+    ```
+    """
+
+    def __init__(
+        self,
+        token: str,
+        shards: int = 2,
+        *,
+        processes: bool = False,
+        replicas: int = 100,
+        **kwargs: Any,
+    ) -> None:
+        if shards < 1:
+            raise ValueError(f'not 0 < {shards}')
+        if processes and 'session' in kwargs:
+            raise ValueError('Session can not be shared between processes')
+        if not token:
+            raise ValueError('Token can not be empty')
+        config = kwargs.get('config') or StreamingConfig()
+        for name in PER_SHARD:
+            if getattr(config, name) is not None:
+                raise ValueError(f'{name} can not be shared between shards')
+        self._token = token
+        self._processes = processes
+        self._session: Optional[aiohttp.ClientSession] = kwargs.pop('session', None)
+        self._kwargs = kwargs
+        self._handlers: List[_Handler] = []
+        self._ring = HashRing(range(shards), replicas)
+        self._shards: Dict[int, _Shard] = {}
+        # subscriptions of the shards running in other processes
+        self._pending = SubscriptionRegistry()
+        self._count = shards
+        self.api = ShardedStreamingApi(self, kwargs.get('state'))
+        if not processes:
+            self._create_shards(range(shards))
+
+    @property
+    def shards(self) -> List[Streaming]:
+        return list(self._shards.values())
+
+    @property
+    def subscriptions(self) -> SubscriptionRegistry:
+        """
+        A copy of the subscriptions of all shards.
+        """
+        registry = SubscriptionRegistry()
+        for event_name, payload in self._pending:
+            registry.add(event_name, payload)
+        for shard in self._shards.values():
+            for event_name, payload in shard.subscriptions:
+                registry.add(event_name, payload)
+        return registry
+
+    def get_shard(self, figi: str) -> int:
+        return self._ring.get(figi)
+
+    def add_handlers(
+        self, handlers: Union[List[_Handler], StreamingEvents]
+    ) -> 'ShardedStreaming':
+        if not isinstance(handlers, list):
+            handlers = handlers.handlers
+        self._handlers.extend(handlers)
+        for shard in self._shards.values():
+            shard.add_handlers(list(handlers))
+        return self
+
+    async def subscribe(self, event_name: str, payload: AnyDict) -> None:
+        shard = self._shards.get(self.get_shard(payload['figi']))
+        if shard is not None:
+            if shard.subscriptions.add(event_name, payload):
+                await shard.send(event_name, 'subscribe', payload)
+        elif not self._shards:
+            # sent by the owning process when it starts
+            self._pending.add(event_name, payload)
+
+    async def unsubscribe(self, event_name: str, payload: AnyDict) -> None:
+        self._pending.remove(event_name, payload)
+        for shard in self._shards.values():
+            if shard.subscriptions.remove(event_name, payload):
+                await shard.send(event_name, 'unsubscribe', payload)
+
+    async def run(self) -> None:
+        if self._processes:
+            await self._run_processes()
+            return
+        try:
+            await asyncio.gather(*[shard.run() for shard in self._shards.values()])
+        except asyncio.CancelledError:
+            await self.close()
+            raise
+
+    async def close(self) -> None:
+        for shard in self._shards.values():
+            await shard.close()
+        if self._session is not None:
+            await self._session.close()
+
+    def _create_shards(self, indices: Iterable[int]) -> None:
+        for index in indices:
+            shard = _Shard(
+                self, index, self._token, session=self._session, **self._kwargs
+            )
+            shard.add_handlers(list(self._handlers))
+            self._shards[index] = shard
+        pending = list(self._pending)
+        self._pending.clear()
+        for event_name, payload in pending:
+            owner = self._shards.get(self.get_shard(payload['figi']))
+            if owner is not None:
+                owner.subscriptions.add(event_name, payload)
+
+    async def _run_processes(self) -> None:
+        loop = asyncio.get_event_loop()
+        processes = [
+            multiprocessing.Process(target=_run_process, args=(self, index))
+            for index in range(self._count)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            await asyncio.gather(
+                *[loop.run_in_executor(None, process.join) for process in processes]
+            )
+        finally:
+            for process in processes:
+                process.terminate()
+
+    async def _shard_up(self, shard: _Shard) -> None:
+        if self._processes or shard.index in self._ring:
+            return
+        self._ring.add(shard.index)
+        moved = [
+            (other, event_name, payload)
+            for other in self._shards.values()
+            if other is not shard
+            for event_name, payload in other.subscriptions
+            if self.get_shard(payload['figi']) == shard.index
+        ]
+        for other, event_name, payload in moved:
+            other.subscriptions.remove(event_name, payload)
+            shard.subscriptions.add(event_name, payload)
+            await other.send(event_name, 'unsubscribe', payload)
+        logger.info(
+            'Shard %s is up, %s subscriptions', shard.index, len(shard.subscriptions)
+        )
+
+    async def _shard_down(self, shard: _Shard) -> None:
+        if self._processes or len(self._ring) < 2 or shard.index not in self._ring:
+            return
+        self._ring.remove(shard.index)
+        moved = list(shard.subscriptions)
+        shard.subscriptions.clear()
+        for event_name, payload in moved:
+            await self.subscribe(event_name, payload)
+        logger.info('Shard %s is down, %s subscriptions moved', shard.index, len(moved))
+
+
+def _run_process(sharded: ShardedStreaming, index: int) -> None:
+    async def main() -> None:
+        sharded._create_shards([index])  # pylint:disable=protected-access
+        shard = sharded._shards[index]  # pylint:disable=protected-access
+        try:
+            await shard.run()
+        finally:
+            await shard.close()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
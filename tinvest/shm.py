@@ -0,0 +1,368 @@
+import asyncio
+import logging
+import struct
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from .candles import read_candle
+from .dispatch import _get_varnames, event_key
+from .metrics import Timing
+from .orderbook import MAX_DEPTH, LocalOrderbooks, _get
+from .schemas import CandleResolution, CandleStreaming, EventName
+from .utils import to_ns
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # pragma: no cover
+    shared_memory = None  # type: ignore # pragma: no mutate
+
+__all__ = ('SharedMemoryPool',)
+
+logger = logging.getLogger(__name__)
+
+_ORDERBOOK = 1  # pragma: no mutate
+_CANDLE = 2  # pragma: no mutate
+
+# kind, figi, interval, depth, bid count, ask count, server time in epoch ns
+_HEADER = struct.Struct('<B12s8sBBBq')  # pragma: no mutate
+# prices and quantities of bids, then of asks
+_LEVELS = struct.Struct(f'<{MAX_DEPTH * 4}d')  # pragma: no mutate
+_ASKS = MAX_DEPTH * 2  # pragma: no mutate
+# time in epoch ns, open, high, low, close, volume
+_CANDLE_BODY = struct.Struct('<q4dq')  # pragma: no mutate
+_SLOT_SIZE = _HEADER.size + max(_LEVELS.size, _CANDLE_BODY.size)  # pragma: no mutate
+
+_KINDS = {EventName.orderbook.value: _ORDERBOOK, EventName.candle.value: _CANDLE}
+
+# (ok, result or exception) of every handler
+_Results = List[Tuple[bool, Any]]  # pragma: no mutate
+
+
+def _from_ns(ns: int) -> datetime:
+    seconds, fraction = divmod(ns, 1_000_000_000)
+    return datetime.fromtimestamp(seconds, timezone.utc).replace(
+        microsecond=fraction // 1000
+    )
+
+
+def _pack_levels(
+    bids: Sequence[Any], asks: Sequence[Any]
+) -> Tuple[List[float], int, int]:
+    values = [0.0] * (MAX_DEPTH * 4)
+    bid_count = min(len(bids), MAX_DEPTH)
+    ask_count = min(len(asks), MAX_DEPTH)
+    for i in range(bid_count):
+        values[2 * i], values[2 * i + 1] = bids[i]
+    for i in range(ask_count):
+        values[_ASKS + 2 * i], values[_ASKS + 2 * i + 1] = asks[i]
+    return values, bid_count, ask_count
+
+
+def _encode_orderbook(buf: Any, offset: int, data: Any, server_ns: int) -> None:
+    values, bid_count, ask_count = _pack_levels(_get(data, 'bids'), _get(data, 'asks'))
+    _HEADER.pack_into(
+        buf,
+        offset,
+        _ORDERBOOK,
+        _get(data, 'figi').encode(),
+        b'',
+        _get(data, 'depth'),
+        bid_count,
+        ask_count,
+        server_ns,
+    )
+    _LEVELS.pack_into(buf, offset + _HEADER.size, *values)
+
+
+def _encode_candle(buf: Any, offset: int, data: Any, server_ns: int) -> None:
+    figi, interval, time, *ohlcv = read_candle(data)
+    _HEADER.pack_into(
+        buf, offset, _CANDLE, figi.encode(), interval.encode(), 0, 0, 0, server_ns
+    )
+    _CANDLE_BODY.pack_into(buf, offset + _HEADER.size, to_ns(time), *ohlcv)
+
+
+def _encode(buf: Any, offset: int, event_name: str, data: Any, server_ns: int) -> None:
+    """
+    Writes an orderbook or candle payload as a fixed-layout record.
+    """
+    if event_name == EventName.orderbook:
+        _encode_orderbook(buf, offset, data, server_ns)
+    else:
+        _encode_candle(buf, offset, data, server_ns)
+
+
+class _Worker:
+    """
+    State of a pool process.
+    """
+
+    def __init__(self, buf: Any, handlers: Sequence[Callable]) -> None:
+        self.buf = buf
+        self.handlers = handlers
+        self.receive_server_time = [
+            'server_time' in _get_varnames(handler) for handler in handlers
+        ]
+        self.books = LocalOrderbooks()
+
+    def decode(self, slot: int) -> Tuple[Any, datetime]:
+        offset = slot * _SLOT_SIZE
+        kind, figi, interval, _, bid_count, ask_count, server_ns = _HEADER.unpack_from(
+            self.buf, offset
+        )
+        figi = figi.rstrip(b'\0').decode()
+        server_time = _from_ns(server_ns)
+        body = offset + _HEADER.size
+        if kind == _ORDERBOOK:
+            book = self.books.get_or_create(figi)
+            book.update(*self._decode_levels(body, bid_count, ask_count), server_time)
+            return book, server_time
+        return self._decode_candle(body, figi, interval), server_time
+
+    def _decode_levels(
+        self, body: int, bid_count: int, ask_count: int
+    ) -> Tuple[Iterable[Any], Iterable[Any]]:
+        values = _LEVELS.unpack_from(self.buf, body)
+        bids = values[: bid_count * 2]
+        asks = values[_ASKS:][: ask_count * 2]
+        return zip(bids[0::2], bids[1::2]), zip(asks[0::2], asks[1::2])
+
+    def _decode_candle(self, body: int, figi: str, interval: bytes) -> CandleStreaming:
+        time_ns, *ohlcv = _CANDLE_BODY.unpack_from(self.buf, body)
+        return CandleStreaming.construct(
+            figi=figi,
+            interval=CandleResolution(interval.rstrip(b'\0').decode()),
+            time=_from_ns(time_ns),
+            **dict(zip(('o', 'h', 'l', 'c', 'v'), ohlcv)),
+        )
+
+    def run(self, slot: int, indices: Sequence[int]) -> _Results:
+        payload, server_time = self.decode(slot)
+        results: _Results = []
+        for i in indices:
+            try:
+                results.append((True, self._call(i, payload, server_time)))
+            except Exception as e:  # pylint:disable=broad-except
+                results.append((False, e))
+        return results
+
+    def _call(self, i: int, payload: Any, server_time: datetime) -> Any:
+        if self.receive_server_time[i]:
+            return self.handlers[i](None, payload, server_time=server_time)
+        return self.handlers[i](None, payload)
+
+
+_shm: Any = None
+_worker: Optional[_Worker] = None
+
+
+def _init_worker(name: str, handlers: Sequence[Callable]) -> None:
+    global _shm, _worker  # pylint:disable=global-statement
+    _shm = shared_memory.SharedMemory(name)
+    _worker = _Worker(_shm.buf, handlers)
+
+
+def _run(slot: int, indices: Sequence[int]) -> _Results:
+    return _worker.run(slot, indices)  # type: ignore
+
+
+class _PoolHandler:
+    """
+    Dispatch table entry of `Streaming` for the process handlers of one event.
+    """
+
+    latest_only = None
+
+    def __init__(self, pool: 'SharedMemoryPool', event_name: str) -> None:
+        self.func = None
+        self._pool = pool
+        self._event_name = event_name
+        self._indices: List[int] = []
+
+    def add(self, index: int) -> None:
+        self._indices.append(index)
+
+    def call_event(  # pylint:disable=unused-argument
+        self, api: Any, data: Any, server_time: Any
+    ) -> Any:
+        return self._pool.submit(self._event_name, self._indices, data, server_time)
+
+
+class _Ring:
+    """
+    Shared memory of `slots` fixed-layout records and the free slots.
+    """
+
+    def __init__(self, slots: int) -> None:
+        self.slots = slots
+        self.shm: Any = None
+        self._free: Deque[int] = deque(range(slots))
+        self._freed: Optional[asyncio.Event] = None
+
+    def open(self) -> str:
+        self.shm = shared_memory.SharedMemory(create=True, size=self.slots * _SLOT_SIZE)
+        return self.shm.name
+
+    async def acquire(self) -> int:
+        if self._freed is None:
+            self._freed = asyncio.Event()
+        while not self._free:
+            self._freed.clear()
+            await self._freed.wait()
+        return self._free.popleft()
+
+    def release(self, slot: int) -> None:
+        self._free.append(slot)
+        self._freed.set()  # type: ignore
+
+    @property
+    def pending(self) -> int:
+        return self.slots - len(self._free)
+
+    def close(self) -> None:
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+class SharedMemoryPool:
+    """
+    Runs CPU-heavy orderbook and candle handlers in `workers` processes.
+
+    Handlers registered with `process=True` get `None` instead of `api`
+    and must be picklable (module level functions). Payloads are passed
+    through a shared memory ring of `slots` fixed-layout records instead of
+    pickling: orderbook handlers get a `LocalOrderbook`, candle handlers
+    a `CandleStreaming`. The read loop waits only when all slots are busy.
+
+    Results are passed to `on_result(handler, result)`,
+    errors are logged and passed to `on_error(handler, exception)`.
+
+    ```python
+    @events.orderbook(process=True)
+    def score(api, book: tinvest.LocalOrderbook):
+        return model.predict(book.bids, book.asks)
+
+    pool = tinvest.SharedMemoryPool(workers=4, on_result=print)
+    config = tinvest.StreamingConfig(process_pool=pool)
+    await tinvest.Streaming(TOKEN, config=config).add_handlers(events).run()
+    ```
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        slots: int = 256,
+        *,
+        on_result: Optional[Callable[[Callable, Any], Any]] = None,
+        on_error: Optional[Callable[[Callable, BaseException], Any]] = None,
+    ) -> None:
+        if shared_memory is None:  # pragma: no cover
+            raise RuntimeError('SharedMemoryPool requires Python 3.8+')
+        if slots < 1:
+            raise ValueError(f'not 0 < {slots}')
+        self.latency = Timing()
+        self.errors = 0
+        self._workers = workers
+        self._ring = _Ring(slots)
+        self._on_result = on_result
+        self._on_error = on_error
+        self._handlers: List[Callable] = []
+        self._entries: Dict[str, _PoolHandler] = {}
+        self._registered: Set[Tuple[str, Callable]] = set()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def register(self, event_name: Any, func: Callable) -> _PoolHandler:
+        """
+        Returns the dispatch table entry of the event, the same for every handler.
+        """
+        name = event_key(event_name)
+        if name not in _KINDS:
+            raise ValueError(f'{name} can not be handled in a process')
+        entry = self._entries.get(name)
+        if entry is None:
+            entry = self._entries[name] = _PoolHandler(self, name)
+        if (name, func) not in self._registered:
+            if self._executor is not None:
+                raise RuntimeError('Handlers can not be added to a started pool')
+            self._registered.add((name, func))
+            self._handlers.append(func)
+            entry.add(len(self._handlers) - 1)
+        return entry
+
+    def start(self) -> None:
+        if self._executor is not None:
+            return
+        self._executor = ProcessPoolExecutor(
+            self._workers,
+            initializer=_init_worker,
+            initargs=(self._ring.open(), list(self._handlers)),
+        )
+
+    async def submit(
+        self, event_name: str, indices: Sequence[int], data: Any, server_time: Any
+    ) -> None:
+        self.start()
+        slot = await self._ring.acquire()
+        server_ns = 0 if server_time is None else to_ns(server_time)
+        _encode(self._ring.shm.buf, slot * _SLOT_SIZE, event_name, data, server_ns)
+
+        loop = asyncio.get_event_loop()
+        submitted_at = loop.time()
+        future = self._executor.submit(_run, slot, indices)  # type: ignore
+
+        def done(f: Future) -> None:
+            # handlers left running by `close` may finish after the loop
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._done, f, slot, indices, submitted_at)
+
+        future.add_done_callback(done)
+
+    def _done(
+        self, future: Future, slot: int, indices: Sequence[int], submitted_at: float
+    ) -> None:
+        self._ring.release(slot)
+        self.latency.add(asyncio.get_event_loop().time() - submitted_at)
+        try:
+            results = future.result()
+        except Exception as e:  # pylint:disable=broad-except
+            results = [(False, e)] * len(indices)
+        for i, (ok, value) in zip(indices, results):
+            self._report(self._handlers[i], ok, value)
+
+    def _report(self, handler: Callable, ok: bool, value: Any) -> None:
+        if ok:
+            if self._on_result is not None:
+                self._on_result(handler, value)
+            return
+        self.errors += 1
+        logger.error('Process handler %s error: %r', handler, value)
+        if self._on_error is not None:
+            self._on_error(handler, value)
+
+    @property
+    def pending(self) -> int:
+        return self._ring.pending
+
+    def close(self) -> None:
+        """
+        Does not wait for the running handlers, to not block the event loop.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self._ring.close()
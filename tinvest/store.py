@@ -0,0 +1,304 @@
+import bisect
+import logging
+import mmap
+import os
+from array import array
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .columnar import COLUMNS, CandleColumns
+from .history import CandleHistory, _utc
+from .schemas import CandleResolution
+from .typedefs import AnyDict, datetime_or_str
+from .utils import parse_time_ns, to_ns
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore # pragma: no mutate
+
+__all__ = ('CandleStore', 'CandleSeries', 'CANDLE_DURATIONS')
+
+logger = logging.getLogger(__name__)
+
+# the longest duration of a candle, only finished candles are synced
+CANDLE_DURATIONS = {
+    CandleResolution.min1: timedelta(minutes=1),
+    CandleResolution.min2: timedelta(minutes=2),
+    CandleResolution.min3: timedelta(minutes=3),
+    CandleResolution.min5: timedelta(minutes=5),
+    CandleResolution.min10: timedelta(minutes=10),
+    CandleResolution.min15: timedelta(minutes=15),
+    CandleResolution.min30: timedelta(minutes=30),
+    CandleResolution.hour: timedelta(hours=1),
+    CandleResolution.day: timedelta(days=1),
+    CandleResolution.week: timedelta(weeks=1),
+    CandleResolution.month: timedelta(days=31),
+}
+
+ITEMSIZE = 8  # pragma: no mutate
+# the time column is written last, its length is the number of stored candles
+WRITE_ORDER = [name for name, _ in COLUMNS if name != 'time'] + ['time']
+SYNC_CHUNK = 10_000  # pragma: no mutate
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _ns(value: Union[datetime_or_str, int]) -> int:
+    """
+    Epoch nanoseconds, naive datetimes are UTC.
+    """
+    if isinstance(value, int):
+        return value
+    return to_ns(_utc(value))
+
+
+def _datetime(ns: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=ns // 1000)
+
+
+class CandleSeries:
+    """
+    Candles of one FIGI and interval stored in `path` as append-only
+    int64 / float64 columns (`time.bin`, `o.bin`, ... `v.bin`),
+    ordered by time without duplicates.
+
+    Reads map the columns into memory without a copy and find time ranges
+    by binary search over `time`. Any number of processes can read while
+    one process appends: `append` holds an exclusive `fcntl` lock
+    of the series and writes the time column last, readers see only
+    the candles whose time is written. The lock is a no-op without `fcntl`.
+    """
+
+    def __init__(self, path: Union[str, Path], figi: str, interval: Any) -> None:
+        self.path = Path(path)
+        self.figi = figi
+        self.interval = CandleResolution(interval)
+        self._count = -1
+        self._views: Dict[str, memoryview] = {}
+
+    def _file(self, name: str) -> Path:
+        return self.path / f'{name}.bin'
+
+    def __len__(self) -> int:
+        try:
+            return self._file('time').stat().st_size // ITEMSIZE
+        except FileNotFoundError:
+            return 0
+
+    def _map(self) -> Dict[str, memoryview]:
+        count = len(self)
+        if count == self._count:
+            return self._views
+        views: Dict[str, memoryview] = {}
+        for name, typecode in COLUMNS:
+            if not count:
+                views[name] = memoryview(array(typecode))
+                continue
+            with open(self._file(name), 'rb') as f:
+                mapped = mmap.mmap(
+                    f.fileno(), count * ITEMSIZE, access=mmap.ACCESS_READ
+                )
+            views[name] = memoryview(mapped).cast(typecode)
+        self._views, self._count = views, count
+        return views
+
+    def last_time(self) -> Optional[int]:
+        """
+        Epoch nanoseconds of the last stored candle.
+        """
+        time = self._map()['time']
+        return time[-1] if time else None
+
+    def read(
+        self,
+        from_: Union[datetime_or_str, int, None] = None,
+        to: Union[datetime_or_str, int, None] = None,
+    ) -> CandleColumns:
+        """
+        Candles from `from_` to `to` (exclusive) as memoryviews of the files,
+        naive datetimes are UTC.
+        """
+        views = self._map()
+        time = views['time']
+        start = 0 if from_ is None else bisect.bisect_left(time, _ns(from_))
+        end = len(time) if to is None else bisect.bisect_left(time, _ns(to))
+        return CandleColumns.from_columns(
+            self.figi,
+            self.interval,
+            {name: view[start:end] for name, view in views.items()},
+        )
+
+    @contextmanager
+    def lock(self, *, blocking: bool = True) -> Iterator[None]:
+        """
+        Exclusive lock of the writer, raises `BlockingIOError`
+        if the series is locked and not `blocking`.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self.path / '.lock', 'a') as f:
+            if fcntl is not None:
+                flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+                fcntl.flock(f.fileno(), flags)
+            yield
+
+    def append(self, candles: Union[CandleColumns, Iterable[AnyDict]]) -> int:
+        """
+        Appends candles ordered by time, candles not later than the last
+        stored one are skipped. Returns the number of appended candles.
+        """
+        if not isinstance(candles, CandleColumns):
+            candles = CandleColumns(self.figi, self.interval, candles)
+        time = candles.time
+        if any(time[i] >= time[i + 1] for i in range(len(time) - 1)):
+            raise ValueError('candles are not ordered by time')
+
+        with self.lock():
+            count = self._repair()
+            start = 0
+            if count:
+                start = bisect.bisect_right(time, self._map()['time'][-1])
+            if start == len(time):
+                return 0
+            columns = candles.columns()
+            for name in WRITE_ORDER:
+                with open(self._file(name), 'ab') as f:
+                    f.write(memoryview(columns[name])[start:])
+        appended = len(time) - start
+        logger.debug('Stored %s %s: %s candles', self.figi, self.interval, appended)
+        return appended
+
+    def _repair(self) -> int:
+        """
+        Cuts the columns written after the time column and a partial
+        time record by an interrupted `append`, returns the number
+        of stored candles.
+        """
+        count = len(self)
+        size = count * ITEMSIZE
+        for name in WRITE_ORDER:
+            path = self._file(name)
+            if path.exists() and path.stat().st_size > size:
+                logger.warning('Truncate %s to %s candles', path, count)
+                os.truncate(path, size)
+        return count
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}(figi={self.figi!r}, '
+            f'interval={self.interval.value!r}, len={len(self)})'
+        )
+
+
+class CandleStore:
+    """
+    Local candle history: a `CandleSeries` per FIGI and interval
+    in `path/<figi>/<interval>`.
+
+    `sync` downloads only the finished candles after the last stored ones
+    with `CandleHistory`, new series start from `since`.
+
+    ```python
+    store = tinvest.CandleStore("candles")
+    client = tinvest.AsyncClient(TOKEN, rate_limiter=tinvest.RateLimiter())
+    await store.sync(client, ["BBG0013HGFT4"], "1min", since=datetime(2020, 1, 1))
+    frame = store.read("BBG0013HGFT4", "1min", from_=datetime(2020, 6, 1)).to_pandas()
+    ```
+
+    The same is done by the command line:
+
+        tinvest sync candles 1min BBG0013HGFT4 --since 2020-01-01 --token TOKEN
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self._series: Dict[Tuple[str, CandleResolution], CandleSeries] = {}
+
+    def series(self, figi: str, interval: Any) -> CandleSeries:
+        key = (figi, CandleResolution(interval))
+        if key not in self._series:
+            self._series[key] = CandleSeries(
+                self.path / figi / key[1].value, figi, key[1]
+            )
+        return self._series[key]
+
+    def keys(self) -> List[Tuple[str, CandleResolution]]:
+        return sorted(
+            (path.parent.parent.name, CandleResolution(path.parent.name))
+            for path in self.path.glob('*/*/time.bin')
+        )
+
+    def read(
+        self,
+        figi: str,
+        interval: Any,
+        from_: Union[datetime_or_str, int, None] = None,
+        to: Union[datetime_or_str, int, None] = None,
+    ) -> CandleColumns:
+        return self.series(figi, interval).read(from_, to)
+
+    async def sync(  # pylint:disable=too-many-arguments
+        self,
+        client: Any,
+        figis: Iterable[str],
+        interval: Any,
+        since: datetime_or_str,
+        until: Optional[datetime_or_str] = None,
+        *,
+        concurrency: int = 8,
+    ) -> Dict[str, int]:
+        """
+        Appends the candles finished before `until` (now by default),
+        returns the number of appended candles per FIGI.
+        """
+        resolution = CandleResolution(interval)
+        end = datetime.now(timezone.utc) if until is None else _utc(until)
+        groups = self._group_by_start(figis, resolution, _ns(since))
+        history = CandleHistory(client, concurrency=concurrency)
+        appended: Dict[str, int] = {}
+        for start, group in groups.items():
+            appended.update(
+                await self._sync(history, group, _datetime(start), end, resolution)
+            )
+        return appended
+
+    def _group_by_start(
+        self, figis: Iterable[str], resolution: CandleResolution, since: int
+    ) -> Dict[int, List[str]]:
+        """
+        FIGIs by the time after the last stored candle.
+        """
+        groups: Dict[int, List[str]] = {}
+        for figi in dict.fromkeys(figis):
+            last = self.series(figi, resolution).last_time()
+            start = since if last is None else last + 1000
+            groups.setdefault(start, []).append(figi)
+        return groups
+
+    async def _sync(  # pylint:disable=too-many-arguments
+        self,
+        history: CandleHistory,
+        figis: List[str],
+        start: datetime,
+        end: datetime,
+        resolution: CandleResolution,
+    ) -> Dict[str, int]:
+        finished = to_ns(end - CANDLE_DURATIONS[resolution])
+        buffers: Dict[str, List[AnyDict]] = {figi: [] for figi in figis}
+        appended = dict.fromkeys(figis, 0)
+        async for candle in history.candles(figis, start, end, resolution):
+            if parse_time_ns(candle['time']) > finished:
+                continue
+            buffer = buffers[candle['figi']]
+            buffer.append(candle)
+            if len(buffer) >= SYNC_CHUNK:
+                appended[candle['figi']] += self.series(
+                    candle['figi'], resolution
+                ).append(buffer)
+                buffer.clear()
+        for figi, buffer in buffers.items():
+            appended[figi] += self.series(figi, resolution).append(buffer)
+            logger.info('Synced %s %s: %s candles', figi, resolution, appended[figi])
+        return appended
@@ -1,14 +1,24 @@
 import asyncio
 import logging
-from datetime import datetime
-from typing import Any, Callable, Coroutine, Dict, List, Optional, Tuple, Union
+import time
+from datetime import datetime, timezone
+from itertools import chain
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
 
 import aiohttp
-from pydantic.datetime_parse import parse_datetime  # pylint:disable=E0611
 
-from .constants import STREAMING
+from .backoff import Backoff, Reconnector, ReconnectStats
+from .construct import get_constructor
+from .dispatch import CompiledHandler, event_key, run_handlers
+from .isolation import CircuitBreaker, HandlerErrorStreaming
+from .latency import EventTimes
+from .lazy import (
+    LazyCandleStreaming,
+    LazyInstrumentInfoStreaming,
+    LazyOrderbookStreaming,
+)
+from .recording import Replay
 from .schemas import (
-    CandleResolution,
     CandleStreaming,
     ErrorStreaming,
     EventName,
@@ -16,13 +26,24 @@ from .schemas import (
     OrderbookStreaming,
     ServiceEventName,
 )
-from .typedefs import AnyDict
-from .utils import Func, infinity
+from .streaming_api import (
+    CandleEvent,
+    InstrumentInfoEvent,
+    OrderbookEvent,
+    StreamingApi,
+    StreamingEvents,
+    _Handler,
+)
+from .streaming_config import StreamingConfig
+from .subscriptions import SubscriptionRegistry
+from .typedefs import AnyDict, JsonLoads, datetime_or_ns
+from .utils import get_json_loads, infinity, parse_time, parse_time_ns, to_ns
 
 __all__ = (
     'Streaming',
     'StreamingApi',
     'StreamingEvents',
+    'StreamingConfig',
     'CandleEvent',
     'OrderbookEvent',
     'InstrumentInfoEvent',
@@ -30,8 +51,32 @@ __all__ = (
 
 logger = logging.getLogger(__name__)
 
+_SERVICE_EVENTS = frozenset(name.value for name in ServiceEventName)
 
-_Handler = Tuple[str, Callable]  # pragma: no mutate
+
+class _MessageParser:
+    """
+    Decodes messages and parses payloads by the event schemas.
+    """
+
+    __slots__ = ('loads', 'parsers', 'parse_time')
+
+    def __init__(
+        self,
+        loads: JsonLoads,
+        parsers: Dict[str, Callable[[Any], Any]],
+        time_ns: bool,
+    ) -> None:
+        self.loads = loads
+        self.parsers = parsers
+        self.parse_time: Callable[[Any], datetime_or_ns] = parse_time
+        if time_ns:
+            self.parse_time = parse_time_ns
+
+    def now(self) -> datetime_or_ns:
+        if self.parse_time is parse_time_ns:
+            return time.time_ns()
+        return datetime.now(timezone.utc)
 
 
 class Streaming:
@@ -41,6 +86,11 @@ class Streaming:
         EventName.instrument_info: InstrumentInfoStreaming,
         EventName.error: ErrorStreaming,
     }
+    lazy_schemas: Dict[EventName, Any] = {
+        EventName.candle: LazyCandleStreaming,
+        EventName.orderbook: LazyOrderbookStreaming,
+        EventName.instrument_info: LazyInstrumentInfoStreaming,
+    }
 
     def __init__(
         self,
@@ -52,6 +102,7 @@ class Streaming:
         ws_close_timeout: float = 0,
         receive_timeout: Optional[float] = 5,
         heartbeat: Optional[float] = 3,
+        config: Optional[StreamingConfig] = None,
     ) -> None:
         """
         ```python
@@ -74,19 +125,54 @@ class Streaming:
             except KeyboardInterrupt:
                 pass
         ```
+
+        Optional features are set by `config`, see `StreamingConfig`.
         """
         super().__init__()
         if not token:
             raise ValueError('Token can not be empty')
-        self._api: str = STREAMING
-        self._token: str = token
+        config = config or StreamingConfig()
+        self._config = config
         self._session: aiohttp.ClientSession = session or aiohttp.ClientSession()
+        self._ws_options: AnyDict = {
+            'headers': {'Authorization': f'Bearer {token}'},
+            'heartbeat': heartbeat,
+            'timeout': ws_close_timeout,
+            'receive_timeout': receive_timeout,
+        }
         self._handlers: List[_Handler] = []
+        self._dispatch: Dict[str, List[Any]] = {}
         self._state = state
-        self._reconnect_timeout = reconnect_timeout
-        self._ws_close_timeout = ws_close_timeout
-        self._receive_timeout = receive_timeout
-        self._heartbeat = heartbeat
+        self._reconnector = Reconnector(
+            config.backoff or Backoff(base=reconnect_timeout), config.stable_after
+        )
+        self._parser = _MessageParser(
+            config.loads or get_json_loads(),
+            self._get_parsers(trusted=config.trusted, lazy=config.lazy),
+            config.time_ns,
+        )
+        self.subscriptions = (
+            config.subscriptions
+            if config.subscriptions is not None
+            else SubscriptionRegistry()
+        )
+        if config.rate_limiter is not None:
+            self.subscriptions.rate_limiter = config.rate_limiter
+        self.ws: Optional[aiohttp.ClientWebSocketResponse] = None
+
+    def _get_parsers(
+        self, *, trusted: bool, lazy: bool
+    ) -> Dict[str, Callable[[Any], Any]]:
+        parsers = {
+            event_key(event_name): (
+                get_constructor(schema) if trusted else schema.parse_obj
+            )
+            for event_name, schema in self.schemas.items()
+        }
+        if lazy:
+            for event_name, schema in self.lazy_schemas.items():
+                parsers[event_key(event_name)] = schema
+        return parsers
 
     def add_handlers(
         self, handlers: Union[List[_Handler], 'StreamingEvents']
@@ -96,313 +182,223 @@ class Streaming:
         else:
             self._handlers.extend(handlers.handlers)
 
-        for _, handler in self._handlers:
-            handler.receive_server_time__ = (  # type:ignore
-                'server_time' in handler.__code__.co_varnames
-            )
+        dispatch: Dict[str, List[Any]] = {}
+        for event_name, handler, *rest in self._handlers:
+            entries = dispatch.setdefault(event_key(event_name), [])
+            entry = self._compile(event_name, handler, rest[0] if rest else {})
+            # handlers of a process pool share one entry per event
+            if entry not in entries:
+                entries.append(entry)
+        self._dispatch = dispatch
         return self
 
+    def _compile(self, event_name: Any, handler: Callable, options: AnyDict) -> Any:
+        config = self._config
+        if config.process_pool is not None and options.get('process'):
+            return config.process_pool.register(event_name, handler)
+        compiled = CompiledHandler(
+            handler, config.executor, latest_only=options.get('latest_only', False)
+        )
+        key = event_key(event_name)
+        if config.isolation is None or key in _SERVICE_EVENTS:
+            return compiled
+        on_error = None if key == EventName.error.value else self._report_error
+        return compiled.isolate(config.isolation, key, on_error)
+
+    async def _report_error(
+        self, func: Callable, event_name: str, exception: BaseException, api: Any
+    ) -> None:
+        handlers = self._dispatch.get(EventName.error.value)
+        if not handlers:
+            return
+        name = getattr(func, '__qualname__', func)
+        payload = HandlerErrorStreaming.construct(
+            error=f'{event_name} handler {name} failed: {exception!r}',
+            request_id=None,
+            event=event_name,
+            handler=func,
+            exception=exception,
+        )
+        await run_handlers(handlers, api, payload, self._parser.now())
+
+    @property
+    def breakers(self) -> Dict[Callable, CircuitBreaker]:
+        """
+        Circuit breakers of handlers isolated with `isolation`.
+        """
+        return {
+            handler.func: handler.guard.breaker
+            for handler in self._entries()
+            if getattr(handler, 'guard', None) is not None
+        }
+
+    @property
+    def reconnect_stats(self) -> ReconnectStats:
+        return self._reconnector.stats
+
     @infinity
     async def run(self) -> None:
+        """
+        Reconnects with exponential backoff and jitter (`backoff`),
+        the backoff is reset after a connection that lasted `stable_after`
+        seconds. The session is kept open between reconnects
+        and closed when the task is cancelled.
+        """
         try:
             async with self._session.ws_connect(
-                self._api,
-                headers={'Authorization': f'Bearer {self._token}'},
-                heartbeat=self._heartbeat,
-                timeout=self._ws_close_timeout,
-                receive_timeout=self._receive_timeout,
+                self._config.url, **self._ws_options
             ) as ws:
+                self._reconnector.connected()
                 await self._run(ws)
-        except asyncio.CancelledError:  # pylint:disable=try-except-raise
+        except asyncio.CancelledError:
+            await self.close()
             raise
         except asyncio.TimeoutError:
             logger.error('Timeout error. Try to reconnect')
-            await asyncio.sleep(self._reconnect_timeout)
         except aiohttp.ClientConnectorError as e:
             logger.error('Connection error: %s. Try to reconnect', e)
-            await asyncio.sleep(self._reconnect_timeout)
-        funcs = self._get_handlers(ServiceEventName.reconnect)
-        await asyncio.gather(*[Func(func)() for func in funcs])
+        await asyncio.sleep(self._reconnector.disconnected())
+        await self._call_service_handlers(ServiceEventName.reconnect)
+
+    async def close(self) -> None:
+        if self._config.process_pool is not None:
+            self._config.process_pool.close()
+        await self._session.close()
+
+    async def replay(self, source: Replay) -> None:
+        """
+        Feeds the handlers from a recorded log instead of the websocket.
+        """
+        await self._run(source)
+
+    def _create_api(self, ws) -> 'StreamingApi':
+        return StreamingApi(ws, self._state, self.subscriptions)
 
     async def _run(self, ws):
-        api = StreamingApi(ws, self._state)
+        api = self._create_api(ws)
+        self.ws = ws
         try:
-            funcs = self._get_handlers(ServiceEventName.startup)
-            await asyncio.gather(*[Func(func, api)() for func in funcs])
-
-            async for msg in ws:
-                if msg.type == aiohttp.WSMsgType.TEXT:
-                    data = msg.json()
-
-                    event_name = data['event']
-                    payload = data['payload']
-                    server_time = parse_datetime(data['time'])
-
-                    if event_name in self.schemas:
-                        data = self.schemas[event_name].parse_obj(payload)
-                    else:
-                        data = payload
-
-                    await asyncio.gather(
-                        *self._call_handlers(event_name, api, data, server_time)
-                    )
-
-                elif msg.type == aiohttp.WSMsgType.CLOSED:
-                    break
-                elif msg.type == aiohttp.WSMsgType.ERROR:
-                    break
+            await self.subscriptions.resubscribe(ws)
+            await self._call_service_handlers(ServiceEventName.startup, api)
+            await self._run_backfill(api)
+            await self._read(api, ws)
             await self._cleanup(api)
         except asyncio.CancelledError:
             await self._cleanup(api)
+            await self._close_dispatch()
             raise
+        finally:
+            self.ws = None
+
+    async def _read(self, api: 'StreamingApi', ws: Any) -> None:
+        async for msg in ws:
+            if msg.type == aiohttp.WSMsgType.TEXT:
+                await self._handle_message(api, msg.data)
+            elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                break
+
+    async def _handle_message(self, api: 'StreamingApi', raw: str) -> None:
+        received = time.time()
+        config, parser = self._config, self._parser
+        data = parser.loads(raw)
+
+        event_name = data['event']
+        payload = data['payload']
+        server_time = parser.parse_time(data['time'])
+        if config.recorder is not None:
+            config.recorder.write(raw, time.time_ns(), to_ns(server_time))
+
+        if config.backfill is not None and event_name == EventName.candle:
+            config.backfill.track(payload)
+
+        parse = parser.parsers.get(event_name)
+        data = payload if parse is None else parse(payload)
+        if config.latency is None:
+            await self._handle_event(event_name, api, data, server_time)
+            return
+
+        parsed = time.time()
+        await self._handle_event(event_name, api, data, server_time)
+        times = EventTimes(server_time, received, parsed, time.time())
+        config.latency.record(event_name, payload, times)
+
+    async def _run_backfill(self, api: 'StreamingApi') -> None:
+        backfill = self._config.backfill
+        if backfill is None:
+            return
+        try:
+            candles = await backfill.fetch(self.subscriptions)
+        except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+            logger.error('Backfill error: %s', e)
+            return
+        parser = self._parser.parsers[EventName.candle.value]
+        server_time = self._parser.now()
+        for candle in candles:
+            await self._handle_event(
+                EventName.candle.value, api, parser(candle), server_time
+            )
 
-    def _call_handlers(
+    async def _handle_event(
         self,
-        event_name: EventName,
+        event_name: str,
         api: 'StreamingApi',
         data: Any,
-        server_time: datetime,
-    ) -> List[Coroutine[Any, Any, None]]:
-        funcs = []
-        for func in self._get_handlers(event_name):
-            kwargs = {}
-            if func.receive_server_time__:
-                kwargs['server_time'] = server_time
-
-            funcs.append(Func(func, api, data, **kwargs)())
-
-        return funcs
-
-    def _get_handlers(self, event_name):
-        return (func for name, func in self._handlers if name == event_name)
-
-    async def _cleanup(self, api) -> None:
-        funcs = self._get_handlers(ServiceEventName.cleanup)
-        await asyncio.gather(*[Func(func, api)() for func in funcs])
-        await self._session.close()
-
-
-class _BaseEvent:
-    def __init__(self, ws):
-        self.ws = ws
-
-    async def _send(self, payload):
-        await self.ws.send_json(payload)
-
-
-class CandleEvent(_BaseEvent):
-    INTERVALS = tuple(c.value for c in CandleResolution)
-
-    def subscribe(
-        self, figi: str, interval: CandleResolution, request_id: Optional[str] = None,
-    ):
-        return self._send(
-            {
-                'event': f'{EventName.candle}:subscribe',
-                **self._get_payload(figi, interval, request_id),
-            }
-        )
-
-    def unsubscribe(
-        self, figi: str, interval: CandleResolution, request_id: Optional[str] = None,
-    ):
-        return self._send(
-            {
-                'event': f'{EventName.candle}:unsubscribe',
-                **self._get_payload(figi, interval, request_id),
-            }
-        )
-
-    def _get_payload(
-        self, figi: str, interval: CandleResolution, request_id: Optional[str] = None,
-    ):
-        if interval not in self.INTERVALS:
-            raise ValueError(f'{interval} not in {self.INTERVALS}')
-
-        data = {'figi': figi, 'interval': interval}
-        if request_id:
-            data['request_id'] = request_id
-        return data
-
-
-class OrderbookEvent(_BaseEvent):
-    def subscribe(self, figi: str, depth: int = 2, request_id: Optional[str] = None):
-        return self._send(
-            {
-                'event': f'{EventName.orderbook}:subscribe',
-                **self._get_payload(figi, depth, request_id),
-            }
-        )
-
-    def unsubscribe(self, figi: str, depth: int = 2, request_id: Optional[str] = None):
-        return self._send(
-            {
-                'event': f'{EventName.orderbook}:unsubscribe',
-                **self._get_payload(figi, depth, request_id),
-            }
-        )
-
-    @staticmethod
-    def _get_payload(figi: str, depth: int = 2, request_id: Optional[str] = None):
-        if not 0 < depth <= 20:
-            raise ValueError(f'not 0 < {depth} <= 20')
-        data = {'figi': figi, 'depth': depth}
-        if request_id:
-            data['request_id'] = request_id
-        return data
-
-
-class InstrumentInfoEvent(_BaseEvent):
-    def subscribe(self, figi: str, request_id: Optional[str] = None):
-        return self._send(
-            {
-                'event': f'{EventName.instrument_info}:subscribe',
-                **self._get_payload(figi, request_id),
-            }
-        )
-
-    def unsubscribe(self, figi: str, request_id: Optional[str] = None):
-        return self._send(
-            {
-                'event': f'{EventName.instrument_info}:unsubscribe',
-                **self._get_payload(figi, request_id),
-            }
-        )
-
-    @staticmethod
-    def _get_payload(figi: str, request_id: Optional[str] = None):
-        data = {'figi': figi}
-        if request_id:
-            data['request_id'] = request_id
-
-        return data
-
-
-class StreamingEvents:
-    """
-    ```python
-    import tinvest
-
-    events = tinvest.StreamingEvents()
-    ```
-    """
-
-    def __init__(self) -> None:
-        self.handlers: List[_Handler] = []
-
-    def _decorator_wrapper(self, event_name: str):
-        def decorator(func):
-            self.handlers.append((event_name, func))
-            return func
-
-        return decorator
-
-    def startup(self):
-        """
-        ```python
-        @events.startup()
-        async def startup(api: tinvest.StreamingApi):
-            await api.candle.subscribe("BBG0013HGFT4", tinvest.CandleResolution.min1)
-            await api.orderbook.subscribe("BBG0013HGFT4", 5, "123ASD1123")
-            await api.instrument_info.subscribe("BBG0013HGFT4")
-        ```
-        """
-        return self._decorator_wrapper(ServiceEventName.startup)
-
-    def candle(self):
-        """
-        ```python
-        @events.candle()
-        async def handle_candle(
-            api: tinvest.StreamingApi,
-            payload: tinvest.CandleStreaming,
-            server_time: datetime  # [optional] if you want
-        ):
-            pass
-        ```
-        ```python
-        @events.candle()
-        async def handle_candle(
-            api: tinvest.StreamingApi,
-            payload: tinvest.CandleStreaming,
-        ):
-            pass
-        ```
-        """
-        return self._decorator_wrapper(EventName.candle)
-
-    def orderbook(self):
-        """
-        ```python
-        @events.orderbook()
-        async def handle_orderbook(
-            api: tinvest.StreamingApi, payload: tinvest.OrderbookStreaming
-        ):
-            pass
-        ```
-        """
-        return self._decorator_wrapper(EventName.orderbook)
-
-    def instrument_info(self):
-        """
-        ```python
-        @events.instrument_info()
-        async def handle_instrument_info(
-            api: tinvest.StreamingApi, payload: tinvest.InstrumentInfoStreaming
-        ):
-            pass
-        ```
-        """
-        return self._decorator_wrapper(EventName.instrument_info)
-
-    def error(self):
-        """
-        ```python
-        @events.error()
-        async def handle_error(
-            api: tinvest.StreamingApi, payload: tinvest.ErrorStreaming
-        ):
-            pass
-        ```
-        """
-        return self._decorator_wrapper(EventName.error)
-
-    def cleanup(self):
-        """
-        ```python
-        @events.cleanup()
-        async def cleanup(api: tinvest.StreamingApi):
-            await api.candle.unsubscribe("BBG0013HGFT4", "1min")
-            await api.orderbook.unsubscribe("BBG0013HGFT4", 5)
-            await api.instrument_info.unsubscribe("BBG0013HGFT4")
-        ```
-        """
-        return self._decorator_wrapper(ServiceEventName.cleanup)
+        server_time: datetime_or_ns,
+    ) -> None:
+        dispatcher = self._config.dispatcher
+        if dispatcher is None:
+            await self._dispatch_event(event_name, api, data, server_time)
+            return
+        handlers = self._dispatch.get(event_name, ())
+        await dispatcher.put(event_name, handlers, api, data, server_time)
+
+    async def _dispatch_event(
+        self,
+        event_name: str,
+        api: 'StreamingApi',
+        data: Any,
+        server_time: datetime_or_ns,
+    ) -> None:
+        handlers = self._dispatch.get(event_name)
+        if handlers:
+            await run_handlers(handlers, api, data, server_time)
 
-    def reconnect(self):
+    @property
+    def skipped_snapshots(self) -> Dict[Callable, Dict[Any, int]]:
         """
-        ```python
-        @events.reconnect()
-        def handle_reconnect():
-            pass
-        ```
-        ```python
-        @events.reconnect()
-        async def handle_reconnect():
-            pass
-        ```
+        Number of snapshots skipped by `latest_only` handlers per (figi, depth).
         """
-        return self._decorator_wrapper(ServiceEventName.reconnect)
-
+        return {
+            handler.func: handler.latest_only.skipped
+            for handler in self._entries()
+            if handler.latest_only is not None
+        }
+
+    def _entries(self) -> Iterator[Any]:
+        return chain.from_iterable(self._dispatch.values())
+
+    async def _close_dispatch(self) -> None:
+        config = self._config
+        if config.dispatcher is not None:
+            await config.dispatcher.close()
+        for handler in self._entries():
+            if handler.latest_only is not None:
+                await handler.latest_only.close()
+        if config.process_pool is not None:
+            config.process_pool.close()
+
+    async def _call_service_handlers(
+        self, event_name: ServiceEventName, *args: Any
+    ) -> None:
+        handlers = self._dispatch.get(event_name.value, ())
+        await asyncio.gather(*[handler(*args) for handler in handlers])
 
-class StreamingApi:
-    def __init__(self, ws, state: Optional[AnyDict] = None) -> None:
-        self.candle = CandleEvent(ws)
-        self.orderbook = OrderbookEvent(ws)
-        self.instrument_info = InstrumentInfoEvent(ws)
-        self._state = state
+    def _get_handlers(self, event_name: Any) -> List[Callable]:
+        return [
+            handler.func
+            for handler in self._dispatch.get(event_name, ())
+            if handler.func is not None
+        ]
 
-    def __getitem__(self, key: str) -> Any:
-        if self._state and key in self._state:
-            return self._state[key]
-        raise KeyError
+    async def _cleanup(self, api) -> None:
+        await self._call_service_handlers(ServiceEventName.cleanup, api)
@@ -0,0 +1,285 @@
+from typing import Any, Callable, List, Optional, Tuple, Union
+
+from .indicators import INDICATORS
+from .schemas import CandleResolution, EventName, ServiceEventName
+from .subscriptions import SubscriptionRegistry
+from .typedefs import AnyDict
+
+__all__ = (
+    'StreamingApi',
+    'StreamingEvents',
+    'CandleEvent',
+    'OrderbookEvent',
+    'InstrumentInfoEvent',
+)
+
+# (event_name, func), decorators add enabled options: (event_name, func, options)
+_Handler = Union[Tuple[str, Callable], Tuple[str, Callable, AnyDict]]
+
+
+class _BaseEvent:
+    event_name: EventName
+
+    def __init__(self, ws, subscriptions: Optional[SubscriptionRegistry] = None):
+        self.ws = ws
+        self.subscriptions = subscriptions
+
+    async def _send(self, payload):
+        if self.subscriptions is not None:
+            await self.subscriptions.throttle()
+        await self.ws.send_json(payload)
+
+    async def _subscribe(self, payload):
+        if self.subscriptions is not None and not self.subscriptions.add(
+            self.event_name, payload
+        ):
+            return
+        await self._send({'event': f'{self.event_name}:subscribe', **payload})
+
+    async def _unsubscribe(self, payload):
+        if self.subscriptions is not None:
+            self.subscriptions.remove(self.event_name, payload)
+        await self._send({'event': f'{self.event_name}:unsubscribe', **payload})
+
+
+class CandleEvent(_BaseEvent):
+    INTERVALS = tuple(c.value for c in CandleResolution)
+    event_name = EventName.candle
+
+    def subscribe(
+        self,
+        figi: str,
+        interval: CandleResolution,
+        request_id: Optional[str] = None,
+    ):
+        return self._subscribe(self._get_payload(figi, interval, request_id))
+
+    def unsubscribe(
+        self,
+        figi: str,
+        interval: CandleResolution,
+        request_id: Optional[str] = None,
+    ):
+        return self._unsubscribe(self._get_payload(figi, interval, request_id))
+
+    def _get_payload(
+        self,
+        figi: str,
+        interval: CandleResolution,
+        request_id: Optional[str] = None,
+    ):
+        if interval not in self.INTERVALS:
+            raise ValueError(f'{interval} not in {self.INTERVALS}')
+
+        data = {'figi': figi, 'interval': interval}
+        if request_id:
+            data['request_id'] = request_id
+        return data
+
+
+class OrderbookEvent(_BaseEvent):
+    event_name = EventName.orderbook
+
+    def subscribe(self, figi: str, depth: int = 2, request_id: Optional[str] = None):
+        return self._subscribe(self._get_payload(figi, depth, request_id))
+
+    def unsubscribe(self, figi: str, depth: int = 2, request_id: Optional[str] = None):
+        return self._unsubscribe(self._get_payload(figi, depth, request_id))
+
+    @staticmethod
+    def _get_payload(figi: str, depth: int = 2, request_id: Optional[str] = None):
+        if not 0 < depth <= 20:
+            raise ValueError(f'not 0 < {depth} <= 20')
+        data = {'figi': figi, 'depth': depth}
+        if request_id:
+            data['request_id'] = request_id
+        return data
+
+
+class InstrumentInfoEvent(_BaseEvent):
+    event_name = EventName.instrument_info
+
+    def subscribe(self, figi: str, request_id: Optional[str] = None):
+        return self._subscribe(self._get_payload(figi, request_id))
+
+    def unsubscribe(self, figi: str, request_id: Optional[str] = None):
+        return self._unsubscribe(self._get_payload(figi, request_id))
+
+    @staticmethod
+    def _get_payload(figi: str, request_id: Optional[str] = None):
+        data = {'figi': figi}
+        if request_id:
+            data['request_id'] = request_id
+
+        return data
+
+
+class StreamingApi:
+    def __init__(
+        self,
+        ws,
+        state: Optional[AnyDict] = None,
+        subscriptions: Optional[SubscriptionRegistry] = None,
+    ) -> None:
+        self.candle = CandleEvent(ws, subscriptions)
+        self.orderbook = OrderbookEvent(ws, subscriptions)
+        self.instrument_info = InstrumentInfoEvent(ws, subscriptions)
+        self.subscriptions = subscriptions
+        self._state = state
+
+    def __getitem__(self, key: str) -> Any:
+        if self._state and key in self._state:
+            return self._state[key]
+        raise KeyError
+
+
+class StreamingEvents:
+    """
+    ```python
+    import tinvest
+
+    events = tinvest.StreamingEvents()
+    ```
+    """
+
+    def __init__(self) -> None:
+        self.handlers: List[_Handler] = []
+
+    def _decorator_wrapper(self, event_name: str, **options: Any):
+        enabled = {name: value for name, value in options.items() if value}
+
+        def decorator(func):
+            if enabled:
+                self.handlers.append((event_name, func, enabled))
+            else:
+                self.handlers.append((event_name, func))
+            return func
+
+        return decorator
+
+    def startup(self):
+        """
+        ```python
+        @events.startup()
+        async def startup(api: tinvest.StreamingApi):
+            await api.candle.subscribe("BBG0013HGFT4", tinvest.CandleResolution.min1)
+            await api.orderbook.subscribe("BBG0013HGFT4", 5, "123ASD1123")
+            await api.instrument_info.subscribe("BBG0013HGFT4")
+        ```
+        """
+        return self._decorator_wrapper(ServiceEventName.startup)
+
+    def candle(self, *, process: bool = False):
+        """
+        With `process=True` the handler runs in `SharedMemoryPool`.
+
+        ```python
+        @events.candle()
+        async def handle_candle(
+            api: tinvest.StreamingApi,
+            payload: tinvest.CandleStreaming,
+            server_time: datetime  # [optional] if you want
+        ):
+            pass
+        ```
+        ```python
+        @events.candle()
+        async def handle_candle(
+            api: tinvest.StreamingApi,
+            payload: tinvest.CandleStreaming,
+        ):
+            pass
+        ```
+        """
+        return self._decorator_wrapper(EventName.candle, process=process)
+
+    def orderbook(self, *, latest_only: bool = False, process: bool = False):
+        """
+        ```python
+        @events.orderbook()
+        async def handle_orderbook(
+            api: tinvest.StreamingApi, payload: tinvest.OrderbookStreaming
+        ):
+            pass
+        ```
+
+        With `latest_only=True` the handler runs in the background and
+        only sees the latest snapshot per FIGI and depth: snapshots received
+        while it is busy replace each other, see `Streaming.skipped_snapshots`.
+
+        ```python
+        @events.orderbook(latest_only=True)
+        async def handle_orderbook(
+            api: tinvest.StreamingApi, payload: tinvest.OrderbookStreaming
+        ):
+            pass
+        ```
+        """
+        return self._decorator_wrapper(
+            EventName.orderbook, latest_only=latest_only, process=process
+        )
+
+    def instrument_info(self):
+        """
+        ```python
+        @events.instrument_info()
+        async def handle_instrument_info(
+            api: tinvest.StreamingApi, payload: tinvest.InstrumentInfoStreaming
+        ):
+            pass
+        ```
+        """
+        return self._decorator_wrapper(EventName.instrument_info)
+
+    def error(self):
+        """
+        ```python
+        @events.error()
+        async def handle_error(
+            api: tinvest.StreamingApi, payload: tinvest.ErrorStreaming
+        ):
+            pass
+        ```
+        """
+        return self._decorator_wrapper(EventName.error)
+
+    def cleanup(self):
+        """
+        ```python
+        @events.cleanup()
+        async def cleanup(api: tinvest.StreamingApi):
+            await api.candle.unsubscribe("BBG0013HGFT4", "1min")
+            await api.orderbook.unsubscribe("BBG0013HGFT4", 5)
+            await api.instrument_info.unsubscribe("BBG0013HGFT4")
+        ```
+        """
+        return self._decorator_wrapper(ServiceEventName.cleanup)
+
+    def reconnect(self):
+        """
+        ```python
+        @events.reconnect()
+        def handle_reconnect():
+            pass
+        ```
+        ```python
+        @events.reconnect()
+        async def handle_reconnect():
+            pass
+        ```
+        """
+        return self._decorator_wrapper(ServiceEventName.reconnect)
+
+    def indicators(self):
+        """
+        Handlers of `tinvest.Indicators`, see `Indicators.add_handlers`.
+
+        ```python
+        @events.indicators()
+        async def handle_indicators(
+            api: tinvest.StreamingApi, payload: tinvest.IndicatorUpdate
+        ):
+            pass
+        ```
+        """
+        return self._decorator_wrapper(INDICATORS)
@@ -0,0 +1,55 @@
+from typing import NamedTuple, Optional
+
+from .backfill import CandleBackfill
+from .backoff import Backoff
+from .constants import STREAMING
+from .dispatch import QueueDispatcher
+from .executor import HandlerExecutor
+from .isolation import HandlerIsolation
+from .latency import LatencyMonitor
+from .rate_limit import RateLimiter
+from .recording import Recorder
+from .shm import SharedMemoryPool
+from .subscriptions import SubscriptionRegistry
+from .typedefs import JsonLoads
+
+__all__ = ('StreamingConfig',)
+
+
+class StreamingConfig(NamedTuple):
+    """
+    Optional features of `Streaming`:
+
+    - `url` of the streaming API;
+    - parsing: `loads` is the fastest available by default, with `trusted`
+    payloads are built without validation, with `lazy` `candle`, `orderbook`
+    and `instrument_info` payloads are parsed on access, with `time_ns`
+    handlers get `server_time` as `int` epoch nanoseconds;
+    - reconnects: `backoff` (`Backoff(base=reconnect_timeout)` by default)
+    is reset after a connection that lasted `stable_after` seconds;
+    - subscriptions: the `subscriptions` registry paced by `rate_limiter`;
+    - handlers: `dispatcher`, `executor`, `process_pool` and `isolation`;
+    - `recorder` of messages, `backfill` of candles, `latency` monitor.
+
+    ```python
+    config = tinvest.StreamingConfig(lazy=True, dispatcher=tinvest.QueueDispatcher())
+    await tinvest.Streaming(TOKEN, config=config).add_handlers(events).run()
+    ```
+    """
+
+    url: str = STREAMING
+    loads: Optional[JsonLoads] = None
+    trusted: bool = False
+    lazy: bool = False
+    time_ns: bool = False
+    backoff: Optional[Backoff] = None
+    stable_after: float = 60
+    subscriptions: Optional[SubscriptionRegistry] = None
+    rate_limiter: Optional[RateLimiter] = None
+    dispatcher: Optional[QueueDispatcher] = None
+    executor: Optional[HandlerExecutor] = None
+    process_pool: Optional[SharedMemoryPool] = None
+    isolation: Optional[HandlerIsolation] = None
+    recorder: Optional[Recorder] = None
+    backfill: Optional[CandleBackfill] = None
+    latency: Optional[LatencyMonitor] = None
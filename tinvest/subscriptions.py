@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from typing import Any, Dict, Hashable, Iterator, Optional, Tuple
+
+from .rate_limit import RateGroup, RateLimiter
+from .typedefs import AnyDict
+
+__all__ = ('SubscriptionRegistry',)
+
+logger = logging.getLogger(__name__)
+
+_Key = Tuple[str, str, Hashable]  # pragma: no mutate
+
+
+def _get_key(event_name: Any, payload: AnyDict) -> _Key:
+    param = payload.get('interval', payload.get('depth'))
+    return (
+        getattr(event_name, 'value', event_name),
+        payload['figi'],
+        getattr(param, 'value', param),
+    )
+
+
+class SubscriptionRegistry:
+    """
+    Active subscriptions of `StreamingApi`.
+
+    Repeated subscribe calls are not sent again, and after a reconnect
+    `Streaming` re-sends every subscription in batches of `batch_size`
+    messages with `pause` seconds between batches.
+    Subscribe and unsubscribe messages are paced by `rate_limiter`.
+
+    ```python
+    streaming = tinvest.Streaming(TOKEN)
+    ...
+    for event_name, payload in streaming.subscriptions:
+        print(event_name, payload)
+    ```
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 50,
+        pause: float = 0.5,
+        *,
+        rate_limiter: Optional[RateLimiter] = None,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError(f'not 0 < {batch_size}')
+        self._batch_size = batch_size
+        self._pause = pause
+        self.rate_limiter = rate_limiter
+        self._subscriptions: Dict[_Key, Tuple[str, AnyDict]] = {}
+
+    def add(self, event_name: str, payload: AnyDict) -> bool:
+        """
+        Returns `False` if the subscription is already active.
+        """
+        key = _get_key(event_name, payload)
+        if key in self._subscriptions:
+            return False
+        payload = {k: v for k, v in payload.items() if k != 'request_id'}
+        self._subscriptions[key] = (event_name, payload)
+        return True
+
+    def remove(self, event_name: str, payload: AnyDict) -> bool:
+        """
+        Returns `False` if the subscription is not active.
+        """
+        return self._subscriptions.pop(_get_key(event_name, payload), None) is not None
+
+    def clear(self) -> None:
+        self._subscriptions.clear()
+
+    def __contains__(self, item: Tuple[str, AnyDict]) -> bool:
+        return _get_key(*item) in self._subscriptions
+
+    def __iter__(self) -> Iterator[Tuple[str, AnyDict]]:
+        return iter(list(self._subscriptions.values()))
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    async def throttle(self) -> None:
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire(RateGroup.streaming)
+
+    async def resubscribe(self, ws: Any) -> None:
+        subscriptions = list(self)
+        if subscriptions:
+            logger.info('Resubscribe to %s streams', len(subscriptions))
+        for i, (event_name, payload) in enumerate(subscriptions):
+            if i and not i % self._batch_size:
+                await asyncio.sleep(self._pause)
+            await self.throttle()
+            await ws.send_json({'event': f'{event_name}:subscribe', **payload})
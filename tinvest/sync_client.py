@@ -1,10 +1,15 @@
-from typing import Any, Generic, Type, TypeVar
+import time
+from typing import Any, Dict, Generic, Optional, Type, TypeVar
 
 from pydantic import BaseModel  # pylint:disable=no-name-in-module
-from requests import Response, Session, session
+from requests import ConnectionError as RequestsConnectionError
+from requests import Response, Session, Timeout, session
 
 from .base_client import BaseClient
+from .construct import get_constructor
+from .rate_limit import get_rate_group
 from .schemas import Error
+from .typedefs import JsonLoads
 from .utils import set_default_headers
 
 __all__ = ('SyncClient', 'ResponseWrapper')
@@ -15,21 +20,47 @@ T = TypeVar('T', bound=BaseModel)  # pragma: no mutate
 class ResponseWrapper(Generic[T]):
     S = TypeVar('S', bound=BaseModel)
 
-    def __init__(self, response: Response, response_model: Type[T]):
+    def __init__(
+        self,
+        response: Response,
+        response_model: Type[T],
+        loads: Optional[JsonLoads] = None,
+    ):
         self._response = response
         self._response_model = response_model
+        self._loads = loads
 
     def __getattr__(self, name):
         return getattr(self._response, name)
 
-    def parse_json(self, **kwargs: Any) -> T:
+    def parse_json(self, *, trusted: bool = False, **kwargs: Any) -> T:
+        """
+        `trusted=True` builds the model without validation, see `get_constructor`.
+        """
+        if trusted:
+            return get_constructor(self._response_model)(self._json(**kwargs))
         return self._parse_json(self._response_model, **kwargs)
 
     def parse_error(self, **kwargs: Any) -> Error:
         return self._parse_json(Error, **kwargs)
 
     def _parse_json(self, response_model: Type[S], **kwargs: Any) -> S:
-        return response_model.parse_obj(self._response.json(**kwargs))
+        return response_model.parse_obj(self._json(**kwargs))
+
+    def _json(self, **kwargs: Any) -> Any:
+        """
+        Decoded with the `loads` of the client, `requests` decodes
+        if `kwargs` are passed, the body is empty or not JSON.
+        """
+        if self._loads is None or kwargs or not _is_json(self._response):
+            return self._response.json(**kwargs)
+        return self._loads(self._response.content)
+
+
+def _is_json(response: Response) -> bool:
+    content_type = response.headers.get('Content-Type', '')
+    mimetype = content_type.split(';', 1)[0].strip().lower()
+    return mimetype == 'application/json' and bool(response.content.strip())
 
 
 class SyncClient(BaseClient[Session]):
@@ -48,12 +79,33 @@ class SyncClient(BaseClient[Session]):
     ) -> ResponseWrapper:
         url = self._base_url + path
         set_default_headers(kwargs, self._token)
-
         response = ResponseWrapper[T](
-            self.session.request(method, url, **kwargs), response_model
+            self._send(method, path, url, kwargs), response_model, self._loads
         )
 
         if raise_for_status:
             response.raise_for_status()
 
         return response
+
+    def _send(
+        self, method: str, path: str, url: str, kwargs: Dict[str, Any]
+    ) -> Response:
+        retry = self._start_retry(method)
+        while True:
+            if self._rate_limiter is not None:
+                self._rate_limiter.acquire_blocking(get_rate_group(path))
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (RequestsConnectionError, Timeout) as e:
+                delay = retry.on_error(e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+
+            delay = retry.on_response(response.status_code, response.headers)
+            if delay is None:
+                return response
+            response.close()
+            time.sleep(delay)
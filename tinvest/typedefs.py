@@ -1,8 +1,13 @@
 from datetime import datetime
-from typing import Any, Dict, Union
+from typing import Any, Callable, Dict, Union
 
 __all__ = 'AnyDict'
 
 AnyDict = Dict[str, Any]  # pragma: no mutate
 
 datetime_or_str = Union[datetime, str]  # pragma: no mutate
+
+# `datetime` or epoch nanoseconds of `StreamingConfig(time_ns=True)`
+datetime_or_ns = Union[datetime, int]  # pragma: no mutate
+
+JsonLoads = Callable[[Union[bytes, str]], Any]  # pragma: no mutate
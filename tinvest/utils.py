@@ -1,21 +1,38 @@
 import asyncio
 import functools
+import json
 import typing
-from datetime import timezone
+from datetime import datetime, timedelta, timezone
 
-from .typedefs import AnyDict, datetime_or_str
+from pydantic.datetime_parse import parse_datetime  # pylint:disable=E0611
+
+from .typedefs import AnyDict, JsonLoads, datetime_or_str
 
 try:
     import contextvars  # Python 3.7+ only.
 except ImportError:  # pragma: no cover
     contextvars = None  # type: ignore # pragma: no mutate
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore # pragma: no mutate
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None  # type: ignore # pragma: no mutate
+
 __all__ = (
     'set_default_headers',
     'Func',
     'run_in_threadpool',
     'isoformat',
     'infinity',
+    'get_json_loads',
+    'parse_time',
+    'parse_time_ns',
+    'to_ns',
 )
 
 
@@ -28,6 +45,9 @@ def set_default_headers(data: AnyDict, token: str) -> None:
 
 T = typing.TypeVar('T')  # pragma: no mutate
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)  # pragma: no mutate
+_MICROSECOND = timedelta(microseconds=1)  # pragma: no mutate
+
 
 class Func:
     def __init__(
@@ -75,3 +95,65 @@ def infinity(func: typing.Callable[..., typing.Awaitable[None]]):
             await func(*args, **kwargs)
 
     return wrapper
+
+
+def get_json_loads() -> JsonLoads:
+    """
+    Returns the fastest available `loads`: orjson, ujson or stdlib json.
+    All of them accept both `bytes` and `str`.
+    """
+    if orjson is not None:
+        return orjson.loads
+    if ujson is not None:
+        return ujson.loads
+    return json.loads
+
+
+def parse_time(value: typing.Any) -> datetime:
+    """
+    Parses the RFC 3339 timestamps of the API (`2020-01-02T03:04:05.123456789Z`,
+    `2020-01-02T06:04:05+03:00`) with `datetime.fromisoformat`,
+    the fraction is truncated to microseconds. Other formats are parsed
+    with `pydantic.datetime_parse.parse_datetime`.
+    """
+    if isinstance(value, str) and len(value) >= 20 and value[10] == 'T':
+        if value[-1] == 'Z':
+            body, offset = value[:-1], '+00:00'
+        else:
+            body, offset = value[:-6], value[-6:]
+        if len(body) > 26:
+            body = body[:26]
+        elif 19 < len(body) < 26:
+            body = body.ljust(26, '0')
+        try:
+            return datetime.fromisoformat(body + offset)
+        except ValueError:
+            pass
+    return parse_datetime(value)
+
+
+def to_ns(dt: typing.Union[datetime, int]) -> int:
+    """
+    Epoch nanoseconds of a datetime (naive is local time),
+    epoch nanoseconds are kept.
+    """
+    if isinstance(dt, int):
+        return dt
+    if dt.tzinfo is None:
+        dt = dt.astimezone()
+    return (dt - _EPOCH) // _MICROSECOND * 1000
+
+
+def parse_time_ns(value: typing.Any) -> int:
+    """
+    As `parse_time`, but returns epoch nanoseconds with all nine digits
+    of the fraction.
+    """
+    ns = to_ns(parse_time(value))
+    if isinstance(value, str) and len(value) > 27 and value[19] == '.':
+        digits = value[26:29]
+        while digits and not digits.isdigit():
+            digits = digits[:-1]
+        if digits:
+            ns += int(digits.ljust(3, '0'))
+    return ns